@@ -0,0 +1,197 @@
+"""
+BatchLLMClient — provider Batch API backend for offline extraction.
+
+The problem it solves:
+  Extracting a backlog of thousands of submissions is not latency-sensitive,
+  but calling messages.create once per text pays real-time prices and
+  competes with live traffic for rate limit. Anthropic's Message Batches API
+  and OpenAI's Batch API accept many requests in one job, finish within
+  24h, bill at ~50% of the real-time price, and have separate rate limits.
+
+How it fits the extractor:
+  BatchLLMClient is an AsyncLLMClient. Each complete() call enqueues a
+  request and awaits a Future. Once the queue has been idle for `linger`
+  seconds (or hits max_batch_size) the queue is flushed as ONE batch job;
+  when the job ends, each Future is resolved by its custom_id. From the
+  extractor's point of view nothing changes:
+
+      client = BatchLLMClient(my_transport)   # any BatchTransport
+      extractor = SubmissionExtractor(client)
+      results = asyncio.run(extractor.extract_many(texts, concurrency=len(texts)))
+
+  Pass concurrency=len(texts) so every text is queued before the first
+  flush; the default semaphore bound would split the backlog into many
+  small batch jobs.
+
+Failure handling:
+  A request the provider reports as errored/expired raises BatchResultError,
+  a ValueError — the extractor treats it like unparseable output and
+  retries that text in the next batch. A failure of the job itself
+  (submit/poll raising) propagates to every waiting caller.
+"""
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------- #
+# Transport protocol                                                           #
+# --------------------------------------------------------------------------- #
+
+
+@dataclass(frozen=True, slots=True)
+class BatchRequest:
+    """One queued completion, identified in the batch job by custom_id."""
+    custom_id: str
+    system: str
+    user: str
+    cache: bool = True
+
+
+class BatchTransport(Protocol):
+    """
+    The three provider calls a batch job needs. Blocking — BatchLLMClient
+    runs them on a worker thread.
+
+    Anthropic (anthropic.Anthropic().messages.batches):
+      submit      → batches.create(requests=[{"custom_id": r.custom_id,
+                        "params": {"model": ..., "max_tokens": ...,
+                                   "system": r.system,
+                                   "messages": [{"role": "user", "content": r.user}]}}]).id
+      is_complete → batches.retrieve(batch_id).processing_status == "ended"
+      results     → {e.custom_id: e.result.message.content[0].text
+                     for e in batches.results(batch_id) if e.result.type == "succeeded"}
+
+    OpenAI: upload a JSONL file of /v1/chat/completions bodies, POST
+    /v1/batches, poll status == "completed", download output_file_id.
+    """
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        """Create a batch job and return its id."""
+        ...
+
+    def is_complete(self, batch_id: str) -> bool:
+        """Return True once the job has finished (successfully or not)."""
+        ...
+
+    def results(self, batch_id: str) -> dict[str, str]:
+        """Map custom_id → completion text for every request that succeeded."""
+        ...
+
+
+class BatchResultError(ValueError):
+    """The batch job finished without a result for this request."""
+
+
+# --------------------------------------------------------------------------- #
+# Client                                                                       #
+# --------------------------------------------------------------------------- #
+
+
+class BatchLLMClient:
+    """
+    AsyncLLMClient that coalesces concurrent complete() calls into batch jobs.
+
+    Not safe to share across event loops: the queue and its Futures belong
+    to the loop that created them.
+    """
+
+    # Anthropic caps a batch at 100 000 requests; stay well below.
+    DEFAULT_MAX_BATCH_SIZE = 10_000
+
+    def __init__(
+        self,
+        transport: BatchTransport,
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        linger: float = 0.05,
+        poll_interval: float = 60.0,
+    ) -> None:
+        self._transport = transport
+        self._max_batch_size = max_batch_size
+        self._linger = linger
+        self._poll_interval = poll_interval
+
+        self._pending: list[tuple[BatchRequest, asyncio.Future[str]]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()   # keep tasks referenced
+        self._ids = itertools.count(1)
+
+    async def complete(self, system: str, user: str, cache: bool = True) -> str:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[str] = loop.create_future()
+        request = BatchRequest(f"req-{next(self._ids)}", system, user, cache)
+        self._pending.append((request, future))
+
+        # Restart the idle timer on every enqueue so one extract_many() call
+        # lands in one job; cut the job immediately once it is full.
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        if len(self._pending) >= self._max_batch_size:
+            self._start_flush()
+        else:
+            self._flush_timer = loop.call_later(self._linger, self._start_flush)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Submit everything queued so far as one job and resolve its Futures."""
+        await self._resolve(self._take_pending())
+
+    # ------------------------------------------------------------------ #
+    # Private                                                              #
+    # ------------------------------------------------------------------ #
+
+    def _take_pending(self) -> list[tuple[BatchRequest, asyncio.Future[str]]]:
+        """Detach the current queue synchronously — later calls start a new job."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        pending, self._pending = self._pending, []
+        return pending
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self._resolve(self._take_pending()))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _resolve(
+        self, pending: list[tuple[BatchRequest, asyncio.Future[str]]]
+    ) -> None:
+        if not pending:
+            return
+
+        try:
+            results = await self._run_job([request for request, _ in pending])
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for request, future in pending:
+            if future.done():
+                continue
+            text = results.get(request.custom_id)
+            if text is None:
+                future.set_exception(
+                    BatchResultError(f"No batch result for {request.custom_id}")
+                )
+            else:
+                future.set_result(text)
+
+    async def _run_job(self, requests: list[BatchRequest]) -> dict[str, str]:
+        batch_id = await asyncio.to_thread(self._transport.submit, requests)
+        logger.info("Submitted batch %s with %d requests", batch_id, len(requests))
+        while not await asyncio.to_thread(self._transport.is_complete, batch_id):
+            await asyncio.sleep(self._poll_interval)
+        results = await asyncio.to_thread(self._transport.results, batch_id)
+        logger.info(
+            "Batch %s complete: %d/%d succeeded", batch_id, len(results), len(requests)
+        )
+        return results
@@ -3,7 +3,7 @@ SubmissionExtractor — the Extraction Agent.
 
 Architecture: Extraction Agent → Pydantic (Judging) → ExtractionResult
 
-The LLM is called via a LLMClient protocol (ABC). This means:
+The LLM is called via a LLMClient protocol (typing.Protocol). This means:
   - In production: swap in an Anthropic/OpenAI client.
   - In tests: use a MockLLMClient with pre-programmed responses.
   - No API key required to run the tests.
@@ -19,17 +19,64 @@ Partial extraction handling:
   If the LLM extracts 3 of 4 required fields, the result is PARTIAL,
   not FAILED. The caller (e.g., a human review queue) can decide what
   to do with it. Discarding partial work silently is wrong.
+
+Concurrent extraction:
+  An LLM call is almost entirely network wait. extract_many() fans a list
+  of texts out with asyncio.gather, bounded by a semaphore, so N calls take
+  roughly RTT × ceil(N / concurrency) instead of N × RTT. Clients that
+  implement AsyncLLMClient are awaited directly; a plain LLMClient is run
+  on worker threads via asyncio.to_thread (same trade-off as task_05).
+
+Response cache:
+  Identical texts recur — batch re-runs, redelivered messages, retries after
+  a downstream failure. The extractor keeps a small content-addressed LRU of
+  raw LLM output keyed on (attempt, user message). A hit skips the LLM call
+  but still runs _parse_and_validate, so the result is identical to a miss.
+  Only replies that parsed and validated are stored; a rejected reply is
+  never replayed, so the retry after it still reaches the model.
+
+Deterministic pre-fill:
+  Some fields have a rigid surface form — "Dallas, TX 75201", "$4.5M".
+  _regex_prefill() pulls those out before the LLM is called, and the prompt
+  asks only for the remaining fields. A field is pre-filled only when the
+  text contains exactly one candidate for it; anything ambiguous (two
+  dollar amounts, two addresses) is left for the LLM to resolve. A dollar
+  amount is a revenue candidate only when "revenue", "sales" or "turnover"
+  appears in the same clause, so "seeking $1M limit" is never revenue.
+
+Batched prompts:
+  extract_batch() packs up to batch_size texts into one prompt that asks
+  for a JSON array, so the static prefix and the HTTP round-trip are paid
+  once per pack instead of once per text. An array of the wrong length is
+  treated like unparseable output (retry with the reminder). Any item that
+  still fails validation — or a pack that never parses — falls back to the
+  single-text extract() path, so one bad item never fails its neighbours.
+
+Streaming early abort:
+  A reply that opens with prose ("Sure, here is the JSON:") will fail to
+  parse however long it runs. If the client also implements
+  StreamingLLMClient, the extractor consumes the stream instead and closes
+  it as soon as the first non-whitespace character is not one a JSON
+  reply can start with ({, [ or a ``` fence). The retry then fires with
+  _RETRY_SUFFIX immediately, without paying for the rest of the tokens.
 """
 
+import asyncio
+import hashlib
+import inspect
 import json
 import logging
-from abc import ABC, abstractmethod
-from typing import Optional
+import operator
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional, Protocol
 
+import orjson
 from pydantic import ValidationError
 
 from models import (
-    REQUIRED_FOR_TRIAGE,
+    REQUIRED_FIELDS,
     ExtractedSubmission,
     ExtractionResult,
     ExtractionStatus,
@@ -41,29 +88,86 @@ logger = logging.getLogger(__name__)
 # Prompt template                                                              #
 # --------------------------------------------------------------------------- #
 
-_BASE_PROMPT = """\
-You are an insurance data extraction assistant.
+# Static instructions go in the system block, the broker text in the user
+# block. The system block is byte-identical on every call, so providers with
+# prefix caching (Anthropic cache_control, OpenAI automatic caching) bill and
+# tokenise it once per cache TTL instead of once per submission.
+#
+# The prompt is a terse schema + one-line directive rather than English
+# prose: every token here is paid on every call (or every cache refresh).
+# The single few-shot example lives in the cached prefix, not in the retry
+# suffix, because examples carry most of the formatting signal.
+_SCHEMA = (
+    '{"company_name":"str|null","revenue":"number|null","industry":"str|null",'
+    '"state":"str(2-letter US)|null","zip_code":"str(5)|null"}'
+)
+
+_SYSTEM_PROMPT = f"""\
+Insurance submission extraction. Extract to JSON matching schema. Null if absent. Raw JSON only, no prose.
+Schema: {_SCHEMA}
+Example: {{"company_name":"Acme","revenue":5000000,"industry":"Retail","state":"NY","zip_code":null}}"""
+
+# On retry: append a short reminder to the USER message.
+# Appending it to the system block would change the cached prefix and
+# force a cache miss on every retry.
+_RETRY_SUFFIX = "\n\nREMINDER: previous reply unparseable. STRICT JSON."
+
+
+# Prepended to the user message when some fields were pre-filled by regex.
+_PARTIAL_FIELDS_PREFIX = "Extract only: {fields}\n\n"
+# "Extract only: " — how requested_fields() recognises that header.
+_PARTIAL_MARKER = _PARTIAL_FIELDS_PREFIX.partition("{fields}")[0]
+
+# User message header for extract_batch(); items follow as "[n] text" lines.
+_BATCH_PREFIX = "Extract for each item. Return JSON array in input order.\nItems:\n"
 
-Extract the following fields from the text. If a field is not present, \
-set its value to null. Return ONLY a raw JSON object — no markdown, \
-no explanation, no code blocks.
+# LLMs wrap JSON in a markdown fence often enough that every reply is
+# cleaned. One anchored pattern does it in a single pass: optional opening
+# ```json / ```, the payload, optional closing ```, surrounding whitespace.
+# The group is lazy so trailing whitespace and the closing fence stay outside.
+_FENCE_RE = re.compile(r"\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*", re.DOTALL)
 
-Fields:
-  company_name  - Name of the company being insured
-  revenue       - Annual revenue as a plain number (e.g. 5000000)
-  industry      - Business industry or sector
-  state         - US state, preferably 2-letter code (e.g. "NY")
-  zip_code      - 5-digit ZIP code if mentioned
+# A reply whose first non-whitespace character is not one of these can
+# never parse — a streamed completion is abandoned as soon as one is seen.
+_JSON_START_CHARS: frozenset[str] = frozenset("{[`")
 
-Text:
-{text}"""
 
-# On retry: append a stronger formatting reminder
-_RETRY_SUFFIX = """
+# --------------------------------------------------------------------------- #
+# Deterministic pre-fill patterns                                              #
+# --------------------------------------------------------------------------- #
 
-REMINDER: Your previous response could not be parsed. Return ONLY a \
-raw JSON object. Example: {{"company_name": "Acme", "revenue": 5000000, \
-"industry": "Retail", "state": "NY", "zip_code": null}}"""
+_US_STATE_CODES: frozenset[str] = frozenset(
+    {
+        "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI",
+        "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN",
+        "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC", "ND", "OH",
+        "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA",
+        "WV", "WI", "WY",
+    }
+)
+
+# Address form: "TX 75201" or "TX, 75201-1234". A bare 2-letter word or a
+# bare 5-digit number is too ambiguous ("IT", "OR", "$10000") to trust.
+_STATE_ZIP_RE = re.compile(r"\b([A-Z]{2}),?\s+(\d{5})(?:-\d{4})?\b")
+
+# "$4.5M", "$ 500k", "$5 million", "$4,500,000"
+_REVENUE_RE = re.compile(
+    r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*(k|mm|m|b|thousand|million|billion)?\b",
+    re.IGNORECASE,
+)
+# Normalise spelled-out magnitudes to the suffixes coerce_revenue understands.
+_REVENUE_SUFFIXES: dict[str, str] = {
+    "k": "k", "thousand": "k",
+    "m": "m", "mm": "m", "million": "m",
+    "b": "b", "billion": "b",
+}
+# A dollar amount is only a revenue candidate when one of these words sits in
+# the same clause — "$1M limit" or "$50k deductible" must not become revenue.
+_REVENUE_WORD_RE = re.compile(r"\b(?:revenues?|sales|turnover)\b", re.IGNORECASE)
+# How far either side of an amount to look for a revenue word, and where a
+# clause ends. "." only counts before whitespace, so "$4.5M" is one clause.
+_REVENUE_CONTEXT_CHARS = 40
+_CLAUSE_BREAK_RE = re.compile(r"[.!?;]\s|\n")
 
 
 # --------------------------------------------------------------------------- #
@@ -71,18 +175,65 @@ raw JSON object. Example: {{"company_name": "Acme", "revenue": 5000000, \
 # --------------------------------------------------------------------------- #
 
 
-class LLMClient(ABC):
+class LLMClient(Protocol):
     """
     Minimal interface for an LLM text completion.
 
     Production implementations would wrap anthropic.Anthropic,
     openai.OpenAI, or any other provider. The extractor only depends
     on this contract, not on any specific SDK.
+
+    `system` is static across calls; `cache=True` asks the implementation
+    to mark it as a cacheable prefix. With the Anthropic SDK:
+
+        client.messages.create(
+            model=...,
+            system=[{"type": "text", "text": system,
+                     "cache_control": {"type": "ephemeral"}}],
+            messages=[{"role": "user", "content": user}],
+        )
+
+    Providers without explicit cache markers can ignore the flag.
+
+    Structural: any object with a matching complete() satisfies it — SDK
+    wrappers do not need to inherit from this class.
     """
 
-    @abstractmethod
-    def complete(self, prompt: str) -> str:
-        """Send a prompt and return the model's text completion."""
+    def complete(self, system: str, user: str, cache: bool = True) -> str:
+        """Send a system + user prompt and return the model's text completion."""
+        ...
+
+
+class AsyncLLMClient(Protocol):
+    """
+    Async variant of LLMClient for providers with a native async SDK
+    (anthropic.AsyncAnthropic, openai.AsyncOpenAI).
+
+    Rate limiting and HTTP-level retries (429 / 5xx) belong in the concrete
+    implementation — the SDKs already do this. The extractor's own retry
+    loop is about unparseable output, not transport failures.
+    """
+
+    async def complete(self, system: str, user: str, cache: bool = True) -> str:
+        """Send a system + user prompt and return the model's text completion."""
+        ...
+
+
+class StreamingLLMClient(Protocol):
+    """
+    Optional capability on top of a sync LLMClient: yield the completion
+    as text chunks. With the Anthropic SDK:
+
+        with client.messages.stream(model=..., system=..., messages=...) as s:
+            yield from s.text_stream
+
+    When the extractor stops early it calls close() on the returned
+    iterator, so a generator that wraps the SDK's context manager releases
+    the HTTP connection and the provider stops generating.
+    """
+
+    def stream(self, system: str, user: str, cache: bool = True) -> Iterator[str]:
+        """Send a system + user prompt and yield the completion text in chunks."""
         ...
 
 
@@ -107,11 +258,43 @@ class SubmissionExtractor:
         else:
             # All attempts failed — log and escalate
             logger.error(result.error)
+
+        # Many texts at once — calls overlap on network I/O
+        results = asyncio.run(extractor.extract_many(texts, concurrency=16))
     """
 
-    def __init__(self, client: LLMClient, max_retries: int = 2) -> None:
+    # Default upper bound on in-flight LLM calls in extract_many().
+    DEFAULT_CONCURRENCY = 32
+    # Default number of raw LLM responses kept in the in-process LRU.
+    DEFAULT_CACHE_SIZE = 1024
+    # Default texts per extract_batch() prompt. Keep batch_size × per-item
+    # output comfortably under the model's output-token limit.
+    DEFAULT_BATCH_SIZE = 10
+
+    def __init__(
+        self,
+        client: LLMClient | AsyncLLMClient,
+        max_retries: int = 2,
+        *,
+        cache: bool = True,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
         self._client = client
+        # Protocols are structural, so isinstance() cannot tell a sync client
+        # from an async one — check the method itself, once.
+        self._client_is_async = inspect.iscoroutinefunction(client.complete)
+        # Streaming is an optional extra on sync clients (see StreamingLLMClient).
+        self._client_streams = not self._client_is_async and callable(
+            getattr(client, "stream", None)
+        )
         self._max_retries = max_retries
+        # Pass cache=False when every call must reach the client
+        # (e.g. tests that assert on call counts across repeated texts).
+        self._cache: Optional[OrderedDict[bytes, str]] = OrderedDict() if cache else None
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()   # OrderedDict reordering is not atomic
+        self._batch_size = batch_size
 
     def extract(self, text: str) -> ExtractionResult:
         """
@@ -119,40 +302,228 @@ class SubmissionExtractor:
 
         Never raises — returns ExtractionResult(status=FAILED) on all errors.
         """
+        prefill = _regex_prefill(text)
+
         last_error: Optional[str] = None
         raw_output: Optional[str] = None
 
         for attempt in range(1, self._max_retries + 1):
             try:
-                raw_output = self._call_llm(text, attempt)
-                extracted = self._parse_and_validate(raw_output)
-                missing = _missing_fields(extracted)
-                status = (
-                    ExtractionStatus.PARTIAL if missing else ExtractionStatus.SUCCESS
-                )
-                logger.info(
-                    "Extraction %s on attempt %d (missing=%s)",
-                    status.value,
-                    attempt,
-                    missing or "none",
-                )
-                return ExtractionResult(
-                    source_text=text,
-                    status=status,
-                    extracted=extracted,
-                    missing_fields=missing,
-                    raw_llm_output=raw_output,
-                )
+                key, raw_output = self._call_llm(text, attempt, prefill)
+                result = self._build_result(text, raw_output, attempt, prefill)
+            except (json.JSONDecodeError, ValidationError, ValueError) as exc:
+                last_error = self._log_attempt_failure(attempt, exc)
+                continue
+            self._cache_put(key, raw_output)   # only a reply that validated is replayed
+            return result
+
+        return self._failed_result(text, raw_output, last_error)
+
+    async def extract_many(
+        self, texts: list[str], concurrency: int = DEFAULT_CONCURRENCY
+    ) -> list[ExtractionResult]:
+        """
+        Extract every text concurrently, with at most `concurrency` LLM
+        calls in flight. Results are returned in the same order as `texts`.
+
+        Never raises for a single bad text — each slot holds its own
+        ExtractionResult, exactly as extract() would have returned it.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _guarded(text: str) -> ExtractionResult:
+            async with semaphore:
+                return await self._aextract(text)
+
+        return list(await asyncio.gather(*(_guarded(t) for t in texts)))
+
+    def extract_batch(self, texts: list[str]) -> list[ExtractionResult]:
+        """
+        Extract many texts with one LLM call per batch_size texts.
+
+        Results are returned in input order. Requires a sync LLMClient —
+        for async clients use extract_many(). Never raises.
+        """
+        results: list[ExtractionResult] = []
+        for start in range(0, len(texts), self._batch_size):
+            results.extend(self._extract_pack(texts[start:start + self._batch_size]))
+        return results
+
+    # ------------------------------------------------------------------ #
+    # Private helpers                                                      #
+    # ------------------------------------------------------------------ #
+
+    def _extract_pack(self, texts: list[str]) -> list[ExtractionResult]:
+        """One extract_batch() pack: a single LLM call, per-item fallback."""
+        prefills = [_regex_prefill(t) for t in texts]
+        results: list[Optional[ExtractionResult]] = [None] * len(texts)
+        items, attempt = self._call_llm_batch(texts)
+
+        for i, raw_item in enumerate(items):
+            if raw_item is not None:
+                try:
+                    results[i] = self._build_result(texts[i], raw_item, attempt, prefills[i])
+                    continue
+                except (ValidationError, ValueError) as exc:
+                    logger.warning("Batch item %d failed validation: %s", i, exc)
+            results[i] = self.extract(texts[i])   # retry just this item on its own
+        return results
+
+    def _call_llm_batch(self, texts: list[str]) -> tuple[list[Optional[str]], int]:
+        """
+        Ask for all texts in one call. Returns one raw JSON string per text
+        plus the attempt that produced them, or all-None if no attempt
+        returned a JSON array of the right length.
+        """
+        if not texts:
+            return [], 0
+        items = "\n".join(f"[{n}] {text}" for n, text in enumerate(texts, start=1))
+        last_attempt = 0
+        for attempt in range(1, self._max_retries + 1):
+            last_attempt = attempt
+            user = _BATCH_PREFIX + items
+            if attempt > 1:
+                user += _RETRY_SUFFIX
+            key = _cache_key(user, attempt)
+            try:
+                raw = self._complete_cached(key, user)
+                data = orjson.loads(strip_fences(raw))
+                if not isinstance(data, list) or len(data) != len(texts):
+                    raise ValueError(
+                        f"Expected a JSON array of {len(texts)} items, "
+                        f"got {type(data).__name__}"
+                        + (f" of {len(data)}" if isinstance(data, list) else "")
+                    )
+            except (json.JSONDecodeError, ValueError) as exc:
+                self._log_attempt_failure(attempt, exc)
+                continue
+            # Items that then fail validation fall back to extract(), which
+            # never replays their bad reply — see _cache_put.
+            self._cache_put(key, raw)
+            return [orjson.dumps(item).decode() for item in data], attempt
+        return [None] * len(texts), last_attempt
+
+    async def _aextract(self, text: str) -> ExtractionResult:
+        """Async mirror of extract() — same retry loop, awaited LLM call."""
+        prefill = _regex_prefill(text)
+
+        last_error: Optional[str] = None
+        raw_output: Optional[str] = None
 
+        for attempt in range(1, self._max_retries + 1):
+            try:
+                key, raw_output = await self._acall_llm(text, attempt, prefill)
+                result = self._build_result(text, raw_output, attempt, prefill)
             except (json.JSONDecodeError, ValidationError, ValueError) as exc:
-                last_error = str(exc)
-                logger.warning(
-                    "Extraction attempt %d/%d failed: %s",
-                    attempt,
-                    self._max_retries,
-                    last_error,
-                )
+                last_error = self._log_attempt_failure(attempt, exc)
+                continue
+            self._cache_put(key, raw_output)
+            return result
 
+        return self._failed_result(text, raw_output, last_error)
+
+    @staticmethod
+    def _build_user_message(text: str, attempt: int, prefill: dict[str, object]) -> str:
+        user = text
+        if prefill:
+            remaining = [f for f in ExtractedSubmission.model_fields if f not in prefill]
+            user = _PARTIAL_FIELDS_PREFIX.format(fields=", ".join(remaining)) + user
+        if attempt > 1:
+            user += _RETRY_SUFFIX
+        return user
+
+    def _call_llm(
+        self, text: str, attempt: int, prefill: dict[str, object]
+    ) -> tuple[bytes, str]:
+        """Return (cache key, raw reply). The caller caches the reply once it validates."""
+        user = self._build_user_message(text, attempt, prefill)
+        key = _cache_key(user, attempt)
+        return key, self._complete_cached(key, user)
+
+    def _complete_cached(self, key: bytes, user: str) -> str:
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        return self._complete_sync(user)
+
+    def _complete_sync(self, user: str) -> str:
+        if self._client_streams:
+            return _collect_stream(self._client.stream(_SYSTEM_PROMPT, user))
+        return self._client.complete(_SYSTEM_PROMPT, user)
+
+    async def _acall_llm(
+        self, text: str, attempt: int, prefill: dict[str, object]
+    ) -> tuple[bytes, str]:
+        user = self._build_user_message(text, attempt, prefill)
+        key = _cache_key(user, attempt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return key, cached
+        if self._client_is_async:
+            return key, await self._client.complete(_SYSTEM_PROMPT, user)
+        # Sync client: run the blocking call on a worker thread so other
+        # extractions can make progress while this one waits on the network.
+        return key, await asyncio.to_thread(self._complete_sync, user)
+
+    def _cache_get(self, key: bytes) -> Optional[str]:
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            raw = self._cache.get(key)
+            if raw is not None:
+                self._cache.move_to_end(key)   # mark as most recently used
+            return raw
+
+    def _cache_put(self, key: bytes, raw: str) -> None:
+        # Called only after the reply parsed (and, for single texts,
+        # validated): caching a rejected reply would make every later
+        # extract() of the same text fail without reaching the model.
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = raw
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)   # evict least recently used
+
+    def _build_result(
+        self, text: str, raw_output: str, attempt: int, prefill: dict[str, object]
+    ) -> ExtractionResult:
+        """Parse one LLM response and classify it as SUCCESS or PARTIAL."""
+        extracted = self._parse_and_validate(raw_output, prefill)
+        missing = missing_fields(extracted)
+        status = ExtractionStatus.PARTIAL if missing else ExtractionStatus.SUCCESS
+        # Guarded: this runs once per extraction, and with INFO off the
+        # argument tuple and the extra dict would be built for nothing.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Extraction %s on attempt %d (missing=%s)",
+                status.value,
+                attempt,
+                missing or "none",
+                extra={"status": status.value, "attempt": attempt, "missing": missing},
+            )
+        return ExtractionResult(
+            source_text=text,
+            status=status,
+            extracted=extracted,
+            missing_fields=missing,
+            raw_llm_output=raw_output,
+        )
+
+    def _log_attempt_failure(self, attempt: int, exc: Exception) -> str:
+        last_error = str(exc)
+        logger.warning(
+            "Extraction attempt %d/%d failed: %s",
+            attempt,
+            self._max_retries,
+            last_error,
+        )
+        return last_error
+
+    def _failed_result(
+        self, text: str, raw_output: Optional[str], last_error: Optional[str]
+    ) -> ExtractionResult:
         return ExtractionResult(
             source_text=text,
             status=ExtractionStatus.FAILED,
@@ -163,42 +534,162 @@ class SubmissionExtractor:
             ),
         )
 
-    # ------------------------------------------------------------------ #
-    # Private helpers                                                      #
-    # ------------------------------------------------------------------ #
-
-    def _call_llm(self, text: str, attempt: int) -> str:
-        prompt = _BASE_PROMPT.format(text=text)
-        if attempt > 1:
-            prompt += _RETRY_SUFFIX
-        return self._client.complete(prompt)
-
     @staticmethod
-    def _parse_and_validate(raw: str) -> ExtractedSubmission:
+    def _parse_and_validate(
+        raw: str, prefill: Optional[dict[str, object]] = None
+    ) -> ExtractedSubmission:
         """
         Parse the raw LLM string into a validated ExtractedSubmission.
 
+        Pre-filled fields win over whatever the LLM returned for them —
+        they were matched deterministically from the source text. They are
+        already coerced, so they are merged after validation with
+        model_copy(update=...) rather than re-validated.
+
         Two failure modes, both raised so the retry loop can catch them:
           json.JSONDecodeError  — LLM wrapped output in markdown or prose
           ValidationError       — Valid JSON but wrong schema
+
+        Decoding goes through orjson (several times faster than the stdlib
+        on LLM-sized payloads); orjson.JSONDecodeError subclasses
+        json.JSONDecodeError, so callers catch the stdlib type unchanged.
         """
-        # Strip common LLM formatting artifacts: ```json...``` or ```...```
-        cleaned = (
-            raw.strip()
-            .removeprefix("```json")
-            .removeprefix("```")
-            .removesuffix("```")
-            .strip()
-        )
-        data = json.loads(cleaned)  # raises JSONDecodeError if not valid JSON
-        return ExtractedSubmission.model_validate(data)  # raises ValidationError if wrong shape
+        data = orjson.loads(strip_fences(raw))  # raises JSONDecodeError if not valid JSON
+        extracted = ExtractedSubmission.model_validate(data)  # raises ValidationError if wrong shape
+        if prefill:
+            extracted = extracted.model_copy(update=prefill)
+        return extracted
 
 
 # --------------------------------------------------------------------------- #
-# Pure helper                                                                  #
+# Pure helpers                                                                 #
 # --------------------------------------------------------------------------- #
 
 
-def _missing_fields(extracted: ExtractedSubmission) -> list[str]:
-    """Return which required-for-triage fields were not extracted."""
-    return [f for f in REQUIRED_FOR_TRIAGE if getattr(extracted, f) is None]
+def requested_fields(user: str) -> tuple[str, ...]:
+    """
+    The REQUIRED_FIELDS a user message built by the extractor asks for.
+
+    All of them, unless the message starts with the pre-fill header, in
+    which case only those it names. For LLMClient wrappers such as
+    TieredLLMClient, which see the prompt but not the pre-fill behind it.
+    """
+    if not user.startswith(_PARTIAL_MARKER):
+        return REQUIRED_FIELDS
+    named = user[len(_PARTIAL_MARKER):].partition("\n")[0].split(", ")
+    return tuple(field for field in REQUIRED_FIELDS if field in named)
+
+
+def strip_fences(raw: str) -> str:
+    """Strip common LLM formatting artifacts: ```json...``` or ```...```"""
+    return _FENCE_RE.fullmatch(raw).group(1)  # always matches — every part is optional
+
+
+def _collect_stream(chunks: Iterator[str]) -> str:
+    """
+    Join a streamed completion, abandoning it early if it cannot be JSON.
+
+    Raises ValueError (caught by the retry loop like any parse failure)
+    as soon as the first non-whitespace character rules JSON out.
+    """
+    parts: list[str] = []
+    checked = False
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            if checked:
+                continue
+            head = chunk.lstrip()
+            if head:
+                checked = True
+                if head[0] not in _JSON_START_CHARS:
+                    raise ValueError(f"non-JSON prefix in streamed reply: {head[:40]!r}")
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()   # stop generation — a no-op once the stream is exhausted
+    return "".join(parts)
+
+
+def _regex_prefill(text: str) -> dict[str, object]:
+    """
+    Pull fields with a rigid surface form out of the text without an LLM.
+
+    Values are returned in their final, validated form (state uppercased by
+    the regex, revenue coerced by ExtractedSubmission.coerce_revenue), so
+    they can be merged with model_copy(update=...) unvalidated. A field is
+    only returned when the text contains exactly one distinct candidate;
+    for revenue, a candidate is a dollar amount next to a revenue word.
+    """
+    prefill: dict[str, object] = {}
+
+    addresses = {
+        (state, zip_code)
+        for state, zip_code in _STATE_ZIP_RE.findall(text)
+        if state in _US_STATE_CODES
+    }
+    if len(addresses) == 1:
+        prefill["state"], prefill["zip_code"] = addresses.pop()
+
+    amounts = {
+        (match[1], _REVENUE_SUFFIXES.get((match[2] or "").lower(), ""))
+        for match in _REVENUE_RE.finditer(text)
+        if _near_revenue_word(text, match.start(), match.end())
+    }
+    if len(amounts) == 1:
+        number, suffix = amounts.pop()
+        revenue = ExtractedSubmission.coerce_revenue(number + suffix)
+        if revenue is not None:
+            prefill["revenue"] = revenue
+
+    return prefill
+
+
+def _near_revenue_word(text: str, start: int, end: int) -> bool:
+    """Is there a revenue word within the same clause as text[start:end]?"""
+    before = text[max(0, start - _REVENUE_CONTEXT_CHARS):start]
+    after = text[end:end + _REVENUE_CONTEXT_CHARS]
+    breaks = list(_CLAUSE_BREAK_RE.finditer(before))
+    if breaks:
+        before = before[breaks[-1].end():]
+    brk = _CLAUSE_BREAK_RE.search(after)
+    if brk:
+        after = after[:brk.start()]
+    return bool(_REVENUE_WORD_RE.search(before) or _REVENUE_WORD_RE.search(after))
+
+
+def _cache_key(user: str, attempt: int) -> bytes:
+    """
+    Content-addressed key for one LLM call.
+
+    The attempt number is part of the key: attempts 2 and 3 send the same
+    user message, and a cached bad reply for attempt 2 must not be replayed
+    as attempt 3. The system prompt is a module constant, so it is omitted.
+
+    The attempt tag is pre-encoded and fed to the hash separately, so the
+    (possibly long) user text is encoded once and never copied into a
+    concatenated string first.
+    """
+    digest = hashlib.blake2b(_attempt_tag(attempt), digest_size=16)
+    digest.update(user.encode())
+    return digest.digest()
+
+
+# b"1\x00", b"2\x00", ... — the common attempt numbers, encoded at import.
+_ATTEMPT_TAGS: tuple[bytes, ...] = tuple(f"{n}\x00".encode() for n in range(8))
+
+
+def _attempt_tag(attempt: int) -> bytes:
+    if attempt < len(_ATTEMPT_TAGS):
+        return _ATTEMPT_TAGS[attempt]
+    return f"{attempt}\x00".encode()
+
+
+# One C-level call fetches every required field at once.
+_REQUIRED_GETTER = operator.attrgetter(*REQUIRED_FIELDS)
+
+
+def missing_fields(extracted: ExtractedSubmission) -> list[str]:
+    """Return which required-for-triage fields were not extracted, in schema order."""
+    values = _REQUIRED_GETTER(extracted)
+    return [name for name, value in zip(REQUIRED_FIELDS, values) if value is None]
@@ -22,6 +22,11 @@ from typing import Optional
 
 from pydantic import BaseModel, field_validator
 
+# Compiled once at import — the validator runs on every extracted revenue.
+_REVENUE_STRIP = re.compile(r"[$,\s]")
+# Suffix multipliers: multiply numerically, not by string concatenation.
+_MULTIPLIERS: dict[str, int] = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
 
 class ExtractionStatus(str, Enum):
     SUCCESS = "success"   # All required fields extracted
@@ -31,9 +36,10 @@ class ExtractionStatus(str, Enum):
 
 # Fields that MUST be present for a downstream triage to run.
 # zip_code is useful but not blocking.
-REQUIRED_FOR_TRIAGE: frozenset[str] = frozenset(
-    {"company_name", "revenue", "industry", "state"}
-)
+# The tuple fixes the order missing fields are reported in; the frozenset
+# is kept for O(1) membership tests and backwards compatibility.
+REQUIRED_FIELDS: tuple[str, ...] = ("company_name", "revenue", "industry", "state")
+REQUIRED_FOR_TRIAGE: frozenset[str] = frozenset(REQUIRED_FIELDS)
 
 
 class ExtractedSubmission(BaseModel):
@@ -62,21 +68,23 @@ class ExtractedSubmission(BaseModel):
         # Decimal passed directly (e.g. from tests or internal code)
         if isinstance(v, Decimal):
             return v
-        if isinstance(v, (int, float)):
-            return Decimal(str(v))
+        if isinstance(v, int):
+            return Decimal(v)   # exact for ints — no str() round-trip needed
+        if isinstance(v, float):
+            return Decimal(str(v))   # str() avoids binary-float artefacts
         if isinstance(v, str):
             # Handle "$4,500,000", "4.5M", "500k", "4500000.00", etc.
-            cleaned = re.sub(r"[$,\s]", "", v)
-            # Suffix multipliers: multiply numerically, not by string concatenation.
+            cleaned = _REVENUE_STRIP.sub("", v)
             # "4.5M" → Decimal("4.5") × 1_000_000 = Decimal("4500000")
-            multipliers = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
-            for suffix, factor in multipliers.items():
-                if cleaned.lower().endswith(suffix):
-                    try:
-                        return Decimal(cleaned[:-1]) * factor
-                    except InvalidOperation:
-                        return None
+            factor = _MULTIPLIERS.get(cleaned[-1:].lower())
             try:
+                if factor is not None:
+                    mantissa = cleaned[:-1]
+                    # "5M" — the common case — stays in int arithmetic; only a
+                    # fractional "4.5M" needs the Decimal multiply.
+                    if mantissa.isascii() and mantissa.isdigit():
+                        return Decimal(int(mantissa) * factor)
+                    return Decimal(mantissa) * factor
                 return Decimal(cleaned)
             except InvalidOperation:
                 # LLM returned something un-parseable — treat as not found
@@ -14,8 +14,14 @@ What we verify:
   - The LLM is retried with a stronger prompt on parse failure
   - Dirty revenue values ("$4.5M", "$1,000,000") are coerced correctly
   - The mock is only called as many times as needed (no wasted API calls)
+  - extract_many() overlaps calls but never exceeds its concurrency bound
+  - Repeated texts are served from the response cache, not the LLM
+  - Regex-matchable fields are pre-filled and only the rest is asked for
+  - extract_batch() packs texts into one call and isolates per-item failures
+  - BatchLLMClient coalesces concurrent calls into one provider batch job
 """
 
+import asyncio
 import json
 import sys
 from decimal import Decimal
@@ -26,8 +32,17 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from extractor import LLMClient, SubmissionExtractor, _missing_fields
-from models import ExtractedSubmission, ExtractionStatus
+from batch_client import BatchLLMClient, BatchRequest
+from extractor import (
+    AsyncLLMClient,
+    LLMClient,
+    SubmissionExtractor,
+    _regex_prefill,
+    missing_fields,
+    requested_fields,
+)
+from models import REQUIRED_FIELDS, ExtractedSubmission, ExtractionStatus
+from tiered_client import TieredLLMClient
 
 
 # --------------------------------------------------------------------------- #
@@ -45,14 +60,35 @@ class MockLLMClient(LLMClient):
     def __init__(self, responses: list[str]) -> None:
         self._mock = MagicMock(side_effect=responses)
 
-    def complete(self, prompt: str) -> str:
-        return self._mock(prompt)
+    def complete(self, system: str, user: str, cache: bool = True) -> str:
+        return self._mock(system, user)
 
     @property
     def call_count(self) -> int:
         return self._mock.call_count
 
 
+class MockAsyncLLMClient(AsyncLLMClient):
+    """
+    Async stub that records the peak number of concurrent complete() calls,
+    so tests can assert the semaphore bound is respected.
+    """
+
+    def __init__(self, response: str) -> None:
+        self._response = response
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.call_count = 0
+
+    async def complete(self, system: str, user: str, cache: bool = True) -> str:
+        self.call_count += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(0)   # yield so other coroutines can start
+        self.in_flight -= 1
+        return self._response
+
+
 # --------------------------------------------------------------------------- #
 # Helpers                                                                      #
 # --------------------------------------------------------------------------- #
@@ -136,6 +172,14 @@ class TestPartialExtraction:
         assert result.status == ExtractionStatus.SUCCESS
         assert result.missing_fields == []
 
+    def test_outcome_log_record_carries_structured_fields(self, caplog):
+        client = MockLLMClient([PARTIAL_RESPONSE])
+        with caplog.at_level("INFO", logger="extractor"):
+            SubmissionExtractor(client).extract("text")
+
+        record = next(r for r in caplog.records if r.getMessage().startswith("Extraction"))
+        assert (record.status, record.attempt, record.missing) == ("partial", 1, ["industry"])
+
 
 # --------------------------------------------------------------------------- #
 # 3. Dirty revenue values                                                      #
@@ -150,6 +194,9 @@ class TestRevenueCoercion:
             ("$5,000,000", Decimal("5000000")),      # dollar + commas
             ("4.5M",       Decimal("4500000")),      # shorthand
             ("500k",       Decimal("500000")),       # k-suffix
+            ("$5M",        Decimal("5000000")),      # integer mantissa — int fast path
+            ("2B",         Decimal("2000000000")),   # upper-case suffix
+            ("M",          None),                    # suffix with no mantissa
             ("not-a-number", None),                  # hallucination → None
             (None,          None),                   # LLM returned null
         ],
@@ -190,11 +237,22 @@ class TestRetryBehaviour:
         client = MockLLMClient(["bad json", FULL_RESPONSE])
         SubmissionExtractor(client, max_retries=2).extract("text")
 
-        first_prompt  = client._mock.call_args_list[0][0][0]
-        second_prompt = client._mock.call_args_list[1][0][0]
+        first_user  = client._mock.call_args_list[0][0][1]
+        second_user = client._mock.call_args_list[1][0][1]
+
+        assert "REMINDER" not in first_user
+        assert "REMINDER" in second_user
 
-        assert "REMINDER" not in first_prompt
-        assert "REMINDER" in second_prompt
+    def test_system_prompt_is_identical_across_attempts(self):
+        """The retry reminder goes in the user message so the cached system prefix is reused."""
+        client = MockLLMClient(["bad json", FULL_RESPONSE])
+        SubmissionExtractor(client, max_retries=2).extract("Acme Corp, NY")
+
+        first_system  = client._mock.call_args_list[0][0][0]
+        second_system = client._mock.call_args_list[1][0][0]
+
+        assert first_system == second_system
+        assert "Acme Corp" not in first_system   # source text never leaks into the prefix
 
     def test_markdown_wrapped_json_is_parsed_correctly(self):
         """LLMs often wrap JSON in ```json ... ``` — the extractor must strip it."""
@@ -203,6 +261,17 @@ class TestRetryBehaviour:
         result = SubmissionExtractor(client).extract("text")
         assert result.status == ExtractionStatus.SUCCESS
 
+    @pytest.mark.parametrize("wrapped", [
+        f"```\n{FULL_RESPONSE}\n```",
+        f"  ```json{FULL_RESPONSE}```\n",
+        f"\n{FULL_RESPONSE}\n",
+    ])
+    def test_fence_variants_are_stripped(self, wrapped):
+        client = MockLLMClient([wrapped])
+        result = SubmissionExtractor(client).extract("text")
+        assert result.status == ExtractionStatus.SUCCESS
+        assert client.call_count == 1
+
     def test_all_retries_exhausted_returns_failed_status(self):
         """Three bad responses → status=FAILED, never raises."""
         client = MockLLMClient(["bad", "also bad", "still bad"])
@@ -221,7 +290,7 @@ class TestRetryBehaviour:
 
 
 # --------------------------------------------------------------------------- #
-# 5. _missing_fields helper                                                    #
+# 5. missing_fields helper                                                     #
 # --------------------------------------------------------------------------- #
 
 
@@ -230,9 +299,436 @@ class TestMissingFields:
         sub = ExtractedSubmission(
             company_name="X", revenue=Decimal("1"), industry="Y", state="CA"
         )
-        assert _missing_fields(sub) == []
+        assert missing_fields(sub) == []
 
     def test_returns_missing_field_names(self):
         sub = ExtractedSubmission(company_name="X", revenue=None, industry=None, state="CA")
-        missing = _missing_fields(sub)
+        missing = missing_fields(sub)
         assert set(missing) == {"revenue", "industry"}
+
+    def test_missing_fields_are_reported_in_schema_order(self):
+        sub = ExtractedSubmission()
+        assert missing_fields(sub) == ["company_name", "revenue", "industry", "state"]
+
+
+# --------------------------------------------------------------------------- #
+# 6. Concurrent extraction — extract_many                                      #
+# --------------------------------------------------------------------------- #
+
+
+class TestExtractMany:
+    def test_results_are_returned_in_input_order(self):
+        texts = [f"text {i}" for i in range(5)]
+        client = MockAsyncLLMClient(FULL_RESPONSE)
+        results = asyncio.run(SubmissionExtractor(client).extract_many(texts))
+
+        assert [r.source_text for r in results] == texts
+        assert all(r.status == ExtractionStatus.SUCCESS for r in results)
+
+    def test_concurrency_bound_is_respected(self):
+        client = MockAsyncLLMClient(FULL_RESPONSE)
+        extractor = SubmissionExtractor(client)
+        asyncio.run(extractor.extract_many([f"t{i}" for i in range(10)], concurrency=3))
+
+        assert client.call_count == 10
+        assert 1 < client.peak_in_flight <= 3   # calls overlapped, but bounded
+
+    def test_sync_client_is_supported_via_threads(self):
+        client = MockLLMClient(["bad json", FULL_RESPONSE])
+        results = asyncio.run(
+            SubmissionExtractor(client, max_retries=2).extract_many(["text"])
+        )
+
+        assert results[0].status == ExtractionStatus.SUCCESS
+        assert client.call_count == 2   # JSON retry loop still applies
+
+    def test_duck_typed_client_needs_no_base_class(self):
+        """LLMClient is a Protocol: an SDK wrapper need not inherit from it."""
+
+        class PlainClient:
+            def complete(self, system, user, cache=True):
+                return FULL_RESPONSE
+
+        result = SubmissionExtractor(PlainClient()).extract("text")
+        assert result.status == ExtractionStatus.SUCCESS
+
+    def test_empty_input_returns_empty_list(self):
+        client = MockAsyncLLMClient(FULL_RESPONSE)
+        assert asyncio.run(SubmissionExtractor(client).extract_many([])) == []
+
+
+# --------------------------------------------------------------------------- #
+# 7. Response cache                                                            #
+# --------------------------------------------------------------------------- #
+
+
+class TestResponseCache:
+    def test_repeated_text_is_served_from_cache(self):
+        client = MockLLMClient([FULL_RESPONSE])
+        extractor = SubmissionExtractor(client)
+        first = extractor.extract("same text")
+        second = extractor.extract("same text")
+
+        assert client.call_count == 1
+        assert second.status == ExtractionStatus.SUCCESS
+        assert second.extracted == first.extracted
+
+    def test_cache_disabled_always_calls_client(self):
+        client = MockLLMClient([FULL_RESPONSE, FULL_RESPONSE])
+        extractor = SubmissionExtractor(client, cache=False)
+        extractor.extract("same text")
+        extractor.extract("same text")
+        assert client.call_count == 2
+
+    def test_least_recently_used_entry_is_evicted(self):
+        client = MockLLMClient([FULL_RESPONSE] * 4)
+        extractor = SubmissionExtractor(client, cache_size=2)
+        extractor.extract("a")
+        extractor.extract("b")
+        extractor.extract("a")   # hit — "a" becomes most recent
+        extractor.extract("c")   # evicts "b"
+        assert client.call_count == 3
+
+        extractor.extract("b")   # miss — was evicted
+        assert client.call_count == 4
+
+    def test_rejected_reply_is_not_replayed_on_the_next_extract(self):
+        client = MockLLMClient(["bad", "still bad", FULL_RESPONSE])
+        extractor = SubmissionExtractor(client, max_retries=2)
+        assert extractor.extract("Acme").status == ExtractionStatus.FAILED
+
+        second = extractor.extract("Acme")
+        assert second.status == ExtractionStatus.SUCCESS   # reached the model again
+        assert client.call_count == 3
+
+    def test_rejected_async_reply_is_not_cached(self):
+        client = MockAsyncLLMClient("not json")
+        extractor = SubmissionExtractor(client, max_retries=1)
+        asyncio.run(extractor.extract_many(["Acme"]))
+        asyncio.run(extractor.extract_many(["Acme"]))
+        assert client.call_count == 2
+
+    def test_cached_bad_reply_is_not_replayed_for_next_attempt(self):
+        """Attempts 2 and 3 share a user message; the attempt number keeps them apart."""
+        client = MockLLMClient(["bad", "still bad", FULL_RESPONSE])
+        result = SubmissionExtractor(client, max_retries=3).extract("text")
+        assert result.status == ExtractionStatus.SUCCESS
+        assert client.call_count == 3
+
+
+# --------------------------------------------------------------------------- #
+# 8. Deterministic pre-fill                                                    #
+# --------------------------------------------------------------------------- #
+
+
+BROKER_EMAIL = (
+    "Submission for Acme Corp, 100 Main St, Dallas, TX 75201. "
+    "Manufacturing business doing about $4.5M in annual revenue."
+)
+
+
+class TestRegexPrefill:
+    def test_address_and_revenue_are_prefilled(self):
+        assert _regex_prefill(BROKER_EMAIL) == {
+            "state": "TX",
+            "zip_code": "75201",
+            "revenue": Decimal("4500000"),
+        }
+
+    @pytest.mark.parametrize(
+        "text, skipped_field",
+        [
+            ("Revenue $5M, requested limit $1M", "revenue"),                   # two amounts
+            ("Offices in Dallas, TX 75201 and Austin, TX 78701", "state"),     # two addresses
+            ("Acme IT services in 75201", "state"),                         # 'IT' is no address
+            ("Acme Retail, seeking $1M limit, Dallas, TX 75201", "revenue"),   # not revenue
+        ],
+    )
+    def test_ambiguous_text_is_left_to_the_llm(self, text, skipped_field):
+        assert skipped_field not in _regex_prefill(text)
+
+    def test_revenue_needs_a_revenue_word_in_the_same_clause(self):
+        assert _regex_prefill("Annual sales: $2 million")["revenue"] == Decimal("2000000")
+        assert _regex_prefill("Revenue is $4.5M. Limit requested: $1M.")["revenue"] == Decimal("4500000")
+        assert "revenue" not in _regex_prefill("Strong revenue growth.\nSeeking a $1M limit.")
+
+    def test_prompt_asks_only_for_remaining_fields(self):
+        client = MockLLMClient([_json_response(company_name="Acme Corp", industry="Manufacturing")])
+        result = SubmissionExtractor(client).extract(BROKER_EMAIL)
+
+        user = client._mock.call_args_list[0][0][1]
+        assert user.startswith("Extract only: company_name, industry\n")
+        assert result.status == ExtractionStatus.SUCCESS
+        assert result.extracted.state == "TX"
+        assert result.extracted.zip_code == "75201"
+        assert result.extracted.revenue == Decimal("4500000")
+
+    def test_requested_fields_reads_back_the_prompt_header(self):
+        client = MockLLMClient([_json_response(company_name="Acme Corp", industry="Manufacturing")])
+        SubmissionExtractor(client).extract(BROKER_EMAIL)
+
+        user = client._mock.call_args_list[0][0][1]
+        assert requested_fields(user) == ("company_name", "industry")
+        assert requested_fields("plain text") == REQUIRED_FIELDS
+
+    def test_prefilled_fields_win_over_llm_output(self):
+        client = MockLLMClient([_json_response(
+            company_name="Acme Corp", industry="Manufacturing", state="CA", revenue=1,
+        )])
+        result = SubmissionExtractor(client).extract(BROKER_EMAIL)
+        assert result.extracted.state == "TX"
+        assert result.extracted.revenue == Decimal("4500000")
+
+
+# --------------------------------------------------------------------------- #
+# 9. Batched prompts — extract_batch                                           #
+# --------------------------------------------------------------------------- #
+
+
+def _array_response(*items: dict) -> str:
+    return json.dumps(list(items))
+
+
+FULL_ITEM = json.loads(FULL_RESPONSE)
+
+
+class TestExtractBatch:
+    def test_one_llm_call_per_batch(self):
+        client = MockLLMClient([_array_response(FULL_ITEM, FULL_ITEM, FULL_ITEM)])
+        results = SubmissionExtractor(client).extract_batch(["a", "b", "c"])
+
+        assert client.call_count == 1
+        assert [r.source_text for r in results] == ["a", "b", "c"]
+        assert all(r.status == ExtractionStatus.SUCCESS for r in results)
+
+        user = client._mock.call_args_list[0][0][1]
+        assert "[1] a\n[2] b\n[3] c" in user
+
+    def test_texts_are_split_into_batch_size_packs(self):
+        client = MockLLMClient([
+            _array_response(FULL_ITEM, FULL_ITEM),
+            _array_response(FULL_ITEM),
+        ])
+        results = SubmissionExtractor(client, batch_size=2).extract_batch(["a", "b", "c"])
+        assert client.call_count == 2
+        assert len(results) == 3
+
+    def test_wrong_array_length_triggers_retry(self):
+        client = MockLLMClient([
+            _array_response(FULL_ITEM),                 # 1 item for 2 texts
+            _array_response(FULL_ITEM, FULL_ITEM),
+        ])
+        results = SubmissionExtractor(client, max_retries=2).extract_batch(["a", "b"])
+
+        assert client.call_count == 2
+        assert "REMINDER" in client._mock.call_args_list[1][0][1]
+        assert all(r.status == ExtractionStatus.SUCCESS for r in results)
+
+    def test_invalid_item_is_retried_alone(self):
+        """A schema-invalid element falls back to extract() for that text only."""
+        client = MockLLMClient([
+            _array_response(FULL_ITEM, "not an object"),
+            FULL_RESPONSE,   # single-item retry for "b"
+        ])
+        results = SubmissionExtractor(client).extract_batch(["a", "b"])
+
+        assert client.call_count == 2
+        assert client._mock.call_args_list[1][0][1] == "b"
+        assert results[0].status == ExtractionStatus.SUCCESS
+        assert results[1].status == ExtractionStatus.SUCCESS
+
+    def test_unparseable_batch_falls_back_to_single_extraction(self):
+        client = MockLLMClient(["nope", "still nope", FULL_RESPONSE, FULL_RESPONSE])
+        results = SubmissionExtractor(client, max_retries=2).extract_batch(["a", "b"])
+
+        assert client.call_count == 4
+        assert all(r.status == ExtractionStatus.SUCCESS for r in results)
+
+    def test_empty_input_makes_no_calls(self):
+        client = MockLLMClient([])
+        assert SubmissionExtractor(client).extract_batch([]) == []
+        assert client.call_count == 0
+
+
+# --------------------------------------------------------------------------- #
+# 10. Provider Batch API backend — BatchLLMClient                              #
+# --------------------------------------------------------------------------- #
+
+
+class FakeBatchTransport:
+    """
+    In-memory BatchTransport. Each job completes after `polls` polls;
+    `responder` maps a request to its completion text, or None to simulate
+    a per-request error in the job.
+    """
+
+    def __init__(self, responder, polls: int = 1) -> None:
+        self._responder = responder
+        self._polls = polls
+        self.jobs: list[list[BatchRequest]] = []
+        self._poll_counts: dict[str, int] = {}
+
+    def submit(self, requests):
+        self.jobs.append(list(requests))
+        batch_id = f"batch-{len(self.jobs)}"
+        self._poll_counts[batch_id] = 0
+        return batch_id
+
+    def is_complete(self, batch_id):
+        self._poll_counts[batch_id] += 1
+        return self._poll_counts[batch_id] >= self._polls
+
+    def results(self, batch_id):
+        job = self.jobs[int(batch_id.split("-")[1]) - 1]
+        texts = {r.custom_id: self._responder(r) for r in job}
+        return {cid: text for cid, text in texts.items() if text is not None}
+
+
+class TestBatchLLMClient:
+    def _client(self, transport) -> BatchLLMClient:
+        return BatchLLMClient(transport, linger=0, poll_interval=0)
+
+    def test_concurrent_calls_share_one_batch_job(self):
+        transport = FakeBatchTransport(lambda r: FULL_RESPONSE, polls=3)
+        extractor = SubmissionExtractor(self._client(transport))
+        texts = [f"text {i}" for i in range(5)]
+        results = asyncio.run(extractor.extract_many(texts, concurrency=len(texts)))
+
+        assert len(transport.jobs) == 1
+        assert [r.user for r in transport.jobs[0]] == texts
+        assert all(r.status == ExtractionStatus.SUCCESS for r in results)
+
+    def test_errored_request_is_retried_in_next_job(self):
+        seen: set[str] = set()
+
+        def responder(request):
+            if request.user == "flaky" and request.user not in seen:
+                seen.add(request.user)
+                return None   # provider reported this request as errored
+            return FULL_RESPONSE
+
+        transport = FakeBatchTransport(responder)
+        extractor = SubmissionExtractor(self._client(transport), max_retries=2)
+        results = asyncio.run(extractor.extract_many(["ok", "flaky"], concurrency=2))
+
+        assert len(transport.jobs) == 2
+        assert len(transport.jobs[1]) == 1                 # only the errored text
+        assert "REMINDER" in transport.jobs[1][0].user     # sent as attempt 2
+        assert all(r.status == ExtractionStatus.SUCCESS for r in results)
+
+    def test_max_batch_size_splits_jobs(self):
+        transport = FakeBatchTransport(lambda r: FULL_RESPONSE)
+        client = BatchLLMClient(transport, max_batch_size=2, linger=0, poll_interval=0)
+        texts = [f"t{i}" for i in range(4)]
+        asyncio.run(SubmissionExtractor(client).extract_many(texts, concurrency=4))
+
+        assert [len(job) for job in transport.jobs] == [2, 2]
+
+
+# --------------------------------------------------------------------------- #
+# 11. Streaming early abort                                                    #
+# --------------------------------------------------------------------------- #
+
+
+class MockStreamingLLMClient(MockLLMClient):
+    """Streams each response in 8-char chunks and records how far each stream got."""
+
+    def __init__(self, responses: list[str]) -> None:
+        super().__init__(responses)
+        self.chunks_read: list[int] = []
+        self.closed: list[bool] = []
+
+    def stream(self, system: str, user: str, cache: bool = True):
+        response = self._mock(system, user)
+        index = len(self.chunks_read)
+        self.chunks_read.append(0)
+        self.closed.append(False)
+        try:
+            for i in range(0, len(response), 8):
+                self.chunks_read[index] += 1
+                yield response[i:i + 8]
+        finally:
+            self.closed[index] = True
+
+
+class TestStreamingEarlyAbort:
+    def test_prose_prefix_aborts_stream_and_retries(self):
+        prose = "Sure, here is the JSON you asked for: " + FULL_RESPONSE
+        client = MockStreamingLLMClient([prose, FULL_RESPONSE])
+        result = SubmissionExtractor(client).extract("text")
+
+        assert result.status == ExtractionStatus.SUCCESS
+        assert client.chunks_read[0] == 1          # abandoned after the first chunk
+        assert client.closed[0] is True
+
+    def test_fenced_reply_is_streamed_to_completion(self):
+        client = MockStreamingLLMClient([f"```json\n{FULL_RESPONSE}\n```"])
+        result = SubmissionExtractor(client).extract("text")
+
+        assert result.status == ExtractionStatus.SUCCESS
+        assert client.call_count == 1
+
+    def test_leading_whitespace_chunks_do_not_trigger_abort(self):
+        client = MockStreamingLLMClient([" " * 20 + FULL_RESPONSE])
+        result = SubmissionExtractor(client).extract("text")
+        assert result.status == ExtractionStatus.SUCCESS
+
+    def test_streaming_is_used_from_extract_many(self):
+        client = MockStreamingLLMClient(["I cannot help with that.", FULL_RESPONSE])
+        results = asyncio.run(SubmissionExtractor(client).extract_many(["text"]))
+
+        assert results[0].status == ExtractionStatus.SUCCESS
+        assert client.chunks_read[0] == 1
+
+
+# --------------------------------------------------------------------------- #
+# 12. Tiered client — cheap model first, strong model on escalation            #
+# --------------------------------------------------------------------------- #
+
+
+class TestTieredLLMClient:
+    def test_complete_cheap_reply_never_reaches_strong_tier(self):
+        cheap, strong = MockLLMClient([FULL_RESPONSE]), MockLLMClient([])
+        result = SubmissionExtractor(TieredLLMClient(cheap, strong)).extract("text")
+
+        assert result.status == ExtractionStatus.SUCCESS
+        assert (cheap.call_count, strong.call_count) == (1, 0)
+
+    def test_partial_cheap_reply_escalates_in_same_attempt(self):
+        cheap, strong = MockLLMClient([PARTIAL_RESPONSE]), MockLLMClient([FULL_RESPONSE])
+        result = SubmissionExtractor(TieredLLMClient(cheap, strong)).extract("text")
+
+        assert result.status == ExtractionStatus.SUCCESS
+        assert (cheap.call_count, strong.call_count) == (1, 1)
+
+    def test_unparseable_cheap_reply_escalates(self):
+        cheap, strong = MockLLMClient(["not json"]), MockLLMClient([FULL_RESPONSE])
+        result = SubmissionExtractor(TieredLLMClient(cheap, strong)).extract("text")
+        assert result.status == ExtractionStatus.SUCCESS
+        assert strong.call_count == 1
+
+    def test_cheap_tier_exception_escalates(self):
+        cheap = MockLLMClient([RuntimeError("model not loaded")])
+        strong = MockLLMClient([FULL_RESPONSE])
+        result = SubmissionExtractor(TieredLLMClient(cheap, strong)).extract("text")
+        assert result.status == ExtractionStatus.SUCCESS
+
+    def test_min_fields_lowers_the_bar(self):
+        cheap, strong = MockLLMClient([PARTIAL_RESPONSE]), MockLLMClient([])
+        client = TieredLLMClient(cheap, strong, min_fields=3)
+        result = SubmissionExtractor(client).extract("text")
+
+        assert result.status == ExtractionStatus.PARTIAL
+        assert strong.call_count == 0
+
+    def test_prefilled_fields_are_not_counted_against_cheap_reply(self):
+        """The prompt only asked for the non-pre-filled fields."""
+        cheap_reply = _json_response(
+            company_name="Acme Corp", revenue=None, industry="Manufacturing",
+            state=None, zip_code=None,
+        )
+        cheap, strong = MockLLMClient([cheap_reply]), MockLLMClient([])
+        result = SubmissionExtractor(TieredLLMClient(cheap, strong)).extract(BROKER_EMAIL)
+
+        assert result.status == ExtractionStatus.SUCCESS
+        assert strong.call_count == 0
@@ -0,0 +1,92 @@
+"""
+TieredLLMClient — try a cheap model first, escalate to a strong one.
+
+The problem it solves:
+  Most broker submissions are short and regular enough that a small model
+  (a local 1-3B GGUF via llama-cpp-python, or a cheap hosted tier) extracts
+  every field correctly. Paying frontier-model prices for those is waste;
+  only the ambiguous residue needs the strong model.
+
+How it fits the extractor:
+  TieredLLMClient is itself an LLMClient, so the extractor does not change:
+
+      client = TieredLLMClient(cheap=LocalLlamaClient(), strong=AnthropicClient())
+      extractor = SubmissionExtractor(client)
+
+  Each complete() call goes to the cheap client first. Its reply is parsed
+  and validated on the spot, with the same steps the extractor uses. It is
+  returned only if it covers at least `min_fields` of the required fields
+  the prompt asked for. Otherwise the same prompt goes to the strong client,
+  in the same attempt. A cheap reply that fails to parse therefore costs
+  one cheap call, not a whole retry.
+
+  The default `min_fields` is every requested required field, so escalation
+  only triggers on replies that would have come back PARTIAL or FAILED —
+  accepting the cheap tier never lowers the result status. Lower it to
+  trade quality for cost.
+
+  Batched prompts (extract_batch) are accepted only if every item in the
+  array passes; a pack with one weak item goes to the strong client whole.
+"""
+
+import logging
+from typing import Optional
+
+import orjson
+from pydantic import ValidationError
+
+from extractor import LLMClient, missing_fields, requested_fields, strip_fences
+from models import ExtractedSubmission
+
+logger = logging.getLogger(__name__)
+
+
+class TieredLLMClient:
+    """LLMClient that answers from `cheap` when its reply is good enough, else `strong`."""
+
+    __slots__ = ("_cheap", "_strong", "_min_fields")
+
+    def __init__(
+        self,
+        cheap: LLMClient,
+        strong: LLMClient,
+        *,
+        min_fields: Optional[int] = None,
+    ) -> None:
+        self._cheap = cheap
+        self._strong = strong
+        # None → every requested required field must be present.
+        self._min_fields = min_fields
+
+    def complete(self, system: str, user: str, cache: bool = True) -> str:
+        try:
+            raw = self._cheap.complete(system, user, cache)
+        except Exception as exc:
+            # A local model crashing is an escalation, not an extraction failure.
+            logger.warning("Cheap tier raised %s — escalating", exc)
+        else:
+            if self._good_enough(raw, user):
+                return raw
+            logger.info("Cheap tier reply below coverage threshold — escalating")
+        return self._strong.complete(system, user, cache)
+
+    # ------------------------------------------------------------------ #
+    # Private                                                              #
+    # ------------------------------------------------------------------ #
+
+    def _good_enough(self, raw: str, user: str) -> bool:
+        requested = requested_fields(user)
+        needed = len(requested)
+        if self._min_fields is not None:
+            needed = min(self._min_fields, needed)
+        try:
+            data = orjson.loads(strip_fences(raw))
+            items = data if isinstance(data, list) else [data]
+            for item in items:
+                missing = set(missing_fields(ExtractedSubmission.model_validate(item)))
+                if sum(field not in missing for field in requested) < needed:
+                    return False
+        except (orjson.JSONDecodeError, ValidationError, ValueError):
+            return False
+        return True
+
@@ -10,10 +10,13 @@ What is an idempotency store?
 Production backend:
   Replace InMemoryIdempotencyStore with Redis:
 
-      RESULT=$(redis-cli SET idempotency:{key} {result} EX 86400 NX)
+      RESULT=$(redis-cli SET idempotency:{key.hex()} {result} EX 86400 NX)
       # NX = "set only if Not eXists" — atomic check-and-set
       # EX 86400 = expire after 24 hours (prevents unbounded growth)
 
+  Keys are raw 32-byte digests; redis-py accepts bytes directly, and
+  key.hex() gives the text form for SQL or the CLI.
+
   The NX flag is critical. Without it, two simultaneous requests with the
   same key could both pass the "not exists" check and both process — a
   race condition. Redis NX makes the check-and-set atomic.
@@ -24,18 +27,56 @@ Production backend:
       RETURNING result;
 
 Thread safety:
-  InMemoryIdempotencyStore uses a threading.Lock so it is safe for
-  concurrent use within a single process. This is equivalent to Redis NX
-  for the single-process case.
+  InMemoryIdempotencyStore is safe for concurrent use within a single
+  process. Keys are spread over a fixed number of shards by hash, and each
+  shard is a dict with its own threading.Lock, so threads working on
+  different keys rarely contend. A key always maps to the same shard, so
+  set_if_absent stays an atomic check-and-set for that key. This is
+  equivalent to Redis NX for the single-process case.
+
+  On a regular (GIL) CPython build the reads skip the shard locks: dict.get
+  and `in` each run as a single C call under the GIL. That atomicity is a
+  CPython implementation detail. Free-threaded builds (3.13+,
+  sys._is_gil_enabled() is False) lose it, and the store falls back to
+  taking the shard lock around every operation. set_if_absent always takes
+  the lock. A lock-free setdefault could only tell a win by identity,
+  `setdefault(key, value) is value`, and two callers passing the same
+  object would then both win.
+
+Bounded memory:
+  InMemoryIdempotencyStore keeps every key it has ever seen, so a
+  long-lived worker grows without limit. BoundedLRUIdempotencyStore caps
+  the entry count and evicts the least recently used key — the in-process
+  counterpart of Redis with maxmemory-policy allkeys-lru. An evicted key
+  is simply processed again on its next delivery, so the bound should
+  comfortably exceed the number of distinct payloads expected within the
+  broker's redelivery window.
+
+  ttl_seconds adds the Redis EX counterpart: a key older than the TTL is
+  treated as unseen. Expiry is lazy, as in Redis. An expired key is
+  dropped when it is next touched, or falls off the LRU end like any other
+  entry, so no sweeper thread is needed. stats() reports the size and how
+  many keys have been evicted or expired, for dashboards.
 """
 
+import math
+import sys
 import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Generic, Optional, TypeVar
 
 T = TypeVar("T")
 
 
+def _gil_enabled() -> bool:
+    """True unless running on a free-threaded build with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)   # 3.13+
+    return is_gil_enabled is None or is_gil_enabled()
+
+
 class IdempotencyStore(ABC, Generic[T]):
     """
     Minimal interface for an idempotency backend.
@@ -45,12 +86,12 @@ class IdempotencyStore(ABC, Generic[T]):
     """
 
     @abstractmethod
-    def get(self, key: str) -> Optional[T]:
+    def get(self, key: bytes) -> Optional[T]:
         """Return the stored result for this key, or None if unseen."""
         ...
 
     @abstractmethod
-    def set_if_absent(self, key: str, value: T) -> bool:
+    def set_if_absent(self, key: bytes, value: T) -> bool:
         """
         Store the result only if the key does not already exist.
 
@@ -62,7 +103,7 @@ class IdempotencyStore(ABC, Generic[T]):
         ...
 
     @abstractmethod
-    def exists(self, key: str) -> bool:
+    def exists(self, key: bytes) -> bool:
         """Return whether this key has been seen before."""
         ...
 
@@ -79,27 +120,151 @@ class InMemoryIdempotencyStore(IdempotencyStore[T]):
       - Restarts (state is lost)
     """
 
-    def __init__(self) -> None:
-        self._store: dict[str, T] = {}
-        # A single lock covers both the read and write in set_if_absent,
-        # making the check-then-set sequence atomic within the process.
+    # Power of two, so a shard is picked with a mask instead of a modulo.
+    DEFAULT_SHARDS = 32
+
+    def __init__(self, shards: int = DEFAULT_SHARDS) -> None:
+        if shards < 1 or shards & (shards - 1):
+            raise ValueError(f"shards must be a power of two, got {shards}")
+        self._mask = shards - 1
+        self._stores: tuple[dict[bytes, T], ...] = tuple({} for _ in range(shards))
+        # One lock per shard covers both the read and write in
+        # set_if_absent, making check-then-set atomic for every key in it.
+        self._locks = tuple(threading.Lock() for _ in range(shards))
+        # Checked once. A free-threaded build may turn the GIL back on later,
+        # but never off again, so the locked path is always safe to keep.
+        self._lock_free = _gil_enabled()
+
+    def _bucket(self, key: bytes) -> tuple[dict[bytes, T], threading.Lock]:
+        """Return the shard holding this key and the lock guarding it."""
+        index = hash(key) & self._mask
+        return self._stores[index], self._locks[index]
+
+    def get(self, key: bytes) -> Optional[T]:
+        shard, lock = self._bucket(key)
+        if self._lock_free:
+            return shard.get(key)
+        with lock:
+            return shard.get(key)
+
+    def set_if_absent(self, key: bytes, value: T) -> bool:
+        shard, lock = self._bucket(key)
+        if self._lock_free and key in shard:
+            return False       # already exists — no lock needed to say so
+        # Locked on every build: only the lock tells the first caller apart
+        # when two callers pass the very same value object.
+        with lock:
+            if key in shard:
+                return False
+            shard[key] = value
+            return True        # stored for the first time
+
+    def exists(self, key: bytes) -> bool:
+        shard, lock = self._bucket(key)
+        if self._lock_free:
+            return key in shard
+        with lock:
+            return key in shard
+
+    def __len__(self) -> int:
+        if self._lock_free:
+            return sum(map(len, self._stores))
+        total = 0
+        for shard, lock in zip(self._stores, self._locks):
+            with lock:
+                total += len(shard)
+        return total
+
+
+@dataclass(frozen=True, slots=True)
+class StoreStats:
+    """Point-in-time counters for a BoundedLRUIdempotencyStore."""
+    size: int          # entries held, including expired ones not yet dropped
+    maxsize: int
+    evictions: int     # dropped to stay within maxsize
+    expirations: int   # dropped because they outlived ttl_seconds
+
+
+class BoundedLRUIdempotencyStore(IdempotencyStore[T]):
+    """
+    Thread-safe in-memory store holding at most `maxsize` keys.
+
+    get() marks a key as recently used; set_if_absent() evicts the least
+    recently used keys once the store is over capacity. Every operation
+    is O(1) under one lock, and that lock only ever covers dict ops: the
+    store is never called with it held around user code. Each method is
+    atomic on its own, so nothing here depends on how the caller
+    coordinates. IdempotentProcessor holds a stripe lock only to look up
+    and claim a key; it keeps other threads off that key while it
+    processes through its in-flight table, not through this store.
+
+    With ttl_seconds set, a key expires that long after it was stored
+    (86_400 matches the Redis EX in the module docstring). A read does not
+    extend it. None, the default, keeps keys until they are evicted.
+    """
+
+    DEFAULT_MAXSIZE = 100_000
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        *,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError(f"ttl_seconds must be positive, got {ttl_seconds}")
+        self._maxsize = maxsize
+        self._ttl = math.inf if ttl_seconds is None else ttl_seconds
+        # key → (expires_at on the time.monotonic clock, value)
+        self._store: OrderedDict[bytes, tuple[float, T]] = OrderedDict()
         self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
 
-    def get(self, key: str) -> Optional[T]:
+    def get(self, key: bytes) -> Optional[T]:
         with self._lock:
-            return self._store.get(key)
+            if not self._live(key):
+                return None
+            self._store.move_to_end(key)
+            return self._store[key][1]
 
-    def set_if_absent(self, key: str, value: T) -> bool:
+    def set_if_absent(self, key: bytes, value: T) -> bool:
         with self._lock:
-            if key in self._store:
-                return False   # already exists — do not overwrite
-            self._store[key] = value
-            return True        # stored for the first time
+            if self._live(key):
+                return False
+            self._store[key] = (time.monotonic() + self._ttl, value)
+            while len(self._store) > self._maxsize:
+                self._store.popitem(last=False)   # least recently used
+                self._evictions += 1
+            return True
 
-    def exists(self, key: str) -> bool:
+    def exists(self, key: bytes) -> bool:
+        # A membership check is not a use — it does not refresh the key.
         with self._lock:
-            return key in self._store
+            return self._live(key)
+
+    def stats(self) -> StoreStats:
+        with self._lock:
+            return StoreStats(
+                size=len(self._store),
+                maxsize=self._maxsize,
+                evictions=self._evictions,
+                expirations=self._expirations,
+            )
 
     def __len__(self) -> int:
         with self._lock:
             return len(self._store)
+
+    def _live(self, key: bytes) -> bool:
+        """Whether key is held and unexpired; drops it if expired. Caller holds the lock."""
+        entry = self._store.get(key)
+        if entry is None:
+            return False
+        if entry[0] <= time.monotonic():
+            del self._store[key]
+            self._expirations += 1
+            return False
+        return True
@@ -13,15 +13,24 @@ Senior testing patterns demonstrated:
 import sys
 import threading
 import time
+from decimal import Decimal
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import orjson
 import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from processor import IdempotentProcessor, compute_idempotency_key
-from store import InMemoryIdempotencyStore
+import processor as processor_module
+from processor import (
+    CLIENT_KEY_FIELD,
+    IdempotentProcessor,
+    compute_idempotency_key,
+    idempotency_key_from_canonical,
+)
+import store as store_module
+from store import BoundedLRUIdempotencyStore, InMemoryIdempotencyStore, StoreStats
 
 
 # --------------------------------------------------------------------------- #
@@ -29,8 +38,10 @@ from store import InMemoryIdempotencyStore
 # --------------------------------------------------------------------------- #
 
 
-@pytest.fixture()
-def store() -> InMemoryIdempotencyStore:
+@pytest.fixture(params=["lock_free", "locked"])
+def store(request, monkeypatch) -> InMemoryIdempotencyStore:
+    # "locked" is the path a free-threaded (no-GIL) build takes.
+    monkeypatch.setattr(store_module, "_gil_enabled", lambda: request.param == "lock_free")
     return InMemoryIdempotencyStore()
 
 
@@ -95,6 +106,30 @@ class TestIdempotencyKey:
             != compute_idempotency_key(payload_b, exclude_fields=frozenset())
         )
 
+    def test_key_is_raw_32_byte_digest(self):
+        key = compute_idempotency_key(PAYLOAD)
+        assert isinstance(key, bytes) and len(key) == 32
+
+    def test_nested_key_order_does_not_affect_key(self):
+        a = {**PAYLOAD, "address": {"city": "Dallas", "state": "TX"}}
+        b = {**PAYLOAD, "address": {"state": "TX", "city": "Dallas"}}
+        assert compute_idempotency_key(a) == compute_idempotency_key(b)
+
+    def test_non_json_native_values_are_supported(self):
+        payload = {**PAYLOAD, "revenue": Decimal("5000000.00"), 1: "int key"}
+        assert compute_idempotency_key(payload) == compute_idempotency_key(dict(payload))
+
+    def test_integers_beyond_64_bits_are_supported(self):
+        payload = {**PAYLOAD, "revenue": 2**70}
+        assert compute_idempotency_key(payload) == compute_idempotency_key(dict(payload))
+        assert compute_idempotency_key(payload) != compute_idempotency_key({**PAYLOAD, "revenue": 2**70 + 1})
+
+    def test_big_int_fallback_writes_the_same_canonical_form(self):
+        payload = {**PAYLOAD, "address": {"state": "TX", "city": "Dallas"}, "note": "café"}
+        in_range = orjson.dumps({**payload, "revenue": 12345}, option=orjson.OPT_SORT_KEYS)
+        expected = in_range.replace(b"12345", str(2**70).encode())
+        assert processor_module._canonical_json({**payload, "revenue": 2**70}) == expected
+
 
 # --------------------------------------------------------------------------- #
 # 2. InMemoryIdempotencyStore                                                  #
@@ -103,23 +138,126 @@ class TestIdempotencyKey:
 
 class TestInMemoryStore:
     def test_get_returns_none_for_unseen_key(self, store):
-        assert store.get("nonexistent") is None
+        assert store.get(b"nonexistent") is None
 
     def test_set_if_absent_stores_value(self, store):
-        stored = store.set_if_absent("key1", "result")
+        stored = store.set_if_absent(b"key1", "result")
         assert stored is True
-        assert store.get("key1") == "result"
+        assert store.get(b"key1") == "result"
 
     def test_set_if_absent_does_not_overwrite(self, store):
-        store.set_if_absent("key1", "first")
-        stored_again = store.set_if_absent("key1", "second")
+        store.set_if_absent(b"key1", "first")
+        stored_again = store.set_if_absent(b"key1", "second")
         assert stored_again is False
-        assert store.get("key1") == "first"  # original value preserved
+        assert store.get(b"key1") == "first"  # original value preserved
 
     def test_exists_reflects_storage(self, store):
-        assert store.exists("k") is False
-        store.set_if_absent("k", "v")
-        assert store.exists("k") is True
+        assert store.exists(b"k") is False
+        store.set_if_absent(b"k", "v")
+        assert store.exists(b"k") is True
+
+    def test_set_if_absent_rejects_the_same_value_object_twice(self, store):
+        value = object()
+        assert store.set_if_absent(b"k", value) is True
+        assert store.set_if_absent(b"k", value) is False
+
+    def test_same_value_object_racing_in_wins_only_once(self, monkeypatch):
+        """Another caller stores the same object between our check and our set."""
+        monkeypatch.setattr(store_module, "_gil_enabled", lambda: True)
+        store = InMemoryIdempotencyStore(shards=1)
+        value = object()
+        wins = []
+
+        class RacingShard(dict):
+            raced = False
+
+            def __contains__(self, key):
+                if not self.raced:
+                    self.raced = True
+                    wins.append(store.set_if_absent(key, value))   # the other caller
+                    return False                                  # checked before it stored
+                return super().__contains__(key)
+
+        store._stores = (RacingShard(),)
+        wins.append(store.set_if_absent(b"k", value))
+        assert wins == [True, False]
+
+    def test_len_counts_keys_across_shards(self):
+        store = InMemoryIdempotencyStore(shards=4)
+        for i in range(50):
+            store.set_if_absent(f"key-{i}".encode(), i)
+        assert len(store) == 50
+        assert sum(map(len, store._stores)) == 50
+        assert sum(1 for shard in store._stores if shard) > 1   # keys really are spread
+
+    def test_single_shard_behaves_like_one_dict(self):
+        store = InMemoryIdempotencyStore(shards=1)
+        assert store.set_if_absent(b"a", 1) is True
+        assert store.set_if_absent(b"a", 2) is False
+        assert store.get(b"a") == 1 and len(store) == 1
+
+    @pytest.mark.parametrize("shards", [0, 3, 24])
+    def test_shard_count_must_be_power_of_two(self, shards):
+        with pytest.raises(ValueError, match="power of two"):
+            InMemoryIdempotencyStore(shards=shards)
+
+
+class TestBoundedLRUStore:
+    def test_evicts_least_recently_used_beyond_maxsize(self):
+        store = BoundedLRUIdempotencyStore(maxsize=2)
+        store.set_if_absent(b"a", 1)
+        store.set_if_absent(b"b", 2)
+        store.get(b"a")               # a is now more recent than b
+        store.set_if_absent(b"c", 3)
+
+        assert len(store) == 2
+        assert store.get(b"b") is None
+        assert store.get(b"a") == 1 and store.get(b"c") == 3
+
+    def test_set_if_absent_does_not_overwrite(self):
+        store = BoundedLRUIdempotencyStore(maxsize=2)
+        assert store.set_if_absent(b"k", "first") is True
+        assert store.set_if_absent(b"k", "second") is False
+        assert store.get(b"k") == "first"
+
+    def test_rejects_non_positive_maxsize(self):
+        with pytest.raises(ValueError):
+            BoundedLRUIdempotencyStore(maxsize=0)
+
+    def test_key_expires_after_ttl(self, monkeypatch):
+        clock = MagicMock(return_value=1000.0)
+        monkeypatch.setattr(store_module.time, "monotonic", clock)
+        store = BoundedLRUIdempotencyStore(maxsize=10, ttl_seconds=60)
+        store.set_if_absent(b"k", "first")
+
+        clock.return_value = 1059.0
+        assert store.get(b"k") == "first"       # reads do not extend the TTL
+        clock.return_value = 1060.0
+        assert store.exists(b"k") is False
+        assert store.set_if_absent(b"k", "second") is True
+        assert store.get(b"k") == "second"
+
+    def test_stats_count_evictions_and_expirations(self, monkeypatch):
+        clock = MagicMock(return_value=0.0)
+        monkeypatch.setattr(store_module.time, "monotonic", clock)
+        store = BoundedLRUIdempotencyStore(maxsize=2, ttl_seconds=10)
+        for key in (b"a", b"b", b"c"):          # c evicts a
+            store.set_if_absent(key, 1)
+        clock.return_value = 10.0
+        store.get(b"b")                          # expired on access
+
+        assert store.stats() == StoreStats(size=1, maxsize=2, evictions=1, expirations=1)
+
+    def test_rejects_non_positive_ttl(self):
+        with pytest.raises(ValueError):
+            BoundedLRUIdempotencyStore(ttl_seconds=0)
+
+    def test_evicted_key_is_processed_again(self, mock_fn):
+        processor = IdempotentProcessor(BoundedLRUIdempotencyStore(maxsize=1), mock_fn)
+        processor.process(PAYLOAD)
+        processor.process({**PAYLOAD, "company_id": "OTHER-002"})   # evicts PAYLOAD
+        assert processor.process(PAYLOAD).was_replay is False
+        assert mock_fn.call_count == 3
 
 
 # --------------------------------------------------------------------------- #
@@ -149,13 +287,52 @@ class TestIdempotentProcessor:
 
     def test_idempotency_key_is_returned_in_record(self, processor):
         record = processor.process(PAYLOAD)
-        assert len(record.idempotency_key) == 64  # SHA-256 hex = 64 chars
+        assert len(record.idempotency_key) == 32  # raw 256-bit digest
 
     def test_replayed_key_matches_original_key(self, processor):
         record1 = processor.process(PAYLOAD)
         record2 = processor.process(PAYLOAD)
         assert record1.idempotency_key == record2.idempotency_key
 
+    def test_process_with_key_shares_dedup_with_process(self, processor, mock_fn):
+        key = compute_idempotency_key(PAYLOAD)
+        first = processor.process_with_key(key, PAYLOAD)
+        second = processor.process(PAYLOAD)
+
+        assert first.was_replay is False and second.was_replay is True
+        mock_fn.assert_called_once()
+
+    def test_client_supplied_key_skips_hash(self, processor, mock_fn):
+        supplied = "ab" * 32
+        payload = {**PAYLOAD, CLIENT_KEY_FIELD: supplied}
+        with patch("processor.compute_idempotency_key") as compute:
+            first = processor.process(payload)
+            second = processor.process({**payload, "amount": "changed"})
+
+        compute.assert_not_called()
+        assert len(first.idempotency_key) == 32
+        assert second.was_replay is True   # the client's key, not the content, decides
+        mock_fn.assert_called_once()
+
+    def test_client_key_equal_to_a_content_digest_does_not_replay_it(self, processor, mock_fn):
+        victim = processor.process(PAYLOAD)
+        forged = {"company_id": "OTHER-002", CLIENT_KEY_FIELD: victim.idempotency_key.hex()}
+        record = processor.process(forged)
+
+        assert record.was_replay is False
+        assert record.idempotency_key != victim.idempotency_key
+        assert mock_fn.call_count == 2
+
+    @pytest.mark.parametrize("supplied", ["abc", "zz" * 32, "ab " * 21 + "a", 42])
+    def test_malformed_client_key_is_rejected(self, processor, mock_fn, supplied):
+        with pytest.raises(ValueError, match=CLIENT_KEY_FIELD):
+            processor.process({**PAYLOAD, CLIENT_KEY_FIELD: supplied})
+        mock_fn.assert_not_called()
+
+    def test_key_from_canonical_bytes_matches_computed_key(self):
+        canonical = orjson.dumps(PAYLOAD, option=orjson.OPT_SORT_KEYS)
+        assert idempotency_key_from_canonical(canonical) == compute_idempotency_key(PAYLOAD)
+
     def test_excluded_field_does_not_cause_reprocessing(self, processor, mock_fn):
         """A delivery-level field change must NOT trigger reprocessing."""
         processor.process(PAYLOAD)
@@ -222,3 +399,71 @@ class TestConcurrency:
             t.join()
 
         assert mock_fn.call_count == 5   # each unique payload processed exactly once
+
+    def test_lock_stripes_are_fixed_and_stable_per_key(self, processor):
+        """Seeing many keys must not allocate locks; a key always maps to one stripe."""
+        keys = [compute_idempotency_key({**PAYLOAD, "company_id": f"C-{i}"}) for i in range(1000)]
+        locks = {id(processor._get_stripe(k)[0]) for k in keys}
+
+        assert len(locks) <= IdempotentProcessor.LOCK_STRIPES
+        assert processor._get_stripe(keys[0])[0] is processor._get_stripe(keys[0])[0]
+
+    def test_slow_key_does_not_block_another_key_on_its_stripe(self, store):
+        """Stripe locks are not held while processor_fn runs."""
+        release = threading.Event()
+        slow = PAYLOAD
+
+        def fn(payload: dict) -> str:
+            if payload is slow:
+                assert release.wait(timeout=5)
+            return payload["company_id"]
+
+        processor = IdempotentProcessor(store, fn)
+        slow_lock, slow_in_flight = processor._get_stripe(compute_idempotency_key(slow))
+        fast = next(
+            p for p in ({**PAYLOAD, "company_id": f"C-{i}"} for i in range(1000))
+            if processor._get_stripe(compute_idempotency_key(p))[0] is slow_lock
+        )
+
+        worker = threading.Thread(target=processor.process, args=(slow,))
+        worker.start()
+        try:
+            assert processor.process(fast).result == fast["company_id"]   # not stuck
+            assert worker.is_alive()
+        finally:
+            release.set()
+            worker.join()
+        assert not slow_in_flight   # the finished key was unregistered
+
+    def test_waiter_takes_over_when_the_owner_fails(self, store):
+        started, release = threading.Event(), threading.Event()
+        calls, errors, records = [], [], []
+
+        def fn(payload: dict) -> str:
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                started.set()
+                release.wait(timeout=5)
+                raise RuntimeError("owner failed")
+            return "ok"
+
+        processor = IdempotentProcessor(store, fn)
+
+        def run() -> None:
+            try:
+                records.append(processor.process(PAYLOAD))
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        owner = threading.Thread(target=run, name="owner")
+        owner.start()
+        assert started.wait(timeout=5)
+        waiter = threading.Thread(target=run, name="waiter")
+        waiter.start()
+        release.set()
+        owner.join()
+        waiter.join()
+
+        assert calls == ["owner", "waiter"]   # the waiter re-claimed the key
+        assert len(errors) == 1
+        assert records[0].result == "ok" and records[0].was_replay is False
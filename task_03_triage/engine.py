@@ -8,23 +8,240 @@ Key design decisions:
      submission never poisons the batch.
   3. Python's logging module (not print) is used throughout.  Callers can
      configure handlers/formatters however they like.
+  4. DispatchRuleEngine flattens (industry, state) rules into one dict so a
+     large rule set costs one or two lookups per submission, not R calls.
+  5. Callers that do not care which of several firing rules supplies the
+     reason can pass reorder=True to run the chain cheapest-per-decision
+     first (CostedRule.cost / selectivity), as a query planner reorders
+     predicates.
+  6. BatchTriageEngine turns the loop inside out for batches: rule-major
+     instead of submission-major, so each rule sweeps a column of the
+     still-undecided submissions in one call.
+  7. Replays are common (redelivered messages, re-run batches), so process()
+     keeps an LRU of results keyed on a SHA-256 of the canonical
+     (sorted-keys) payload, as task_02 does for idempotency. A hit skips both
+     validation and the rule chain. Sound only because rules are pure
+     functions of the Submission (see Rule.evaluate).
+  8. The default chain is what nearly every engine runs, so it is compiled
+     once into a closure that inlines the three guards (revenue band in
+     int cents, sanctioned-set lookup, Construction/NY) and only calls a
+     rule's evaluate() when that rule is about to fire — which is where
+     its reason text comes from. Any other chain takes the generic loop.
+  9. process_batch_bulk validates an in-memory batch with one
+     TypeAdapter(list[Submission]) call and drops back to per-item
+     validation only when that raises, so a clean batch never pays
+     for per-record dispatch and a dirty one still makes partial progress.
 """
 
 import logging
-from typing import Iterable, Iterator, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from models import Submission, TriagedSubmission, TriageStatus
 from rules import (
     ConstructionNewYorkRule,
     RevenueOutOfAppetiteRule,
     Rule,
+    RuleResult,
     SanctionedIndustryRule,
 )
 
 logger = logging.getLogger(__name__)
 
+# Built once: the list schema is compiled at import, not per batch.
+_BATCH_ADAPTER: TypeAdapter[list[Submission]] = TypeAdapter(list[Submission])
+
+
+class DispatchRuleEngine:
+    """
+    A composite Rule that replaces R sequential evaluate() calls with a
+    dict lookup for every rule that can describe itself as a table.
+
+    At construction each rule is classified:
+      - has dispatch_table() → its (industry, state) entries go into one dict
+      - otherwise (e.g. numeric revenue thresholds) → kept as a predicate
+        and evaluated in order
+
+    First-match-wins is preserved: every table entry remembers the position
+    of the rule that produced it, and a predicate only runs if it sits
+    before the best table hit.
+
+    Usage — it is itself a Rule, so it drops into SubmissionTriage:
+        engine = SubmissionTriage(rules=[DispatchRuleEngine(my_rules)])
+    """
+
+    __slots__ = ("_table", "_predicates")
+
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self._table: dict[tuple[str, Optional[str]], tuple[int, RuleResult]] = {}
+        # (position, bound evaluate) — bound once, not looked up per submission
+        self._predicates: list[tuple[int, Callable[[Submission], Optional[RuleResult]]]] = []
+        for position, rule in enumerate(rules):
+            dispatch_table = getattr(rule, "dispatch_table", None)
+            if dispatch_table is None:
+                self._predicates.append((position, rule.evaluate))
+                continue
+            for key, result in dispatch_table().items():
+                # setdefault: an earlier rule claiming the same key wins
+                self._table.setdefault(key, (position, result))
+
+    def evaluate(self, submission: Submission) -> Optional[RuleResult]:
+        industry = submission.industry
+        exact = self._table.get((industry, submission.state))
+        wildcard = self._table.get((industry, None))
+        hit = min(filter(None, (exact, wildcard)), key=_position, default=None)
+
+        for position, evaluate in self._predicates:
+            if hit is not None and position > hit[0]:
+                break
+            result = evaluate(submission)
+            if result is not None:
+                return result
+        return hit[1] if hit is not None else None
+
+
+def _position(entry: tuple[int, RuleResult]) -> int:
+    return entry[0]
+
+
+class BatchTriageEngine:
+    """
+    Triage a batch of already-validated submissions rule by rule.
+
+    SubmissionTriage walks each submission through the whole chain. Here
+    each rule is applied once to every submission no earlier rule has
+    decided, using the fastest form the rule offers:
+      - evaluate_column() (ColumnRule)     → one call for the whole column
+      - dispatch_table() (KeyedRule)       → one dict lookup per row
+      - evaluate() only                    → the plain per-row call
+    First-match-wins is unchanged: a row leaves the working set as soon as
+    a rule fires for it, so later rules never see it.
+
+    Usage:
+        results = BatchTriageEngine().triage(submissions)   # list, input order
+    """
+
+    __slots__ = ("_rules",)
+
+    def __init__(self, rules: Optional[Sequence[Rule]] = None) -> None:
+        self._rules = rules if rules is not None else SubmissionTriage._DEFAULT_RULES
+
+    def triage(self, submissions: Sequence[Submission]) -> list[TriagedSubmission]:
+        decided: list[Optional[RuleResult]] = [None] * len(submissions)
+        pending = list(range(len(submissions)))
+
+        for rule in self._rules:
+            if not pending:
+                break
+            column = [submissions[i] for i in pending]
+            still_pending = []
+            for i, result in zip(pending, _evaluate_column(rule, column)):
+                if result is None:
+                    still_pending.append(i)
+                else:
+                    decided[i] = result
+            fired = len(pending) - len(still_pending)
+            if fired:
+                logger.info(
+                    "Rule %s fired for %d/%d submissions",
+                    type(rule).__name__, fired, len(pending),
+                )
+            pending = still_pending
+
+        return [
+            TriagedSubmission(submission=submission, status=TriageStatus.APPROVED)
+            if result is None
+            else TriagedSubmission(
+                submission=submission, status=result.status, reason=result.reason
+            )
+            for submission, result in zip(submissions, decided)
+        ]
+
+
+# A replay cache key: the payload's items in key order, each value tagged
+# with its type so 1, 1.0, True and "1" never share an entry.
+_PayloadKey = tuple[tuple[str, type, object], ...]
+
+
+def _payload_key(raw: dict) -> Optional[_PayloadKey]:
+    """
+    Cache key for a flat payload: its sorted (field, type, value) triples.
+
+    Sorting makes key order irrelevant, as in task_02's idempotency key,
+    but there is nothing to serialise or hash into a digest — building the
+    tuple costs a fraction of a json.dumps. None if the payload has an
+    unhashable value (a nested dict or list) or mixed-type keys; such
+    payloads are simply not cached.
+    """
+    try:
+        key = tuple(sorted((k, v.__class__, v) for k, v in raw.items()))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _detached(result: TriagedSubmission) -> TriagedSubmission:
+    """
+    A copy of a cached result that shares no mutable state with it.
+
+    Every Submission and TriagedSubmission field is an immutable scalar
+    (str, Decimal, enum, None), so copying the two model levels is as good
+    as model_copy(deep=True) at a third of its cost.
+    """
+    return result.model_copy(update={"submission": result.submission.model_copy()})
+
+
+def _index_rules(
+    rules: Sequence[Rule],
+) -> tuple[dict[tuple[str, Optional[str]], tuple[int, ...]], tuple[int, ...]]:
+    """
+    Split a chain into keyed rules, indexed by every (industry, state) key
+    they fire on, and the positions of every other rule. Positions, not
+    rules, are stored so first-match-wins order can be restored by sorting.
+    """
+    index: dict[tuple[str, Optional[str]], list[int]] = {}
+    unindexed: list[int] = []
+    for position, rule in enumerate(rules):
+        dispatch_table = getattr(rule, "dispatch_table", None)
+        if dispatch_table is None:
+            unindexed.append(position)
+            continue
+        for key in dispatch_table():
+            index.setdefault(key, []).append(position)
+    return {key: tuple(p) for key, p in index.items()}, tuple(unindexed)
+
+
+# Assumed for rules that do not implement CostedRule.
+_DEFAULT_COST = 1.0
+_DEFAULT_SELECTIVITY = 0.05
+
+
+def _expected_cost(rule: Rule) -> float:
+    """Work spent per decision made — the CostedRule sort key (stable for ties)."""
+    cost = getattr(rule, "cost", _DEFAULT_COST)
+    selectivity = getattr(rule, "selectivity", _DEFAULT_SELECTIVITY)
+    return cost / selectivity if selectivity > 0 else float("inf")
+
+
+def _evaluate_column(
+    rule: Rule, column: Sequence[Submission]
+) -> list[Optional[RuleResult]]:
+    evaluate_column = getattr(rule, "evaluate_column", None)
+    if evaluate_column is not None:
+        return evaluate_column(column)
+    dispatch_table = getattr(rule, "dispatch_table", None)
+    if dispatch_table is not None:
+        table = dispatch_table()
+        return [
+            table.get((s.industry, s.state)) or table.get((s.industry, None))
+            for s in column
+        ]
+    return [rule.evaluate(s) for s in column]
+
 
 class SubmissionTriage:
     """
@@ -41,15 +258,48 @@ class SubmissionTriage:
 
     # Default production rule chain — order matters.
     # Revenue check runs first because it's the fastest/cheapest filter.
-    _DEFAULT_RULES: list[Rule] = [
+    # A tuple: shared by every default engine, so nobody can append to it.
+    _DEFAULT_RULES: tuple[Rule, ...] = (
         RevenueOutOfAppetiteRule(),
         SanctionedIndustryRule(),
         ConstructionNewYorkRule(),
-    ]
+    )
+
+    # Replay cache off by default: a hit only pays off for payloads that
+    # actually repeat, and every miss adds a key and a copy.
+    DEFAULT_CACHE_SIZE = 0
 
-    def __init__(self, rules: Optional[list[Rule]] = None) -> None:
+    def __init__(
+        self,
+        rules: Optional[Sequence[Rule]] = None,
+        *,
+        reorder: bool = False,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
         # Allow callers to override the chain (e.g., in tests or A/B experiments)
         self._rules = rules if rules is not None else self._DEFAULT_RULES
+        # The chain is fixed for the engine's lifetime, so cached results never
+        # go stale. Opt-in: keep cache_size=0 for impure rules.
+        self._cache: OrderedDict[_PayloadKey, TriagedSubmission] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        # Opt-in: reordering can change WHICH rule decides a submission that
+        # several rules would fire on, so the given order is kept by default.
+        if reorder:
+            self._rules = sorted(self._rules, key=_expected_cost)
+        # Keyed rules are reached through an (industry, state) index, so a
+        # submission only runs the keyed rules that could fire on it.
+        self._index, self._unindexed = _index_rules(self._rules)
+        # Bound once: the hot loop calls evaluators[i](sub) with no per-call
+        # attribute lookup on the rule.
+        self._evaluators = tuple(rule.evaluate for rule in self._rules)
+        # The untouched default chain gets its specialised closure; identity,
+        # not equality, so a caller-built copy of the defaults stays generic.
+        self._first_fired: _FirstFired = (
+            _compile_default_chain(self._rules)
+            if self._rules is self._DEFAULT_RULES
+            else self._first_fired_generic
+        )
 
     # ------------------------------------------------------------------ #
     # Public API                                                           #
@@ -62,10 +312,22 @@ class SubmissionTriage:
         Returns None (and logs) if validation fails — caller's batch loop
         can safely continue to the next item.
         """
+        key = _payload_key(raw) if self._cache_size else None
+        if key is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.debug("Triage cache hit for company_id=%r", raw.get("company_id"))
+                # A copy, so a caller mutating its result — or the
+                # submission nested inside it — cannot edit the cache.
+                return _detached(cached)
+
         submission = self._parse(raw)
         if submission is None:
-            return None
-        return self._apply_rules(submission)
+            return None   # not cached: a bad payload should log every time
+        result = self._apply_rules(submission)
+        if key is not None:
+            self._cache_put(key, _detached(result))
+        return result
 
     def process_batch(self, raws: Iterable[dict]) -> Iterator[TriagedSubmission]:
         """
@@ -79,10 +341,49 @@ class SubmissionTriage:
             results = list(engine.process_batch(submissions))
             approved = [r for r in results if r.status == TriageStatus.APPROVED]
         """
+        # Bound once, outside the loop. Without a cache there is nothing for
+        # process() to add, so the loop goes straight to parse + rules.
+        if self._cache_size:
+            process = self.process
+            for raw in raws:
+                result = process(raw)
+                if result is not None:
+                    yield result
+            return
+        parse, apply = self._parse, self._apply_rules
         for raw in raws:
-            result = self.process(raw)
-            if result is not None:
-                yield result
+            submission = parse(raw)
+            if submission is not None:
+                yield apply(submission)
+
+    def process_batch_bulk(self, raws: Sequence[dict]) -> list[TriagedSubmission]:
+        """
+        Same results as list(process_batch(raws)), validated as one list.
+
+        The whole batch goes through one TypeAdapter(list[Submission]) call,
+        so validation runs in a single pydantic-core pass. If any item is
+        invalid that pass raises, and the batch falls back to per-item
+        validation. Valid items still come back and bad ones are logged,
+        as in process_batch. Bypasses the result cache (neither read nor
+        written), so it suits fresh batches rather than replays.
+        """
+        try:
+            submissions = _BATCH_ADAPTER.validate_python(raws)
+        except ValidationError:
+            submissions = [s for s in map(self._parse, raws) if s is not None]
+        return list(map(self._apply_rules, submissions))
+
+    def process_batch_columnar(self, raws: Iterable[dict]) -> list[TriagedSubmission]:
+        """
+        Same results as list(process_batch(raws)), computed rule-major.
+
+        Validates everything first (skipping and logging invalid items, as
+        process_batch does), then lets BatchTriageEngine sweep each rule
+        over the whole column. Worth it for large in-memory batches;
+        for streams, process_batch keeps memory at O(1).
+        """
+        submissions = [s for s in map(self._parse, raws) if s is not None]
+        return BatchTriageEngine(self._rules).triage(submissions)
 
     # ------------------------------------------------------------------ #
     # Private helpers                                                      #
@@ -93,28 +394,99 @@ class SubmissionTriage:
             return Submission.model_validate(raw)
         except ValidationError as exc:
             # Log a structured error but never re-raise — keep the batch alive.
-            logger.error(
-                "Validation failed for submission id=%r: %s",
-                raw.get("company_id", "UNKNOWN"),
-                exc.errors(include_url=False),  # include_url=False keeps logs clean
-            )
+            # Gated: exc.errors() builds the whole error list eagerly, which a
+            # validation storm would pay for even with ERROR filtered out.
+            if logger.isEnabledFor(logging.ERROR):
+                logger.error(
+                    "Validation failed for submission id=%r: %s",
+                    raw.get("company_id", "UNKNOWN"),
+                    exc.errors(include_url=False),  # include_url=False keeps logs clean
+                )
             return None
 
-    def _apply_rules(self, submission: Submission) -> TriagedSubmission:
-        for rule in self._rules:
-            result = rule.evaluate(submission)
+    def _cache_get(self, key: _PayloadKey) -> Optional[TriagedSubmission]:
+        with self._cache_lock:
+            result = self._cache.get(key)
             if result is not None:
-                logger.info(
-                    "Rule %s fired for company_id=%r → %s",
-                    type(rule).__name__,
-                    submission.company_id,
-                    result.status.value,
-                )
-                return TriagedSubmission(
-                    submission=submission,
-                    status=result.status,
-                    reason=result.reason,
-                )
+                self._cache.move_to_end(key)   # mark as most recently used
+            return result
+
+    def _cache_put(self, key: _PayloadKey, result: TriagedSubmission) -> None:
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)   # evict least recently used
+
+    def _candidate_positions(self, submission: Submission) -> Sequence[int]:
+        """Chain positions of the rules that could fire on this submission, in order."""
+        index = self._index
+        industry = submission.industry
+        exact = index.get((industry, submission.state), ())
+        wildcard = index.get((industry, None), ())
+        if exact or wildcard:
+            return sorted({*self._unindexed, *exact, *wildcard})
+        return self._unindexed   # the common case: no keyed rule applies
+
+    def _first_fired_generic(self, submission: Submission) -> Optional[tuple[int, RuleResult]]:
+        evaluators = self._evaluators
+        for position in self._candidate_positions(submission):
+            result = evaluators[position](submission)
+            if result is not None:
+                return position, result
+        return None
+
+    def _apply_rules(self, submission: Submission) -> TriagedSubmission:
+        fired = self._first_fired(submission)
+        if fired is not None:
+            position, result = fired
+            logger.info(
+                "Rule %s fired for company_id=%r → %s",
+                type(self._rules[position]).__name__,
+                submission.company_id,
+                result.status.value,
+            )
+            return TriagedSubmission(
+                submission=submission,
+                status=result.status,
+                reason=result.reason,
+            )
 
         logger.debug("No rules fired for company_id=%r → APPROVED", submission.company_id)
         return TriagedSubmission(submission=submission, status=TriageStatus.APPROVED)
+
+
+# (chain position, result) of the first rule that fires, or None.
+_FirstFired = Callable[[Submission], Optional[tuple[int, RuleResult]]]
+
+
+def _compile_default_chain(rules: Sequence[Rule]) -> _FirstFired:
+    """
+    SubmissionTriage._DEFAULT_RULES as one function with the guards inlined.
+
+    Must agree with the generic loop over the same chain — the tests run
+    both. Each guard is the rule's own fast check; when it passes, the
+    rule's evaluate() builds the result, so reasons are never duplicated.
+    """
+    revenue, sanctioned, construction = rules
+    low, high = revenue._min_cents, revenue._max_cents
+    evaluate_revenue = revenue.evaluate
+    evaluate_sanctioned = sanctioned.evaluate
+    evaluate_construction = construction.evaluate
+    sanctioned_industries = sanctioned.sanctioned
+    ny_variants = construction._NY_VARIANTS
+
+    def first_fired(submission: Submission) -> Optional[tuple[int, RuleResult]]:
+        cents = submission.revenue_cents
+        if cents is None or not low <= cents <= high:
+            result = evaluate_revenue(submission)
+            if result is not None:
+                return 0, result
+        industry = submission.industry
+        if industry in sanctioned_industries:
+            return 1, evaluate_sanctioned(submission)
+        if industry == "Construction" and submission.state in ny_variants:
+            return 2, evaluate_construction(submission)
+        return None
+
+    return first_fired
@@ -8,30 +8,89 @@ Why Strategy?
   - Each rule is independently unit-testable.
 
 Pattern shape:
-  Rule (ABC)            ← abstract interface
+  Rule (Protocol)       ← structural interface
     └── evaluate(sub)   ← returns RuleResult | None
           None  = rule did not fire; engine tries the next rule.
           RuleResult = rule fired; engine returns this decision immediately.
+
+Why Protocol rather than ABC?
+  The engine only ever calls rule.evaluate(). Any object with that method
+  is a rule — no base class, no ABCMeta, no registration. Concrete rules
+  here declare __slots__ so each instance is a couple of pointers rather
+  than a per-instance __dict__. Subclassing Rule explicitly still works
+  (the tests do it) when you want the type checker to verify conformance.
 """
 
-from abc import ABC, abstractmethod
+import sys
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Optional
+from typing import Final, Optional, Protocol, Sequence
+
+# (industry, state) — state=None means "any state".
+DispatchKey = tuple[str, Optional[str]]
 
-from models import Submission, TriageStatus
+from models import Submission, TriageStatus, to_cents
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RuleResult:
     status: TriageStatus
     reason: str
 
 
-class Rule(ABC):
-    @abstractmethod
+class Rule(Protocol):
     def evaluate(self, submission: Submission) -> Optional[RuleResult]:
-        """Return a RuleResult if this rule fires, None otherwise."""
+        """
+        Return a RuleResult if this rule fires, None otherwise.
+
+        Must be a pure function of `submission`: SubmissionTriage caches
+        results for replayed payloads and will not call it again for them.
+        """
+        ...
+
+
+class KeyedRule(Rule, Protocol):
+    """
+    A rule whose outcome depends only on exact (industry, state) values.
+
+    Such a rule can be flattened into a lookup table once, at engine build
+    time, instead of being evaluated per submission — see DispatchRuleEngine.
+    """
+
+    def dispatch_table(self) -> dict[DispatchKey, RuleResult]:
+        """Every (industry, state) pair this rule fires on, with its result."""
+        ...
+
+
+class CostedRule(Rule, Protocol):
+    """
+    A rule that advertises its own price, so an engine may reorder a chain
+    to run cheap, often-firing rules first (SubmissionTriage(reorder=True)).
+
+    cost        — relative price of one evaluate() call (1.0 = one set lookup)
+    selectivity — estimated fraction of submissions the rule fires on
+
+    cost / selectivity is the expected work spent per decision made; lower
+    runs earlier. Rough estimates are fine — only the relative order matters.
+    """
+
+    cost: float
+    selectivity: float
+
+
+class ColumnRule(Rule, Protocol):
+    """
+    A rule that can judge a whole batch in one call — see BatchTriageEngine.
+
+    evaluate_column() must agree with evaluate() element by element; it
+    exists so the per-row work (method dispatch, attribute lookups on self)
+    is paid once per batch instead of once per submission.
+    """
+
+    def evaluate_column(
+        self, submissions: Sequence[Submission]
+    ) -> list[Optional[RuleResult]]:
+        """One entry per submission: its RuleResult, or None if the rule did not fire."""
         ...
 
 
@@ -39,30 +98,59 @@ class Rule(ABC):
 # Concrete rules                                                               #
 # --------------------------------------------------------------------------- #
 
+# Default appetite band, shared by every RevenueOutOfAppetiteRule that does
+# not override it. Decimal is immutable, so sharing one instance is safe.
+DEFAULT_MIN_REVENUE: Final = Decimal("10000")
+DEFAULT_MAX_REVENUE: Final = Decimal("500000000")
+
 
-class RevenueOutOfAppetiteRule(Rule):
+class RevenueOutOfAppetiteRule:
     """
     Decline submissions whose revenue falls outside the company's appetite.
 
-    Thresholds are instance attributes so tests (and future config) can
-    override them without subclassing.
+    Thresholds are constructor arguments so tests (and future config) can
+    override them without subclassing. Their display form is formatted once
+    here rather than on every decline; treat them as fixed after __init__.
     """
 
+    __slots__ = (
+        "min_revenue", "max_revenue", "_min_display", "_max_display",
+        "_min_cents", "_max_cents",
+    )
+
+    cost = 2.0           # two Decimal comparisons
+    selectivity = 0.05
+
     def __init__(
         self,
-        min_revenue: Decimal = Decimal("10_000"),
-        max_revenue: Decimal = Decimal("500_000_000"),
+        min_revenue: Decimal = DEFAULT_MIN_REVENUE,
+        max_revenue: Decimal = DEFAULT_MAX_REVENUE,
     ) -> None:
         self.min_revenue = min_revenue
         self.max_revenue = max_revenue
+        self._min_display = f"${min_revenue:,}"
+        self._max_display = f"${max_revenue:,}"
+        # Int form of the band for the in-appetite fast path; None disables it.
+        self._min_cents = to_cents(min_revenue)
+        self._max_cents = to_cents(max_revenue)
 
     def evaluate(self, submission: Submission) -> Optional[RuleResult]:
+        # Most submissions are in appetite: decide that with int compares and
+        # only touch the Decimals when the rule is about to fire.
+        cents = submission.revenue_cents
+        if (
+            cents is not None
+            and self._min_cents is not None
+            and self._max_cents is not None
+            and self._min_cents <= cents <= self._max_cents
+        ):
+            return None
         if submission.revenue > self.max_revenue:
             return RuleResult(
                 status=TriageStatus.DECLINED,
                 reason=(
                     f"Revenue ${submission.revenue:,} exceeds the maximum "
-                    f"appetite of ${self.max_revenue:,}."
+                    f"appetite of {self._max_display}."
                 ),
             )
         if submission.revenue < self.min_revenue:
@@ -70,13 +158,24 @@ class RevenueOutOfAppetiteRule(Rule):
                 status=TriageStatus.DECLINED,
                 reason=(
                     f"Revenue ${submission.revenue:,} is below the minimum "
-                    f"appetite of ${self.min_revenue:,}."
+                    f"appetite of {self._min_display}."
                 ),
             )
         return None
 
+    def evaluate_column(
+        self, submissions: Sequence[Submission]
+    ) -> list[Optional[RuleResult]]:
+        # Thresholds and the bound method are hoisted out of the loop; the
+        # comparison itself runs over the revenue column only.
+        low, high, evaluate = self.min_revenue, self.max_revenue, self.evaluate
+        return [
+            evaluate(submission) if not low <= submission.revenue <= high else None
+            for submission in submissions
+        ]
 
-class ConstructionNewYorkRule(Rule):
+
+class ConstructionNewYorkRule:
     """
     Flag Construction submissions in NY for manual review.
 
@@ -86,39 +185,66 @@ class ConstructionNewYorkRule(Rule):
     we accept the written-out form as well for robustness.
     """
 
+    __slots__ = ()
+
+    cost = 2.0           # a string compare and a set lookup
+    selectivity = 0.01
+
     _NY_VARIANTS = frozenset({"NY", "NEW YORK", "NEW YORK STATE"})
 
+    # Immutable, so one instance is shared by every submission that fires it.
+    _RESULT = RuleResult(
+        status=TriageStatus.MANUAL_REVIEW,
+        reason=(
+            "Construction submissions in New York require manual review "
+            "due to complex local regulations (e.g., Labor Law 240/241)."
+        ),
+    )
+
     def evaluate(self, submission: Submission) -> Optional[RuleResult]:
         if (
             submission.industry == "Construction"
             and submission.state in self._NY_VARIANTS
         ):
-            return RuleResult(
-                status=TriageStatus.MANUAL_REVIEW,
-                reason=(
-                    "Construction submissions in New York require manual review "
-                    "due to complex local regulations (e.g., Labor Law 240/241)."
-                ),
-            )
+            return self._RESULT
         return None
 
+    def dispatch_table(self) -> dict[DispatchKey, RuleResult]:
+        return {("Construction", state): self._RESULT for state in self._NY_VARIANTS}
 
-class SanctionedIndustryRule(Rule):
+
+class SanctionedIndustryRule:
     """
     Example of a data-driven rule: decline submissions from industries
     listed in a configurable sanctions list.  This shows how the Strategy
     pattern scales — the rule logic is generic; the data drives behaviour.
     """
 
-    DEFAULT_SANCTIONED = frozenset({"Gambling", "Tobacco", "Weapons Manufacturing"})
+    __slots__ = ("sanctioned",)
+
+    cost = 1.0           # one frozenset lookup
+    selectivity = 0.02
+
+    # Interned, like Submission.industry, so a membership hit compares by
+    # identity before falling back to a character-by-character check.
+    DEFAULT_SANCTIONED = frozenset(
+        map(sys.intern, ("Gambling", "Tobacco", "Weapons Manufacturing"))
+    )
 
     def __init__(self, sanctioned_industries: Optional[frozenset] = None) -> None:
         self.sanctioned = sanctioned_industries or self.DEFAULT_SANCTIONED
 
     def evaluate(self, submission: Submission) -> Optional[RuleResult]:
         if submission.industry in self.sanctioned:
-            return RuleResult(
-                status=TriageStatus.DECLINED,
-                reason=f"Industry '{submission.industry}' is outside our appetite.",
-            )
+            return self._result_for(submission.industry)
         return None
+
+    def dispatch_table(self) -> dict[DispatchKey, RuleResult]:
+        return {(industry, None): self._result_for(industry) for industry in self.sanctioned}
+
+    @staticmethod
+    def _result_for(industry: str) -> RuleResult:
+        return RuleResult(
+            status=TriageStatus.DECLINED,
+            reason=f"Industry '{industry}' is outside our appetite.",
+        )
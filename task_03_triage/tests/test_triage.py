@@ -10,15 +10,17 @@ Senior testing philosophy demonstrated here:
 """
 
 import sys
+import timeit
 from decimal import Decimal
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
 # Make the parent package importable when running pytest from this directory
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from engine import SubmissionTriage
+from engine import BatchTriageEngine, DispatchRuleEngine, SubmissionTriage
 from models import Submission, TriageStatus
 from rules import (
     ConstructionNewYorkRule,
@@ -63,6 +65,11 @@ class TestInputValidation:
         assert result is not None
         assert result.submission.revenue == Decimal("5000000")
 
+    @pytest.mark.parametrize("raw", [" $ 5,000,000 ", "$5,000,000\n", "5\xa0000\xa0000"])
+    def test_dirty_revenue_whitespace_is_stripped(self, engine, valid_raw, raw):
+        valid_raw["revenue"] = raw
+        assert engine.process(valid_raw).submission.revenue == Decimal("5000000")
+
     def test_dirty_revenue_plain_integer_string(self, engine, valid_raw):
         valid_raw["revenue"] = "5000000"
         result = engine.process(valid_raw)
@@ -78,6 +85,12 @@ class TestInputValidation:
         result = engine.process(valid_raw)
         assert result.submission.industry == "Retail"
 
+    def test_normalised_values_are_shared_between_submissions(self, valid_raw):
+        a = Submission.model_validate({**valid_raw, "state": " ny", "industry": "retail "})
+        b = Submission.model_validate({**valid_raw, "state": "Ny", "industry": "RETAIL"})
+        assert (a.state, a.industry) == (b.state, b.industry) == ("NY", "Retail")
+        assert a.state is b.state and a.industry is b.industry
+
     def test_missing_required_field_returns_none(self, engine):
         """A submission missing 'company_name' must be skipped, not crash."""
         result = engine.process({"company_id": "X1", "revenue": 100_000})
@@ -93,6 +106,18 @@ class TestInputValidation:
         result = engine.process(valid_raw)
         assert result is None
 
+    def test_validation_errors_are_not_formatted_when_error_logging_is_off(
+        self, engine, monkeypatch
+    ):
+        import engine as engine_module
+
+        quiet = MagicMock()
+        quiet.isEnabledFor.return_value = False
+        monkeypatch.setattr(engine_module, "logger", quiet)
+
+        assert engine.process({"company_id": "X1", "revenue": "not-a-number"}) is None
+        quiet.error.assert_not_called()
+
     def test_batch_skips_invalid_keeps_valid(self, engine, valid_raw):
         """Invalid submissions must not poison the rest of the batch."""
         bad = {"company_id": "BAD", "revenue": "not-a-number"}
@@ -133,6 +158,50 @@ class TestRevenueRule:
         result = engine.process(valid_raw)
         assert result.status == TriageStatus.DECLINED
 
+    @pytest.mark.parametrize(
+        "revenue, expected_cents",
+        [
+            (5_000_000,      500_000_000),
+            ("$1,000.50",    100_050),
+            ("10000.005",    None),      # sub-cent precision → Decimal path only
+        ],
+    )
+    def test_revenue_cents_is_exact_or_none(self, valid_raw, revenue, expected_cents):
+        valid_raw["revenue"] = revenue
+        assert Submission.model_validate(valid_raw).revenue_cents == expected_cents
+
+    def test_revenue_cents_follows_model_copy_and_assignment(self, valid_raw):
+        submission = Submission.model_validate(valid_raw)
+        assert submission.revenue_cents == 500_000_000
+
+        copied = submission.model_copy(update={"revenue": Decimal("1")})
+        assert copied.revenue_cents == 100
+        assert RevenueOutOfAppetiteRule().evaluate(copied).status == TriageStatus.DECLINED
+
+        submission.revenue = Decimal("1")
+        assert submission.revenue_cents == 100
+        assert RevenueOutOfAppetiteRule().evaluate(submission).status == TriageStatus.DECLINED
+
+    def test_sub_cent_revenue_just_over_max_is_declined(self, engine, valid_raw):
+        valid_raw["revenue"] = "500000000.001"
+        assert engine.process(valid_raw).status == TriageStatus.DECLINED
+
+    def test_default_thresholds_are_shared_between_instances(self):
+        a, b = RevenueOutOfAppetiteRule(), RevenueOutOfAppetiteRule()
+        assert a.min_revenue is b.min_revenue and a.max_revenue is b.max_revenue
+        assert a.min_revenue == Decimal("10000") and a.max_revenue == Decimal("500000000")
+
+    @pytest.mark.parametrize(
+        "revenue, expected_reason",
+        [
+            (600_000_000, "Revenue $600,000,000 exceeds the maximum appetite of $500,000,000."),
+            (5_000,       "Revenue $5,000 is below the minimum appetite of $10,000."),
+        ],
+    )
+    def test_decline_reason_formats_both_amounts(self, engine, valid_raw, revenue, expected_reason):
+        valid_raw["revenue"] = revenue
+        assert engine.process(valid_raw).reason == expected_reason
+
 
 # --------------------------------------------------------------------------- #
 # 3. Construction / New York rule                                              #
@@ -210,6 +279,32 @@ class TestRuleOrdering:
         assert result.status == TriageStatus.DECLINED
 
 
+    def test_given_order_is_preserved_by_default(self):
+        rules = [ConstructionNewYorkRule(), SanctionedIndustryRule()]
+        assert SubmissionTriage(rules=rules)._rules == rules
+
+    def test_reorder_runs_cheapest_per_decision_first(self, valid_raw):
+        class Expensive:
+            cost, selectivity = 100.0, 0.5
+
+            def evaluate(self, submission):
+                return RuleResult(status=TriageStatus.MANUAL_REVIEW, reason="expensive")
+
+        class Cheap:
+            cost, selectivity = 1.0, 0.5
+
+            def evaluate(self, submission):
+                return RuleResult(status=TriageStatus.DECLINED, reason="cheap")
+
+        engine = SubmissionTriage(rules=[Expensive(), Cheap()], reorder=True)
+        assert engine.process(valid_raw).reason == "cheap"
+
+    def test_reorder_keeps_outcomes_for_non_overlapping_rules(self, valid_raw):
+        valid_raw.update(industry="Construction", state="NY")
+        reordered = SubmissionTriage(reorder=True).process(valid_raw)
+        assert reordered.status == TriageStatus.MANUAL_REVIEW
+
+
 # --------------------------------------------------------------------------- #
 # 6. Plugging in a brand-new rule — the Strategy pattern in action             #
 # --------------------------------------------------------------------------- #
@@ -343,3 +438,354 @@ class TestPluggingInANewRule:
         result = engine.process(valid_raw)
 
         assert result.status == TriageStatus.DECLINED
+
+
+# --------------------------------------------------------------------------- #
+# 7. Rule protocol — structural typing, slotted rules                          #
+# --------------------------------------------------------------------------- #
+
+
+class TestRuleProtocol:
+    def test_duck_typed_rule_needs_no_base_class(self, valid_raw):
+        """Rule is a Protocol: any object with evaluate() can be injected."""
+
+        class AlwaysReview:
+            def evaluate(self, submission):
+                return RuleResult(status=TriageStatus.MANUAL_REVIEW, reason="always")
+
+        result = SubmissionTriage(rules=[AlwaysReview()]).process(valid_raw)
+        assert result.status == TriageStatus.MANUAL_REVIEW
+
+    @pytest.mark.parametrize(
+        "rule",
+        [RevenueOutOfAppetiteRule(), SanctionedIndustryRule(), ConstructionNewYorkRule()],
+    )
+    def test_builtin_rules_have_no_instance_dict(self, rule):
+        assert not hasattr(rule, "__dict__")
+
+
+# --------------------------------------------------------------------------- #
+# 8. DispatchRuleEngine — table lookup must match sequential evaluation        #
+# --------------------------------------------------------------------------- #
+
+
+class TestDispatchRuleEngine:
+    @pytest.mark.parametrize(
+        "industry, state, revenue",
+        [
+            ("Construction", "NY",       5_000_000),
+            ("Construction", "new york", 5_000_000),
+            ("Construction", "CA",       5_000_000),
+            ("Gambling",     "NY",       5_000_000),
+            ("Retail",       "NY",       5_000_000),
+            ("Construction", "NY",       600_000_000),   # revenue rule fires first
+            ("Gambling",     "CA",       5_000),
+        ],
+    )
+    def test_matches_sequential_chain(self, valid_raw, industry, state, revenue):
+        valid_raw.update(industry=industry, state=state, revenue=revenue)
+        sequential = SubmissionTriage().process(valid_raw)
+        dispatched = SubmissionTriage(
+            rules=[DispatchRuleEngine(SubmissionTriage._DEFAULT_RULES)]
+        ).process(valid_raw)
+
+        assert dispatched.status == sequential.status
+        assert dispatched.reason == sequential.reason
+
+    def test_earlier_keyed_rule_beats_later_predicate(self, valid_raw):
+        """A predicate placed after a table rule must not pre-empt it."""
+
+        class AlwaysApprove:
+            def evaluate(self, submission):
+                return RuleResult(status=TriageStatus.APPROVED, reason="approve")
+
+        dispatch = DispatchRuleEngine([SanctionedIndustryRule(), AlwaysApprove()])
+        valid_raw["industry"] = "Gambling"
+        result = SubmissionTriage(rules=[dispatch]).process(valid_raw)
+        assert result.status == TriageStatus.DECLINED
+
+    def test_earlier_predicate_beats_later_keyed_rule(self, valid_raw):
+        class AlwaysApprove:
+            def evaluate(self, submission):
+                return RuleResult(status=TriageStatus.APPROVED, reason="approve")
+
+        dispatch = DispatchRuleEngine([AlwaysApprove(), SanctionedIndustryRule()])
+        valid_raw["industry"] = "Gambling"
+        result = SubmissionTriage(rules=[dispatch]).process(valid_raw)
+        assert result.reason == "approve"
+
+
+# --------------------------------------------------------------------------- #
+# 9. BatchTriageEngine — rule-major evaluation must match the per-row chain    #
+# --------------------------------------------------------------------------- #
+
+BATCH_CASES = [
+    ("Construction", "NY",       5_000_000),
+    ("Construction", "NEW YORK", 5_000_000),
+    ("Construction", "CA",       5_000_000),
+    ("Gambling",     "NY",       5_000_000),
+    ("Retail",       "NY",       5_000_000),
+    ("Construction", "NY",       600_000_000),
+    ("Gambling",     "CA",       5_000),
+    ("Retail",       "TX",       10_000),
+]
+
+
+class TestBatchTriageEngine:
+    @pytest.fixture()
+    def submissions(self, valid_raw) -> list[Submission]:
+        return [
+            Submission.model_validate(
+                {**valid_raw, "company_id": f"C-{i}", "industry": industry,
+                 "state": state, "revenue": revenue}
+            )
+            for i, (industry, state, revenue) in enumerate(BATCH_CASES)
+        ]
+
+    def test_matches_sequential_chain(self, submissions):
+        sequential = SubmissionTriage()
+        batch = BatchTriageEngine().triage(submissions)
+
+        assert [r.submission.company_id for r in batch] == [
+            s.company_id for s in submissions
+        ]
+        for submission, result in zip(submissions, batch):
+            expected = sequential.process(submission.model_dump())
+            assert (result.status, result.reason) == (expected.status, expected.reason)
+
+    def test_decided_rows_are_not_seen_by_later_rules(self, submissions):
+        seen: list[str] = []
+
+        class Recorder:
+            def evaluate(self, submission):
+                seen.append(submission.company_id)
+                return None
+
+        BatchTriageEngine(rules=[RevenueOutOfAppetiteRule(), Recorder()]).triage(submissions)
+        # C-5 (too big) and C-6 (too small) were declined by the revenue rule
+        assert "C-5" not in seen and "C-6" not in seen
+        assert len(seen) == len(submissions) - 2
+
+    def test_keyed_rule_is_not_called_per_row(self, submissions):
+        class LookupOnly(SanctionedIndustryRule):
+            __slots__ = ()
+
+            def evaluate(self, submission):
+                raise AssertionError("dispatch_table() should be used instead")
+
+        results = BatchTriageEngine(rules=[LookupOnly()]).triage(submissions)
+        assert sum(r.status == TriageStatus.DECLINED for r in results) == 2
+
+    def test_empty_batch(self):
+        assert BatchTriageEngine().triage([]) == []
+
+    def test_process_batch_columnar_matches_process_batch(self, valid_raw):
+        raws = [
+            {**valid_raw, "company_id": f"C-{i}", "industry": industry,
+             "state": state, "revenue": revenue}
+            for i, (industry, state, revenue) in enumerate(BATCH_CASES)
+        ]
+        raws.insert(3, {"company_id": "BAD"})   # invalid — skipped by both
+
+        expected = list(SubmissionTriage(cache_size=0).process_batch(raws))
+        columnar = SubmissionTriage().process_batch_columnar(raws)
+
+        assert [(r.submission.company_id, r.status, r.reason) for r in columnar] == [
+            (r.submission.company_id, r.status, r.reason) for r in expected
+        ]
+
+    @pytest.mark.parametrize("with_bad_item", [False, True])
+    def test_process_batch_bulk_matches_process_batch(self, valid_raw, with_bad_item):
+        raws = [
+            {**valid_raw, "company_id": f"C-{i}", "industry": industry,
+             "state": state, "revenue": revenue}
+            for i, (industry, state, revenue) in enumerate(BATCH_CASES)
+        ]
+        if with_bad_item:
+            raws.insert(3, {"company_id": "BAD"})   # forces the per-item fallback
+
+        expected = list(SubmissionTriage(cache_size=0).process_batch(raws))
+        bulk = SubmissionTriage().process_batch_bulk(raws)
+
+        assert [(r.submission.company_id, r.status, r.reason) for r in bulk] == [
+            (r.submission.company_id, r.status, r.reason) for r in expected
+        ]
+
+    def test_process_batch_bulk_logs_each_invalid_item(self, valid_raw, caplog):
+        with caplog.at_level("ERROR"):
+            results = SubmissionTriage().process_batch_bulk(
+                [{"company_id": "BAD-1"}, valid_raw, {"company_id": "BAD-2"}]
+            )
+        assert [r.submission.company_id for r in results] == [valid_raw["company_id"]]
+        assert caplog.text.count("Validation failed") == 2
+
+
+# --------------------------------------------------------------------------- #
+# 10. Keyed-rule index inside SubmissionTriage                                 #
+# --------------------------------------------------------------------------- #
+
+
+class CountingSanctionedRule(SanctionedIndustryRule):
+    __slots__ = ("calls",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def evaluate(self, submission):
+        self.calls += 1
+        return super().evaluate(submission)
+
+
+class TestKeyedRuleIndex:
+    def test_keyed_rule_is_skipped_when_no_key_matches(self, valid_raw):
+        rule = CountingSanctionedRule()
+        result = SubmissionTriage(rules=[RevenueOutOfAppetiteRule(), rule]).process(valid_raw)
+
+        assert result.status == TriageStatus.APPROVED
+        assert rule.calls == 0
+
+    def test_keyed_rule_runs_when_its_key_matches(self, valid_raw, caplog):
+        rule = CountingSanctionedRule()
+        valid_raw["industry"] = "Gambling"
+        with caplog.at_level("INFO", logger="engine"):
+            result = SubmissionTriage(rules=[rule]).process(valid_raw)
+
+        assert result.status == TriageStatus.DECLINED
+        assert rule.calls == 1
+        assert "CountingSanctionedRule fired" in caplog.text
+
+    def test_index_preserves_chain_order(self, valid_raw):
+        """An unindexed rule placed before a keyed rule still wins."""
+
+        class AlwaysApprove:
+            def evaluate(self, submission):
+                return RuleResult(status=TriageStatus.APPROVED, reason="approve")
+
+        valid_raw["industry"] = "Gambling"
+        first = SubmissionTriage(rules=[AlwaysApprove(), SanctionedIndustryRule()])
+        last = SubmissionTriage(rules=[SanctionedIndustryRule(), AlwaysApprove()])
+        assert first.process(valid_raw).reason == "approve"
+        assert last.process(valid_raw).status == TriageStatus.DECLINED
+
+
+# --------------------------------------------------------------------------- #
+# 11. Result cache for replayed payloads                                       #
+# --------------------------------------------------------------------------- #
+
+
+# The cache is opt-in; these tests turn it on.
+CACHED = 100
+
+
+class TestResultCache:
+    def test_replayed_payload_skips_the_rule_chain(self, valid_raw):
+        rule = CountingSanctionedRule()
+        engine = SubmissionTriage(rules=[rule], cache_size=CACHED)
+        valid_raw["industry"] = "Gambling"
+
+        first = engine.process(valid_raw)
+        second = engine.process(dict(reversed(valid_raw.items())))   # key order differs
+
+        assert rule.calls == 1
+        assert (second.status, second.reason) == (first.status, first.reason)
+
+    def test_changed_payload_is_evaluated_again(self, valid_raw):
+        rule = CountingSanctionedRule()
+        engine = SubmissionTriage(rules=[rule], cache_size=CACHED)
+        engine.process({**valid_raw, "industry": "Gambling"})
+        engine.process({**valid_raw, "industry": "Tobacco"})
+        assert rule.calls == 2
+
+    def test_cache_is_off_by_default(self, valid_raw):
+        rule = CountingSanctionedRule()
+        engine = SubmissionTriage(rules=[rule])
+        valid_raw["industry"] = "Gambling"
+        engine.process(valid_raw)
+        engine.process(valid_raw)
+        assert rule.calls == 2
+
+    def test_nested_payload_is_not_cached(self, valid_raw):
+        rule = CountingSanctionedRule()
+        engine = SubmissionTriage(rules=[rule], cache_size=CACHED)
+        raw = {**valid_raw, "industry": "Gambling", "tags": ["a"]}
+        engine.process(raw)
+        engine.process(raw)
+        assert rule.calls == 2
+
+    def test_type_of_a_value_is_part_of_the_key(self, valid_raw):
+        engine = SubmissionTriage(cache_size=CACHED)
+        engine.process({**valid_raw, "revenue": 5_000_000})
+        engine.process({**valid_raw, "revenue": 5_000_000.0})
+        engine.process({**valid_raw, "revenue": "5000000"})
+        assert len(engine._cache) == 3
+
+    def test_hit_is_cheaper_than_recomputing(self, valid_raw):
+        cached = SubmissionTriage(cache_size=CACHED)
+        uncached = SubmissionTriage()
+        cached.process(valid_raw)
+        hit = min(timeit.repeat(lambda: cached.process(valid_raw), number=500, repeat=5))
+        full = min(timeit.repeat(lambda: uncached.process(valid_raw), number=500, repeat=5))
+        assert hit < full
+
+    def test_mutating_a_result_does_not_poison_the_cache(self, valid_raw):
+        engine = SubmissionTriage(cache_size=CACHED)
+        engine.process(valid_raw).reason = "tampered"
+        assert engine.process(valid_raw).reason is None
+
+    def test_mutating_the_nested_submission_does_not_poison_the_cache(self, valid_raw):
+        engine = SubmissionTriage(cache_size=CACHED)
+        first = engine.process(valid_raw)
+        state = first.submission.state
+        first.submission.state = "XX"
+        assert engine.process(valid_raw).submission.state == state
+        engine.process(valid_raw).submission.state = "XX"
+        assert engine.process(valid_raw).submission.state == state
+
+    def test_invalid_payload_is_not_cached(self, caplog):
+        engine = SubmissionTriage(cache_size=CACHED)
+        with caplog.at_level("ERROR"):
+            engine.process({"company_id": "X"})
+            engine.process({"company_id": "X"})
+        assert caplog.text.count("Validation failed") == 2
+
+    def test_process_batch_uses_the_cache(self, valid_raw):
+        rule = CountingSanctionedRule()
+        engine = SubmissionTriage(rules=[rule], cache_size=CACHED)
+        valid_raw["industry"] = "Gambling"
+        results = list(engine.process_batch([valid_raw, valid_raw, {"company_id": "X"}]))
+        assert len(results) == 2
+        assert rule.calls == 1
+
+    def test_uncached_process_batch_evaluates_every_item(self, valid_raw):
+        rule = CountingSanctionedRule()
+        engine = SubmissionTriage(rules=[rule], cache_size=0)
+        valid_raw["industry"] = "Gambling"
+        results = list(engine.process_batch([valid_raw, {"company_id": "X"}, valid_raw]))
+        assert [r.status for r in results] == [TriageStatus.DECLINED] * 2
+        assert rule.calls == 2
+
+
+# --------------------------------------------------------------------------- #
+# 12. Compiled default chain must match the generic loop                       #
+# --------------------------------------------------------------------------- #
+
+
+class TestCompiledDefaultChain:
+    def test_default_engine_uses_compiled_chain(self):
+        assert SubmissionTriage()._first_fired.__name__ == "first_fired"
+        copy = SubmissionTriage(rules=list(SubmissionTriage._DEFAULT_RULES))
+        assert copy._first_fired == copy._first_fired_generic
+
+    @pytest.mark.parametrize("industry, state, revenue", BATCH_CASES + [
+        ("Tobacco",      "NY", 600_000_000),
+        ("Construction", "NY", 9_999),
+        ("Retail",       "NY", "500000000.001"),
+    ])
+    def test_matches_generic_loop(self, valid_raw, industry, state, revenue):
+        raw = {**valid_raw, "industry": industry, "state": state, "revenue": revenue}
+        compiled = SubmissionTriage(cache_size=0).process(raw)
+        generic = SubmissionTriage(
+            rules=list(SubmissionTriage._DEFAULT_RULES), cache_size=0
+        ).process(raw)
+        assert (compiled.status, compiled.reason) == (generic.status, generic.reason)
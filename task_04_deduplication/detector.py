@@ -20,6 +20,50 @@ Concept: inverted index — trading memory for lookup speed.
 This is the same idea behind database indexes, Elasticsearch shards, and
 locality-sensitive hashing (LSH).
 
+Sparse ZIPs — merged buckets (opt-in):
+  A 5-digit ZIP with a single record gives the matcher almost nothing to
+  compare against, so a real duplicate filed under a neighbouring ZIP is
+  missed. With min_bucket_size=N, every 5-digit ZIP holding fewer than N
+  records shares one bucket with the other sparse ZIPs in its 3-digit
+  area (the USPS sectional centre). Dense ZIPs keep their own bucket, so
+  the pools stay balanced. Off by default: merging widens which records
+  can match. Oversized buckets need no split — the trigram blocker below
+  already bounds the comparisons per check.
+
+Second blocker — trigrams within the bucket:
+  A busy ZIP bucket still holds ~200 names, and most of them have nothing
+  in common with the candidate. Each bucket also keeps a trigram → rows
+  posting list over its (token-sorted, space-padded) names, and a name is
+  only scored if it shares ≥ 2 trigrams with the candidate — usually a
+  handful of rows instead of the whole bucket.
+
+  This drops no match: a token_sort_ratio ≥ 90 leaves at most a ~10% edit
+  budget, and each edit breaks at most 3 trigrams, so a real match always
+  shares far more than 2. Names too short to have 2 trigrams need 1.
+
+Cross-ZIP matching — rare-token blocking (opt-in):
+  ZIP blocking cannot see a duplicate filed under a different ZIP (a
+  broker who used the mailing address). With cross_zip=True the ZIP is
+  ignored: every record sits in one pool, blocked by a token inverted
+  index instead. A record is scored only if it shares a token with the
+  candidate, and tokens held by more than MAX_TOKEN_POSTINGS records
+  ("insurance", "services") are dropped from the index as
+  non-discriminative, so a check touches the postings of its rare tokens
+  only. The trade-off is recall: unlike the trigram blocker, a typo in
+  every rare token ("Kalepa" → "Kalepaa") shares no token and is missed.
+
+Batch checks — one C call per bucket:
+  check_batch() groups candidates by ZIP bucket and scores each group
+  against its pool with rapidfuzz.process.cdist — the whole
+  candidates × pool matrix in one call (multi-threaded), instead of one
+  extractOne() round-trip through Python per candidate.
+
+  The matrix is uint8 (integer 0–100 scores): an eighth of the memory of
+  float64, which keeps a large candidates × pool matrix in cache. A 90.0
+  threshold does not need sub-integer resolution to *screen*, but the
+  rounded score must not *decide* — so each row's few near-top columns
+  are re-scored exactly, and that exact score is compared and reported.
+
 RapidFuzz scorer — token_sort_ratio:
   Sorts tokens alphabetically before comparing, making "Machines IBM" score
   the same as "IBM Machines".  Better than simple ratio() for company names
@@ -27,9 +71,12 @@ RapidFuzz scorer — token_sort_ratio:
 """
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, Optional
 
+import numpy as np
 from rapidfuzz import fuzz, process
 
 from normalizer import normalise
@@ -38,6 +85,12 @@ logger = logging.getLogger(__name__)
 
 SIMILARITY_THRESHOLD = 90.0   # score in [0, 100]
 ZIP_PREFIX_LENGTH = 5          # first 5 digits of the ZIP code
+SPARSE_PREFIX_LENGTH = 3       # sparse ZIPs share their 3-digit area's bucket
+PARALLEL_MIN_BATCH = 16        # smaller batches are not worth a thread pool
+
+# uint8 scores are rounded to the nearest integer, so a true score that clears
+# SIMILARITY_THRESHOLD can read up to 0.5 lower. Screen 1 point below it.
+_SCREEN_CUTOFF = int(SIMILARITY_THRESHOLD) - 1
 
 
 # --------------------------------------------------------------------------- #
@@ -45,7 +98,7 @@ ZIP_PREFIX_LENGTH = 5          # first 5 digits of the ZIP code
 # --------------------------------------------------------------------------- #
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SubmissionRecord:
     """Lightweight record representing a submission already in the database."""
     company_id: str
@@ -53,7 +106,7 @@ class SubmissionRecord:
     zip_code: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DuplicateMatch:
     """The result of a duplicate check for one candidate."""
     candidate_id: str
@@ -63,6 +116,35 @@ class DuplicateMatch:
     matched_name: Optional[str] = None
 
 
+# Blocking key (trigram or token) → row indices (ascending) into a bucket's names.
+_Postings = dict[str, list[int]]
+
+
+@dataclass(frozen=True, slots=True)
+class _Bucket:
+    """
+    One ZIP bucket, column-wise: row i is names[i] / lengths[i] / records[i].
+
+    The matcher only ever scans `names` and `lengths` — flat lists of str
+    and int, computed once at build time, no attribute access per record —
+    and touches `records` once, for the winner.
+    `keys_of` / `min_shared` say how `postings` blocks: trigrams needing 2
+    in common for ZIP buckets, rare tokens needing 1 for the cross-ZIP pool.
+    """
+    names: list[str]                  # normalised company names
+    lengths: list[int]                # len(names[i]), for the length bound
+    records: list[SubmissionRecord]
+    postings: _Postings
+    keys_of: Callable[[str], set[str]]
+    min_shared: int
+
+MIN_SHARED_TRIGRAMS = 2
+MAX_TOKEN_POSTINGS = 20        # cross_zip: commoner tokens are not indexed
+
+# cross_zip: the single bucket every record and candidate maps to.
+_ALL_ZIPS = "*"
+
+
 # --------------------------------------------------------------------------- #
 # Detector                                                                     #
 # --------------------------------------------------------------------------- #
@@ -78,19 +160,51 @@ class DuplicateDetector:
         match = detector.check(candidate)
         if match.is_potential_duplicate:
             print(f"Duplicate of {match.matched_id} (score={match.similarity_score:.1f})")
+
+    Pass min_bucket_size=N to merge ZIPs with fewer than N records into
+    one bucket per 3-digit area, or cross_zip=True to ignore the ZIP and
+    block on rare name tokens instead.
     """
 
-    def __init__(self, existing: list[SubmissionRecord]) -> None:
+    def __init__(
+        self,
+        existing: list[SubmissionRecord],
+        *,
+        min_bucket_size: Optional[int] = None,
+        cross_zip: bool = False,
+    ) -> None:
+        if cross_zip and min_bucket_size is not None:
+            raise ValueError("min_bucket_size has no effect with cross_zip=True")
+
         # Build the inverted index once at construction time — O(n)
         self._index: dict[str, list[SubmissionRecord]] = {}
         for record in existing:
             bucket_key = self._zip_prefix(record.zip_code)
             self._index.setdefault(bucket_key, []).append(record)
 
+        # Decided once, here: which ZIPs keep their own bucket. None → all.
+        self._cross_zip = cross_zip
+        self._min_bucket_size = min_bucket_size
+        self._dense_prefixes = frozenset(
+            prefix
+            for prefix, records in self._index.items()
+            if min_bucket_size is None or len(records) >= min_bucket_size
+        )
+        grouped: dict[str, list[SubmissionRecord]] = {}
+        for prefix, records in self._index.items():
+            grouped.setdefault(self._bucket_key(prefix), []).extend(records)
+
+        # The existing records never change, so each bucket's names are
+        # normalised here, once, rather than on every check().
+        self._buckets: dict[str, _Bucket] = {
+            bucket_key: _build_bucket(records, by_token=cross_zip)
+            for bucket_key, records in grouped.items()
+        }
+
         logger.info(
             "DuplicateDetector built index: %d records across %d ZIP buckets",
             len(existing),
-            len(self._index),
+            len(self._buckets),
         )
 
     # ------------------------------------------------------------------ #
@@ -107,75 +221,169 @@ class DuplicateDetector:
         Returns:
             DuplicateMatch — always returns an object, never raises.
         """
-        bucket = self._get_bucket(candidate.zip_code)
-        if not bucket:
+        bucket_key = self._bucket_key(self._zip_prefix(candidate.zip_code))
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
             logger.debug(
                 "No records in ZIP bucket '%s' for company_id=%r",
-                self._zip_prefix(candidate.zip_code),
+                bucket_key,
                 candidate.company_id,
             )
-            return DuplicateMatch(
-                candidate_id=candidate.company_id,
-                is_potential_duplicate=False,
-            )
+            return self._no_duplicate(candidate)
 
         return self._fuzzy_match(candidate, bucket)
 
     def check_batch(self, candidates: list[SubmissionRecord]) -> list[DuplicateMatch]:
-        """Check multiple candidates.  Each is independent — no short-circuits."""
-        return [self.check(c) for c in candidates]
+        """
+        Check multiple candidates.  Each is independent — no short-circuits.
+
+        Same results as [self.check(c) for c in candidates], in input order,
+        but each ZIP bucket's candidates are scored in one cdist() call.
+        A batch of at least PARALLEL_MIN_BATCH candidates spread over
+        several buckets checks the buckets on a thread pool.
+        """
+        results: list[Optional[DuplicateMatch]] = [None] * len(candidates)
+        by_bucket: dict[str, list[int]] = {}
+        for position, candidate in enumerate(candidates):
+            bucket_key = self._bucket_key(self._zip_prefix(candidate.zip_code))
+            by_bucket.setdefault(bucket_key, []).append(position)
+
+        if len(candidates) < PARALLEL_MIN_BATCH or len(by_bucket) < 2:
+            for bucket_key, positions in by_bucket.items():
+                self._check_bucket(bucket_key, positions, candidates, results, workers=-1)
+            return results
+
+        # rapidfuzz releases the GIL while scoring, so threads run the C code
+        # in parallel. The buckets are the unit of work and each cdist() stays
+        # single-threaded, so the pool does not oversubscribe the cores. Every
+        # bucket writes only its own positions of `results`; the detector
+        # itself is read-only after __init__, so nothing needs a lock.
+        with ThreadPoolExecutor(max_workers=min(len(by_bucket), os.cpu_count() or 1)) as pool:
+            futures = [
+                pool.submit(self._check_bucket, bucket_key, positions, candidates, results, workers=1)
+                for bucket_key, positions in by_bucket.items()
+            ]
+            for future in futures:
+                future.result()   # re-raise anything a worker raised
+        return results
 
     # ------------------------------------------------------------------ #
     # Private helpers                                                      #
     # ------------------------------------------------------------------ #
 
-    def _get_bucket(self, zip_code: str) -> list[SubmissionRecord]:
-        return self._index.get(self._zip_prefix(zip_code), [])
+    def _check_bucket(
+        self,
+        bucket_key: str,
+        positions: list[int],
+        candidates: list[SubmissionRecord],
+        results: list[Optional[DuplicateMatch]],
+        *,
+        workers: int,
+    ) -> None:
+        """Fill results[p] for every p in positions — one ZIP bucket of check_batch()."""
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            for position in positions:
+                results[position] = self._no_duplicate(candidates[position])
+            return
+        if len(positions) == 1:
+            # A 1×k matrix buys nothing over k direct scorer calls, and cdist's
+            # setup (thread pool, ndarray) would dominate — same path as check().
+            (position,) = positions
+            results[position] = self._fuzzy_match(candidates[position], bucket)
+            return
+
+        queries = [normalise(candidates[p].company_name) for p in positions]
+        # Only columns some candidate in the group shares trigrams with.
+        # Ascending, so ties still go to the first record in the bucket.
+        columns = sorted(set().union(*(_blocked(q, bucket) for q in queries)))
+        # And only columns whose length some query could reach 90 with: the
+        # length bound from _best_of, applied to the whole column set before
+        # the matrix is built rather than per cell.
+        shortest, longest = min(map(len, queries)), max(map(len, queries))
+        lengths = bucket.lengths
+        columns = [
+            c for c in columns
+            if shortest <= lengths[c] <= longest
+            or _length_feasible(shortest, lengths[c])
+            or _length_feasible(longest, lengths[c])
+        ]
+        if not columns:
+            for position in positions:
+                results[position] = self._no_duplicate(candidates[position])
+            return
+        names = [bucket.names[c] for c in columns]
+        # Rounded integer scores; entries below the cutoff come back as 0.
+        scores = process.cdist(
+            queries,
+            names,
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=_SCREEN_CUTOFF,
+            dtype=np.uint8,
+            workers=workers,
+        )
+        for row, position in enumerate(positions):
+            candidate = candidates[position]
+            match = _exact_best(queries[row], bucket, columns, scores[row])
+            results[position] = (
+                self._duplicate(candidate, bucket.records[match[0]], match[1])
+                if match is not None
+                else self._no_duplicate(candidate)
+            )
 
     @staticmethod
     def _zip_prefix(zip_code: str) -> str:
         """Return the first ZIP_PREFIX_LENGTH digits, lower-cased, stripped."""
         return (zip_code or "").strip()[:ZIP_PREFIX_LENGTH]
 
+    def _bucket_key(self, prefix: str) -> str:
+        """The bucket a ZIP prefix's records live in — its own, or its sparse area's."""
+        if self._cross_zip:
+            return _ALL_ZIPS
+        if self._min_bucket_size is None or prefix in self._dense_prefixes:
+            return prefix
+        # The "*" keeps a merged area apart from a record whose ZIP is
+        # literally those 3 characters.
+        return prefix[:SPARSE_PREFIX_LENGTH] + "*"
+
     def _fuzzy_match(
         self,
         candidate: SubmissionRecord,
-        pool: list[SubmissionRecord],
+        bucket: _Bucket,
     ) -> DuplicateMatch:
         """
-        Run rapidfuzz against a pre-filtered pool.
-
-        rapidfuzz.process.extractOne:
-          - Iterates over `choices` and returns the single best match.
-          - score_cutoff means it returns None if no match clears the bar.
+        Run rapidfuzz against the pool rows that pass the trigram blocker.
+
+        The blocker leaves a handful of rows, so they are scored with direct
+        calls to the C scorer rather than process.extractOne, whose
+        per-call argument handling and choices conversion would cost more
+        than the comparisons themselves. The semantics are extractOne's:
+          - The single best match; ties go to the first row.
+          - score_cutoff means no match if nothing clears the bar.
           - We use token_sort_ratio: sorts tokens before comparing, so
             "IBM Corp" ~ "Corp IBM" scores 100.
         """
         normalised_candidate = normalise(candidate.company_name)
-
-        # Build a mapping: normalised_name → original record
-        # (a dict comprehension — if two records normalise to the same string,
-        #  the last one wins, which is acceptable for deduplication purposes)
-        choices: dict[str, SubmissionRecord] = {
-            normalise(r.company_name): r for r in pool
-        }
-
-        match = process.extractOne(
-            normalised_candidate,
-            choices.keys(),
-            scorer=fuzz.token_sort_ratio,
-            score_cutoff=SIMILARITY_THRESHOLD,
-        )
+        columns = _blocked(normalised_candidate, bucket)
+        match = _best_of(normalised_candidate, bucket, columns)
 
         if match is None:
-            return DuplicateMatch(
-                candidate_id=candidate.company_id,
-                is_potential_duplicate=False,
-            )
+            return self._no_duplicate(candidate)
 
-        matched_normalised_name, score, _ = match
-        matched_record = choices[matched_normalised_name]
+        column, score = match
+        return self._duplicate(candidate, bucket.records[column], score)
+
+    @staticmethod
+    def _no_duplicate(candidate: SubmissionRecord) -> DuplicateMatch:
+        return DuplicateMatch(
+            candidate_id=candidate.company_id,
+            is_potential_duplicate=False,
+        )
 
+    @staticmethod
+    def _duplicate(
+        candidate: SubmissionRecord, matched_record: SubmissionRecord, score: float
+    ) -> DuplicateMatch:
         logger.info(
             "Potential duplicate: '%s' → '%s' (score=%.1f)",
             candidate.company_name,
@@ -190,3 +398,103 @@ class DuplicateDetector:
             similarity_score=score,
             matched_name=matched_record.company_name,
         )
+
+
+def _build_bucket(records: list[SubmissionRecord], *, by_token: bool = False) -> _Bucket:
+    # Via a dict so that if two records normalise to the same string the
+    # last one wins, which is acceptable for deduplication purposes.
+    by_name = {normalise(r.company_name): r for r in records}
+    names = list(by_name)
+    lengths = [len(name) for name in names]
+    if not by_token:
+        return _Bucket(
+            names, lengths, list(by_name.values()), _build_postings(names, _trigrams),
+            _trigrams, MIN_SHARED_TRIGRAMS,
+        )
+    postings = {
+        token: rows
+        for token, rows in _build_postings(names, _tokens).items()
+        if len(rows) <= MAX_TOKEN_POSTINGS
+    }
+    return _Bucket(names, lengths, list(by_name.values()), postings, _tokens, 1)
+
+
+def _tokens(name: str) -> set[str]:
+    return set(name.split())
+
+
+def _trigrams(name: str) -> set[str]:
+    """Trigrams of the name as token_sort_ratio sees it: tokens sorted, edges padded."""
+    padded = "  " + " ".join(sorted(name.split())) + "  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _build_postings(names: list[str], keys_of: Callable[[str], set[str]]) -> _Postings:
+    postings: _Postings = {}
+    for row, name in enumerate(names):
+        for gram in keys_of(name):
+            postings.setdefault(gram, []).append(row)
+    return postings
+
+
+def _blocked(query: str, bucket: _Bucket) -> list[int]:
+    """Ascending rows sharing at least bucket.min_shared blocking keys with query."""
+    grams = bucket.keys_of(query)
+    needed = min(bucket.min_shared, len(grams))
+    postings = bucket.postings
+    shared: dict[int, int] = {}
+    for gram in grams:
+        for row in postings.get(gram, ()):
+            shared[row] = shared.get(row, 0) + 1
+    return sorted(row for row, count in shared.items() if count >= needed)
+
+
+def _exact_best(
+    query: str, bucket: _Bucket, columns: list[int], rounded: np.ndarray
+) -> Optional[tuple[int, float]]:
+    """
+    (bucket row, exact score) of the best name for one cdist row, or None.
+
+    The cdist row is over bucket rows `columns`. Rounding moves a score by
+    at most 0.5, so the true best is among the columns within 1 point of
+    the row's rounded maximum; only those are re-scored. Ties go to the
+    first column, as extractOne does.
+    """
+    top = int(rounded.max()) if len(rounded) else 0
+    if top < _SCREEN_CUTOFF:
+        return None
+    near_top = np.flatnonzero(rounded >= top - 1).tolist()
+    return _best_of(query, bucket, [columns[i] for i in near_top])
+
+
+def _length_feasible(a: int, b: int) -> bool:
+    """
+    Whether strings of lengths a and b can score SIMILARITY_THRESHOLD at all.
+
+    token_sort_ratio is Indel similarity, at most 2·min/(a + b) of 100.
+    (Token sorting keeps the length — names are single-spaced.) For a
+    fixed b, the bound is largest at a = b and falls off either side, so
+    over a range of query lengths only its two ends need checking.
+    """
+    return 200 * min(a, b) >= SIMILARITY_THRESHOLD * (a + b)
+
+
+def _best_of(
+    query: str, bucket: _Bucket, rows: list[int]
+) -> Optional[tuple[int, float]]:
+    """(row, score) of the best of bucket.names[rows] at or above the threshold, first on ties."""
+    scorer = fuzz.token_sort_ratio
+    names, lengths = bucket.names, bucket.lengths
+    query_length = len(query)
+    best: Optional[tuple[int, float]] = None
+    for row in rows:
+        # _length_feasible, inlined: the lengths alone may rule the pair out.
+        choice_length = lengths[row]
+        if 200 * min(query_length, choice_length) < SIMILARITY_THRESHOLD * (query_length + choice_length):
+            continue
+        # processor=None: both sides are already normalised. score_cutoff lets
+        # rapidfuzz (>= 3.6) run its banded LCS and exit early; 0.0 = below it.
+        score = scorer(query, names[row], processor=None, score_cutoff=SIMILARITY_THRESHOLD)
+        if score and (best is None or score > best[1]):
+            best = (row, score)
+    return best
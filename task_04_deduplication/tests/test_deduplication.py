@@ -36,6 +36,8 @@ class TestNormalise:
             ("ACME Group",                 "acme"),
             ("  Extra  Spaces  ",          "extra spaces"),
             ("Café & Boulangerie S.A.",    "café boulangerie"),
+            ("Smith_Jones (USA) Ltd.",     "smith jones usa"),
+            ("O’Brien–Kelly Inc",          "brien kelly"),
         ],
     )
     def test_normalisation(self, raw, expected):
@@ -48,6 +50,12 @@ class TestNormalise:
         # "LLC Corp Inc" — all tokens stripped — result is empty
         assert normalise("LLC Corp Inc") == ""
 
+    def test_repeat_names_are_served_from_cache(self):
+        normalise.cache_clear()
+        normalise("Kalepa Inc.")
+        normalise("Kalepa Inc.")
+        assert normalise.cache_info().hits == 1
+
 
 # --------------------------------------------------------------------------- #
 # Fixtures                                                                     #
@@ -140,6 +148,109 @@ class TestPrefilter:
         assert len(detector._index["10001"]) == 100
         assert len(detector._index["90210"]) == 100
 
+    def test_pool_is_normalised_once_at_build_time(self, monkeypatch):
+        """check() must normalise only the candidate, not the bucket's records."""
+        import detector as detector_module
+
+        existing = [SubmissionRecord(f"A-{i}", f"Company {i}", "10001") for i in range(50)]
+        detector = DuplicateDetector(existing)
+
+        calls = []
+        real_normalise = detector_module.normalise
+        monkeypatch.setattr(
+            detector_module, "normalise", lambda name: calls.append(name) or real_normalise(name)
+        )
+        detector.check(SubmissionRecord("NEW", "Company 7", "10001"))
+        detector.check(SubmissionRecord("NEW", "Company 8", "10001"))
+
+        assert calls == ["Company 7", "Company 8"]
+
+    def test_trigram_blocker_scores_only_names_sharing_trigrams(self, monkeypatch):
+        """Unrelated names in the same ZIP bucket never reach the fuzzy scorer."""
+        import detector as detector_module
+
+        existing = [SubmissionRecord(f"A-{i}", f"Company {i}", "10001") for i in range(100)]
+        existing.append(SubmissionRecord("DB-001", "Kalepa Inc", "10001"))
+        detector = DuplicateDetector(existing)
+
+        scored = []
+        real_scorer = detector_module.fuzz.token_sort_ratio
+        monkeypatch.setattr(
+            detector_module.fuzz,
+            "token_sort_ratio",
+            lambda query, choice, **kw: scored.append(choice) or real_scorer(query, choice, **kw),
+        )
+        result = detector.check(SubmissionRecord("NEW", "Kalepaa Inc.", "10001"))
+
+        assert result.matched_id == "DB-001"
+        assert scored == ["kalepa"]
+
+    def test_length_bound_skips_scorer_on_far_lengths(self, monkeypatch):
+        """'kalepa' shares trigrams with the long name, but 6 vs 28 chars caps the score at 35."""
+        import detector as detector_module
+
+        detector = DuplicateDetector([
+            SubmissionRecord("DB-001", "Kalepa Underwriting Partners", "10001"),
+            SubmissionRecord("DB-002", "Kalepa Inc",                   "10001"),
+        ])
+        scored = []
+        real_scorer = detector_module.fuzz.token_sort_ratio
+        monkeypatch.setattr(
+            detector_module.fuzz,
+            "token_sort_ratio",
+            lambda query, choice, **kw: scored.append(choice) or real_scorer(query, choice, **kw),
+        )
+        assert detector.check(SubmissionRecord("NEW", "Kalepa", "10001")).matched_id == "DB-002"
+        assert scored == ["kalepa"]
+
+    def test_sparse_zips_share_their_three_digit_area(self):
+        dense = [SubmissionRecord(f"A-{i}", f"Company {i}", "10001") for i in range(10)]
+        sparse = [
+            SubmissionRecord("DB-001", "Kalepa Inc", "10002"),
+            SubmissionRecord("DB-002", "Acme Corp",  "10003"),
+        ]
+        detector = DuplicateDetector(dense + sparse, min_bucket_size=5)
+
+        # 10004 has no records of its own, so it is checked against the "100" area.
+        assert detector.check(SubmissionRecord("NEW", "Kalepa Inc", "10004")).matched_id == "DB-001"
+        # Dense ZIPs keep their own bucket — the sparse names are not in it.
+        assert detector.check(SubmissionRecord("NEW", "Kalepa Inc", "10001")).is_potential_duplicate is False
+        # A different area is still blocked.
+        assert detector.check(SubmissionRecord("NEW", "Kalepa Inc", "20002")).is_potential_duplicate is False
+
+    def test_cross_zip_finds_duplicates_under_another_zip(self, existing_records):
+        detector = DuplicateDetector(existing_records, cross_zip=True)
+        result = detector.check(SubmissionRecord("NEW", "Kalepa Inc", "99999"))
+        assert result.matched_id == "DB-001"
+
+    def test_cross_zip_ignores_common_tokens(self, monkeypatch):
+        """'services' is in 30 names, so only the rare token 'kalepa' selects rows."""
+        import detector as detector_module
+
+        existing = [SubmissionRecord(f"A-{i}", f"Firm{i} Services", f"{i:05d}") for i in range(30)]
+        existing.append(SubmissionRecord("DB-001", "Kalepa Services", "10001"))
+        detector = DuplicateDetector(existing, cross_zip=True)
+
+        scored = []
+        real_scorer = detector_module.fuzz.token_sort_ratio
+        monkeypatch.setattr(
+            detector_module.fuzz,
+            "token_sort_ratio",
+            lambda query, choice, **kw: scored.append(choice) or real_scorer(query, choice, **kw),
+        )
+        result = detector.check(SubmissionRecord("NEW", "Kalepa Services LLC", "60601"))
+
+        assert result.matched_id == "DB-001"
+        assert scored == ["kalepa services"]
+
+    def test_cross_zip_rejects_min_bucket_size(self):
+        with pytest.raises(ValueError):
+            DuplicateDetector([], cross_zip=True, min_bucket_size=5)
+
+    def test_buckets_are_not_merged_by_default(self):
+        detector = DuplicateDetector([SubmissionRecord("DB-001", "Kalepa Inc", "10002")])
+        assert detector.check(SubmissionRecord("NEW", "Kalepa Inc", "10004")).is_potential_duplicate is False
+
 
 # --------------------------------------------------------------------------- #
 # 4. Batch check                                                               #
@@ -161,3 +272,82 @@ class TestBatchCheck:
 
     def test_empty_candidates_returns_empty_list(self, detector):
         assert detector.check_batch([]) == []
+
+    def test_batch_matches_single_checks(self, detector):
+        candidates = [
+            SubmissionRecord("C1", "Kalepa Inc",           "10001"),
+            SubmissionRecord("C2", "Unknown Corp",         "10001"),
+            SubmissionRecord("C3", "Kalepa Inc",           "99999"),
+            SubmissionRecord("C4", "kalepa, incorporated", "10001"),
+            SubmissionRecord("C5", "Acme Widgets",         None),
+        ]
+        assert detector.check_batch(candidates) == [detector.check(c) for c in candidates]
+
+    def test_rounded_scores_do_not_decide(self):
+        # cdist scores are uint8. "harbour frieght" scores 89.66 → rounds to 90,
+        # and the two "northwind" names (96.97, 97.14) both round to 97.
+        detector = DuplicateDetector([
+            SubmissionRecord("E1", "Harbor Freight",         "30301"),
+            SubmissionRecord("E2", "Northwind Trader",       "10001"),
+            SubmissionRecord("E3", "Northwind Traderss",     "10001"),
+        ])
+        candidates = [
+            SubmissionRecord("C1", "Harbour Frieght",        "30301"),
+            SubmissionRecord("C2", "Northwind Traders",      "10001"),
+        ]
+        results = detector.check_batch(candidates)
+        assert results == [detector.check(c) for c in candidates]
+        assert results[0].is_potential_duplicate is False
+        assert results[1].matched_id == "E3"
+
+    def test_parallel_batch_matches_single_checks(self):
+        existing = [
+            SubmissionRecord(f"DB-{zip_code}-{i}", f"Company {name}", zip_code)
+            for zip_code in ("10001", "10002", "90210", "60601")
+            for i, name in enumerate(["Kalepa", "Acme Widgets", "Goldman Sachs", "Northwind"])
+        ]
+        detector = DuplicateDetector(existing)
+        candidates = [
+            SubmissionRecord(f"C{i}", name, zip_code)
+            for i, (name, zip_code) in enumerate(
+                (name, zip_code)
+                for zip_code in ("10001", "10002", "90210", "60601", "99999")
+                for name in ("Company Kalepa", "Acme Widget Co", "Unrelated LLC", "Northwind")
+            )
+        ]
+        assert len(candidates) >= 16
+        assert detector.check_batch(candidates) == [detector.check(c) for c in candidates]
+
+    def test_single_candidate_bucket_skips_cdist(self, detector, monkeypatch):
+        import detector as detector_module
+
+        def fail(*args, **kwargs):
+            raise AssertionError("cdist called for a one-candidate bucket")
+
+        monkeypatch.setattr(detector_module.process, "cdist", fail)
+        candidates = [
+            SubmissionRecord("C1", "Kalepa Inc",   "10001"),
+            SubmissionRecord("C2", "Goldman Sachs", "10003"),
+        ]
+        assert detector.check_batch(candidates) == [detector.check(c) for c in candidates]
+
+    def test_length_band_trims_cdist_columns(self, monkeypatch):
+        import detector as detector_module
+
+        detector = DuplicateDetector([
+            SubmissionRecord("DB-001", "Kalepa Underwriting Partners", "10001"),
+            SubmissionRecord("DB-002", "Kalepa Inc",                   "10001"),
+        ])
+        columns = []
+        real_cdist = detector_module.process.cdist
+        monkeypatch.setattr(
+            detector_module.process,
+            "cdist",
+            lambda queries, choices, **kw: columns.extend(choices) or real_cdist(queries, choices, **kw),
+        )
+        candidates = [
+            SubmissionRecord("C1", "Kalepa",     "10001"),
+            SubmissionRecord("C2", "Kalepa LLC", "10001"),
+        ]
+        assert [r.matched_id for r in detector.check_batch(candidates)] == ["DB-002", "DB-002"]
+        assert columns == ["kalepa"]
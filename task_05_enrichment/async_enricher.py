@@ -0,0 +1,175 @@
+"""
+Batch enrichment on one event loop with httpx.AsyncClient over HTTP/2.
+
+Why this exists next to enricher.py:
+───────────────────────────────────
+enricher.py gets concurrency from threads because client.py speaks the
+synchronous `requests` API. Each in-flight call costs a thread and its
+own pooled TCP connection. For large batches the concurrency you can
+afford is capped by threads, not by the Risk API.
+
+Here every call is a coroutine on one loop. With HTTP/2 the calls are
+multiplexed as streams over a single TLS connection, so one handshake
+serves the whole batch:
+
+  ThreadPoolExecutor(max_workers=5)        = N / 5  · RTT
+  enrich_batch_async(concurrency=C)        ≈ RTT + N / C · service time
+
+An asyncio.Semaphore caps the number of in-flight requests. It provides
+backpressure against the Risk API's rate limit, which is also why the
+thread pool is bounded; the cost of a task does not matter here.
+
+What is shared with client.py:
+  The status → exception mapping (_check_status), the retry policy
+  (MAX_RETRIES, _backoff_delay), the response cache, and the result
+  builders. A given HTTP response therefore produces the same
+  EnrichmentResult on both paths. Only the transport and its exception
+  types differ: httpx.TransportError, which includes timeouts, plays the
+  role of requests.Timeout / requests.ConnectionError.
+
+Sync callers keep using enrich_submission / enrich_batch unchanged; this
+module is only needed (and httpx only imported) by callers that opt in:
+
+    report = asyncio.run(enrich_batch_async(company_ids))
+"""
+
+import asyncio
+import logging
+from typing import Optional, Sequence
+
+import httpx
+import orjson
+
+from client import (
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+    RISK_API_BASE,
+    EnrichmentResult,
+    RiskApiClientError,
+    RiskApiServerError,
+    _backoff_delay,
+    _cache_risk_data,
+    _cached_risk_data,
+    _check_status,
+    _client_failure,
+    _project,
+    _success,
+    _transient_failure,
+)
+from enricher import BatchEnrichmentReport
+
+logger = logging.getLogger(__name__)
+
+# In-flight requests per batch. Cheap for us (a coroutine each), so the
+# bound is set by the Risk API's rate limit, not by local resources.
+DEFAULT_CONCURRENCY = 20
+MAX_CONNECTIONS = 100   # HTTP/1.1 fallback; HTTP/2 multiplexes on one
+
+_TRANSIENT = (httpx.TransportError, RiskApiServerError)
+
+
+def make_client() -> httpx.AsyncClient:
+    """An AsyncClient configured like client._SESSION: pooled, with a timeout."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+    )
+
+
+async def _fetch_risk_data_async(client: httpx.AsyncClient, company_id: str) -> dict:
+    """Same retry loop as client._fetch_risk_data, sleeping on the event loop."""
+    attempt = 1
+    while True:
+        try:
+            return await _fetch_once_async(client, company_id)
+        except _TRANSIENT as exc:
+            if attempt >= MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt)
+            logger.warning(
+                "Retrying Risk API call for company_id=%r in %s seconds (attempt %d/%d): %s",
+                company_id, delay, attempt, MAX_RETRIES, exc,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def _fetch_once_async(client: httpx.AsyncClient, company_id: str) -> dict:
+    """Single HTTP attempt on the shared AsyncClient.  Raises as _fetch_once."""
+    response = await client.get(f"{RISK_API_BASE}/companies/{company_id}/risk")
+    _check_status(response.status_code, company_id)
+    return _project(orjson.loads(response.content))
+
+
+async def enrich_submission_async(
+    client: httpx.AsyncClient, company_id: str
+) -> EnrichmentResult:
+    """Async twin of client.enrich_submission.  Never raises."""
+    try:
+        raw = _cached_risk_data(company_id)
+        if raw is None:
+            raw = await _fetch_risk_data_async(client, company_id)
+            _cache_risk_data(company_id, raw)
+        return _success(company_id, raw)
+
+    except _TRANSIENT as exc:
+        return _transient_failure(company_id, exc)
+
+    except RiskApiClientError as exc:
+        return _client_failure(company_id, exc)
+
+
+async def enrich_batch_async(
+    company_ids: Sequence[str],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: Optional[httpx.AsyncClient] = None,
+) -> BatchEnrichmentReport:
+    """
+    Enrich multiple submissions concurrently on the running event loop.
+
+    Args:
+        company_ids:  IDs to enrich.
+        concurrency:  Max in-flight requests.  Tune based on API rate limits.
+        client:       AsyncClient to reuse across batches.  When omitted, one
+                      is opened for this batch and closed afterwards.
+
+    Returns:
+        A BatchEnrichmentReport with the same succeeded / failed split as
+        enricher.enrich_batch, in input order.
+    """
+    if client is None:
+        async with make_client() as owned:
+            return await enrich_batch_async(
+                company_ids, concurrency=concurrency, client=owned
+            )
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(company_id: str) -> EnrichmentResult:
+        async with semaphore:
+            try:
+                return await enrich_submission_async(client, company_id)
+            except Exception as exc:
+                # Same guard as enrich_batch: one escaped exception (say, a
+                # malformed body) would otherwise fail the whole gather().
+                logger.exception(
+                    "Unexpected error enriching company_id=%r: %s", company_id, exc
+                )
+                return EnrichmentResult(
+                    company_id=company_id, success=False, error=f"Unexpected: {exc}"
+                )
+
+    report = BatchEnrichmentReport.from_results(
+        await asyncio.gather(*map(bounded, company_ids))
+    )
+
+    logger.info(
+        "Async batch enrichment complete: %d succeeded, %d failed (%.0f%% success rate)",
+        len(report.succeeded),
+        len(report.failed),
+        report.success_rate * 100,
+    )
+    return report
+
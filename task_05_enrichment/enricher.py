@@ -21,11 +21,21 @@ Rule of thumb:
 """
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Iterator, Sequence
+from functools import partial
+from itertools import chain, islice
+from queue import SimpleQueue
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
-from client import EnrichmentResult, enrich_submission
+from client import (
+    BULK_SIZE,
+    EnrichmentResult,
+    enrich_submission,
+    enrich_submissions,
+    reserve_connections,
+)
+from limiter import ConcurrencyLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +49,17 @@ class BatchEnrichmentReport:
     succeeded: list[EnrichmentResult] = field(default_factory=list)
     failed: list[EnrichmentResult] = field(default_factory=list)
 
+    @classmethod
+    def from_results(cls, results: Sequence[EnrichmentResult]) -> "BatchEnrichmentReport":
+        """
+        Partition a finished batch in two passes over one list, instead of
+        growing both lists append by append as results come in.
+        """
+        return cls(
+            succeeded=[r for r in results if r.success],
+            failed=[r for r in results if not r.success],
+        )
+
     @property
     def success_rate(self) -> float:
         total = len(self.succeeded) + len(self.failed)
@@ -49,6 +70,7 @@ def enrich_batch(
     company_ids: Sequence[str],
     *,
     max_workers: int = DEFAULT_MAX_WORKERS,
+    limiter: Optional[ConcurrencyLimiter] = None,
 ) -> BatchEnrichmentReport:
     """
     Enrich multiple submissions concurrently using a thread pool.
@@ -56,51 +78,53 @@ def enrich_batch(
     Args:
         company_ids:  IDs to enrich.
         max_workers:  Thread pool size.  Tune based on API rate limits.
+        limiter:      Optional adaptive in-flight cap (e.g. VegasLimiter).
+                      max_workers stays the hard ceiling; the limiter decides
+                      how many of those threads may be on the network at once.
 
     Returns:
         A BatchEnrichmentReport with succeeded / failed split.
 
     Design notes:
-      - as_completed() processes results as they arrive, not in submission
-        order — faster than waiting for the slowest call in each "round".
+      - pool.map() keeps results in input order. That costs nothing here:
+        the report is only returned once every call has finished, so the
+        future → company_id dict and as_completed() bookkeeping would buy
+        nothing. enrich_stream, whose caller consumes early results, yields
+        in completion order instead.
       - The thread pool is used as a context manager — threads are cleaned
         up even if an exception escapes (defensive resource management).
       - Individual failures are recorded in the report; they never abort the
         whole batch.
     """
-    report = BatchEnrichmentReport()
+    reserve_connections(max_workers)   # one pooled keep-alive socket per thread
+    enrich = _enrich_fn(limiter)
+    # Checked once per batch, so a degraded run with thousands of failures
+    # does not build a traceback per item for a logger that drops it.
+    log_errors = logger.isEnabledFor(logging.ERROR)
 
-    # ThreadPoolExecutor submits each call to a thread from the pool.
-    # max_workers caps how many threads run concurrently.
-    with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        # Build a future → company_id mapping so we can log which call finished
-        future_to_id = {
-            pool.submit(enrich_submission, company_id): company_id
-            for company_id in company_ids
-        }
-
-        # as_completed yields each future as soon as its thread finishes —
-        # no wasted time waiting for slower calls to catch up.
-        for future in as_completed(future_to_id):
-            company_id = future_to_id[future]
-            try:
-                result: EnrichmentResult = future.result()
-            except Exception as exc:
-                # enrich_submission() is designed not to raise, but we guard
-                # here anyway — defensive programming for production.
+    def enrich_one(company_id: str) -> EnrichmentResult:
+        try:
+            return enrich(company_id)
+        except Exception as exc:
+            # enrich_submission() is designed not to raise, but we guard
+            # here anyway — an exception escaping into pool.map() would end
+            # the iteration and lose every result after it.
+            if log_errors:
                 logger.exception(
                     "Unexpected error enriching company_id=%r: %s", company_id, exc
                 )
-                result = EnrichmentResult(
-                    company_id=company_id,
-                    success=False,
-                    error=f"Unexpected: {exc}",
-                )
+            return EnrichmentResult(
+                company_id=company_id,
+                success=False,
+                error=f"Unexpected: {exc}",
+            )
 
-            if result.success:
-                report.succeeded.append(result)
-            else:
-                report.failed.append(result)
+    # ThreadPoolExecutor runs each call on a thread from the pool.
+    # max_workers caps how many threads run concurrently.
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        report = BatchEnrichmentReport.from_results(
+            list(pool.map(enrich_one, company_ids))
+        )
 
     logger.info(
         "Batch enrichment complete: %d succeeded, %d failed (%.0f%% success rate)",
@@ -111,33 +135,127 @@ def enrich_batch(
     return report
 
 
+# --------------------------------------------------------------------------- #
+# Bulk variant — one POST per chunk of IDs instead of one GET per ID           #
+# --------------------------------------------------------------------------- #
+
+
+def enrich_batch_bulk(
+    company_ids: Sequence[str],
+    *,
+    bulk_size: int = BULK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> BatchEnrichmentReport:
+    """
+    Same report as enrich_batch, using ⌈N / bulk_size⌉ round trips instead of N.
+
+    Each thread enriches one chunk through client.enrich_submissions. A
+    200-ID batch is 4 POSTs, not 200 GETs. IDs the bulk endpoint cannot
+    answer fall back to per-ID GETs inside that chunk.
+    """
+    chunks = [
+        company_ids[i:i + bulk_size] for i in range(0, len(company_ids), bulk_size)
+    ]
+    reserve_connections(max_workers)
+    log_errors = logger.isEnabledFor(logging.ERROR)
+
+    def enrich_chunk(chunk: Sequence[str]) -> list[EnrichmentResult]:
+        try:
+            return enrich_submissions(chunk)
+        except Exception as exc:
+            # As in enrich_batch: enrich_submissions should not raise, but
+            # one bad chunk must not abort the others.
+            if log_errors:
+                logger.exception("Unexpected error enriching a chunk: %s", exc)
+            return [
+                EnrichmentResult(
+                    company_id=company_id, success=False, error=f"Unexpected: {exc}"
+                )
+                for company_id in chunk
+            ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        report = BatchEnrichmentReport.from_results(
+            list(chain.from_iterable(pool.map(enrich_chunk, chunks)))
+        )
+
+    logger.info(
+        "Bulk enrichment complete: %d succeeded, %d failed in %d chunks",
+        len(report.succeeded),
+        len(report.failed),
+        len(chunks),
+    )
+    return report
+
+
 # --------------------------------------------------------------------------- #
 # Generator variant — memory-efficient for very large batches                  #
 # --------------------------------------------------------------------------- #
 
 
 def enrich_stream(
-    company_ids: Sequence[str],
+    company_ids: Iterable[str],
     *,
     max_workers: int = DEFAULT_MAX_WORKERS,
+    limiter: Optional[ConcurrencyLimiter] = None,
+    lookahead: Optional[int] = None,
 ) -> Iterator[EnrichmentResult]:
     """
     Same as enrich_batch but yields results one by one.
 
     Use this when the downstream consumer can start processing before the
     entire batch is done (pipeline pattern), or when the batch is too large
-    to hold all results in memory at once.
+    to hold all results in memory at once. Results arrive in completion
+    order, so one slow call does not hold back the rest.
+
+    company_ids may be any iterable, including a generator. At most
+    `lookahead` calls (default 2 × max_workers) are submitted but not yet
+    yielded; the next ID is pulled only when a result goes out. Memory is
+    bounded by the window, not the input, and a consumer that stops early
+    leaves the rest of the input unfetched.
     """
+    reserve_connections(max_workers)
+    enrich = _enrich_fn(limiter)
+    log_errors = logger.isEnabledFor(logging.ERROR)
+    ids = iter(company_ids)
+    window = lookahead or max_workers * 2
+    # Each future pushes itself here from its worker thread when it finishes.
+    # One blocking get() per result, where wait() over the whole window would
+    # install (and tear down) a waiter on every in-flight future each time.
+    completed: SimpleQueue[Future[EnrichmentResult]] = SimpleQueue()
+    in_flight: dict[Future[EnrichmentResult], str] = {}
+
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        future_to_id = {
-            pool.submit(enrich_submission, cid): cid for cid in company_ids
-        }
-        for future in as_completed(future_to_id):
-            company_id = future_to_id[future]
+
+        def submit(company_id: str) -> None:
+            future = pool.submit(enrich, company_id)
+            in_flight[future] = company_id
+            future.add_done_callback(completed.put)
+
+        for cid in islice(ids, window):
+            submit(cid)
+        while in_flight:
+            future = completed.get()
+            company_id = in_flight.pop(future)
             try:
                 yield future.result()
             except Exception as exc:
-                logger.exception("Unexpected error for %r: %s", company_id, exc)
+                if log_errors:
+                    logger.exception("Unexpected error for %r: %s", company_id, exc)
                 yield EnrichmentResult(
                     company_id=company_id, success=False, error=str(exc)
                 )
+            # Refill one slot per result yielded, keeping the window full.
+            for cid in islice(ids, 1):
+                submit(cid)
+
+
+def _enrich_fn(
+    limiter: Optional[ConcurrencyLimiter],
+) -> Callable[[str], EnrichmentResult]:
+    """enrich_submission, bound to `limiter` when there is one."""
+    # Resolved at call time (not import time) so tests can patch
+    # enricher.enrich_submission.
+    if limiter is None:
+        return enrich_submission
+    return partial(enrich_submission, limiter=limiter)
@@ -0,0 +1,125 @@
+"""
+Adaptive concurrency limit for Risk API calls (TCP-Vegas style).
+
+The problem it solves:
+  DEFAULT_MAX_WORKERS is a static guess. When the API is fast, five
+  threads leave capacity unused. When it slows down, five threads keep
+  pushing and the excess turns into 429s and retries. The right number
+  of in-flight calls is whatever the API is absorbing *right now*.
+
+How it decides (Vegas, as in Netflix's concurrency-limits):
+  min_rtt is the fastest call seen, an estimate of no-load latency. For
+  each completed call:
+
+      queue = limit · (1 − min_rtt / rtt)    # calls waiting server-side
+
+      dropped (429 / 5xx / timeout) → limit · backoff_ratio  (multiplicative)
+      queue < alpha                 → limit + 1              (room to spare)
+      queue > beta                  → limit − 1              (queue building)
+      otherwise                     → unchanged
+
+  The limit only grows while at least half of it is in use, so an idle
+  caller cannot inflate it. Every probe_interval samples min_rtt is reset,
+  so a baseline that has genuinely moved (new region, slower backend) is
+  re-learned rather than read as permanent queueing.
+
+How it fits:
+  client.enrich_submission(company_id, limiter=...) brackets only the
+  network fetch with acquire()/release(). Cache hits are neither gated nor
+  sampled, because their microsecond RTTs would poison min_rtt.
+  enrich_batch(limiter=...) passes one limiter to every worker, and
+  max_workers stays the hard ceiling. Opt-in: without a limiter nothing
+  changes.
+"""
+
+import math
+import threading
+from typing import Protocol
+
+
+class ConcurrencyLimiter(Protocol):
+    """What client.enrich_submission needs from a limiter."""
+
+    def acquire(self) -> None:
+        """Block until one more call may be in flight."""
+        ...
+
+    def release(self, rtt: float, *, dropped: bool) -> None:
+        """Report a finished call: its latency in seconds, and whether it was shed."""
+        ...
+
+
+class VegasLimiter:
+    """Thread-safe adaptive in-flight limit; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 5,      # enricher.DEFAULT_MAX_WORKERS
+        min_limit: int = 1,
+        max_limit: int = 100,
+        alpha: int = 3,
+        beta: int = 6,
+        probe_interval: int = 100,
+        backoff_ratio: float = 0.9,
+    ) -> None:
+        if not min_limit <= initial_limit <= max_limit:
+            raise ValueError("need min_limit <= initial_limit <= max_limit")
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._alpha = alpha
+        self._beta = beta
+        self._probe_interval = probe_interval
+        self._backoff_ratio = backoff_ratio
+
+        self._inflight = 0
+        self._min_rtt = math.inf
+        self._samples = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current in-flight budget."""
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._inflight >= int(self._limit):
+                self._cond.wait()
+            self._inflight += 1
+
+    def release(self, rtt: float, *, dropped: bool) -> None:
+        with self._cond:
+            inflight = self._inflight        # load while this call was running
+            self._inflight -= 1
+            self._update(rtt, dropped, inflight)
+            self._cond.notify_all()          # the limit may have grown
+
+    # ------------------------------------------------------------------ #
+    # Private                                                              #
+    # ------------------------------------------------------------------ #
+
+    def _update(self, rtt: float, dropped: bool, inflight: int) -> None:
+        self._samples += 1
+        if self._samples % self._probe_interval == 0:
+            self._min_rtt = math.inf         # re-learn the no-load baseline
+
+        if dropped:
+            self._set_limit(self._limit * self._backoff_ratio)
+            return
+        if rtt < self._min_rtt:
+            self._min_rtt = rtt              # new baseline — nothing to compare yet
+            return
+        if rtt <= 0:
+            return
+
+        queue = self._limit * (1 - self._min_rtt / rtt)
+        if queue < self._alpha:
+            if inflight * 2 >= self._limit:  # only grow a limit that is in use
+                self._set_limit(self._limit + 1)
+        elif queue > self._beta:
+            self._set_limit(self._limit - 1)
+
+    def _set_limit(self, limit: float) -> None:
+        self._limit = min(self._max_limit, max(self._min_limit, limit))
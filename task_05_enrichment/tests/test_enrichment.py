@@ -3,33 +3,64 @@ Tests for the enrichment client and batch enricher.
 
 Key testing concepts:
   - responses library: declarative HTTP mocking — no monkey-patching needed.
-  - unittest.mock.patch: swap out the retry-wrapped function to test retry
-    behaviour without actually sleeping (speeds up tests enormously).
+  - unittest.mock.patch: swap out the session's get and the backoff sleep to
+    test retry behaviour without actually sleeping (speeds up tests enormously).
   - Side-effect lists: simulate "fail twice, then succeed" sequences.
-  - Testing concurrency: verify that results are present, not order-dependent
-    (as_completed returns in arbitrary order).
+  - Testing concurrency: enrich_batch keeps input order (pool.map);
+    enrich_stream yields in completion order, so only presence is checked.
 """
 
+import asyncio
+import random
+import re
 import sys
+import threading
 from pathlib import Path
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
+import httpx
+import orjson
 import pytest
 import requests
+from requests.adapters import HTTPAdapter
 import responses as responses_lib  # aliased to avoid name clash with pytest fixture
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+import client
 from client import (
+    MAX_RETRIES,
+    POOL_MAXSIZE,
     RISK_API_BASE,
+    RISK_CACHE_TTL,
+    _SESSION,
     EnrichmentResult,
     RiskApiClientError,
     RiskApiServerError,
+    _backoff_delay,
+    _fetch_once,
     _fetch_risk_data,
+    clear_cache,
     enrich_submission,
 )
-from enricher import BatchEnrichmentReport, enrich_batch
-from mapper import normalise_keys
+from async_enricher import enrich_batch_async
+from enricher import BatchEnrichmentReport, enrich_batch, enrich_batch_bulk, enrich_stream
+from limiter import VegasLimiter
+from mapper import _convert_camel, normalise_keys
+
+
+@pytest.fixture(autouse=True)
+def empty_risk_cache():
+    """Every test starts cold — cached lookups must not leak between tests."""
+    clear_cache()
+    yield
+    clear_cache()
+
+
+@pytest.fixture()
+def risk_cache(monkeypatch):
+    """Turn the opt-in response cache on for one test."""
+    monkeypatch.setattr(client, "RISK_CACHE_SIZE", 10_000)
 
 
 # --------------------------------------------------------------------------- #
@@ -58,6 +89,34 @@ class TestMapper:
     def test_https_abbreviation(self):
         assert normalise_keys({"HTTPSEnabled": True}) == {"https_enabled": True}
 
+    def test_camel_case_nested_under_snake_case_is_still_converted(self):
+        result = normalise_keys({"risk_data": {"lossRatio": 0.5}})
+        assert result == {"risk_data": {"loss_ratio": 0.5}}
+
+    def test_snake_case_keys_skip_the_regex_passes(self):
+        with patch("mapper._convert_camel") as mock_convert:
+            assert normalise_keys({"risk_score": 1, "loss_ratio_3y": 2}) == {
+                "risk_score": 1, "loss_ratio_3y": 2,
+            }
+        mock_convert.assert_not_called()
+
+    def test_conversion_matches_the_two_regex_rules(self):
+        """The char loop must agree with the regexes it replaced, on any input."""
+        lower_then_upper = re.compile(r"([a-z0-9])([A-Z])")
+        acronym_then_word = re.compile(r"([A-Z]+)([A-Z][a-z])")
+        rng = random.Random(7)
+        for _ in range(2000):
+            name = "".join(rng.choices("aBz0Z9_É", k=rng.randint(1, 12)))
+            expected = acronym_then_word.sub(
+                r"\1_\2", lower_then_upper.sub(r"\1_\2", name)
+            ).lower()
+            assert _convert_camel(name) == expected, name
+
+    def test_camel_case_conversion_is_cached(self):
+        _convert_camel.cache_clear()
+        normalise_keys([{"lossRatio": 1}, {"lossRatio": 2}])
+        assert _convert_camel.cache_info().hits == 1
+
 
 # --------------------------------------------------------------------------- #
 # 2. HTTP client — happy path (using `responses` library)                      #
@@ -79,7 +138,7 @@ class TestFetchRiskDataHappyPath:
             status=200,
         )
 
-        result = _fetch_risk_data.__wrapped__(company_id)  # __wrapped__ bypasses tenacity
+        result = _fetch_once(company_id)  # one attempt, no retry loop
 
         assert result == {"riskScore": 72, "industryCode": "RET"}
 
@@ -98,6 +157,59 @@ class TestFetchRiskDataHappyPath:
         assert result.success is True
         assert result.data == {"risk_score": 55, "claims_history": []}
 
+    def test_risk_fields_prunes_the_payload_before_caching(self, monkeypatch, risk_cache):
+        monkeypatch.setattr(client, "RISK_FIELDS", frozenset({"riskScore"}))
+        fat = {"riskScore": 55, "claimsHistory": [{"claimId": 1}] * 100}
+        with patch("client._SESSION.get", return_value=_ok(fat)):
+            result = enrich_submission("ACME-P")
+
+        assert result.data == {"risk_score": 55}
+        assert client._risk_cache["ACME-P"][1] == {"riskScore": 55}
+
+    def test_risk_fields_applies_to_bulk_replies(self, monkeypatch):
+        monkeypatch.setattr(client, "RISK_FIELDS", frozenset({"riskScore"}))
+        reply = {"A": {"riskScore": 1, "extra": 0}, "B": {"riskScore": 2}}
+        with patch("client._SESSION.post", return_value=_ok(reply)):
+            assert client._fetch_batch_once(["A", "B"]) == {
+                "A": {"riskScore": 1}, "B": {"riskScore": 2},
+            }
+
+    def test_calls_share_one_pooled_session(self):
+        """Every call reuses the module session, whose adapter is pool-sized."""
+        response = MagicMock(status_code=200)
+        response.content = b"{}"
+        with patch("client._SESSION.get", return_value=response) as mock_get:
+            enrich_submission("ACME-A")
+            enrich_submission("ACME-B")
+
+        assert mock_get.call_count == 2
+        assert _SESSION.get_adapter(RISK_API_BASE)._pool_maxsize == POOL_MAXSIZE
+
+    def test_pool_grows_to_the_thread_count(self, monkeypatch):
+        session = requests.Session()
+        monkeypatch.setattr(client, "_SESSION", session)
+        monkeypatch.setattr(client, "_pool_size", POOL_MAXSIZE)
+
+        client.reserve_connections(POOL_MAXSIZE // 2)   # already big enough
+        client.reserve_connections(POOL_MAXSIZE * 2)
+
+        adapter = session.get_adapter(RISK_API_BASE)
+        assert adapter._pool_maxsize == POOL_MAXSIZE * 2
+        assert adapter._pool_block is True   # still waits rather than over-opening
+
+    def test_growing_the_pool_closes_the_adapter_it_replaces(self, monkeypatch):
+        session = requests.Session()
+        old = MagicMock(spec=HTTPAdapter)
+        session.mount("https://", old)
+        session.mount("http://", old)
+        monkeypatch.setattr(client, "_SESSION", session)
+        monkeypatch.setattr(client, "_pool_size", POOL_MAXSIZE)
+
+        client.reserve_connections(POOL_MAXSIZE * 2)
+
+        old.close.assert_called_once()
+        assert session.get_adapter(RISK_API_BASE) is not old
+
 
 # --------------------------------------------------------------------------- #
 # 3. Retry behaviour — simulated failures                                      #
@@ -108,25 +220,25 @@ class TestRetryBehaviour:
     def test_retries_on_server_error_then_succeeds(self):
         """
         Simulate: 500 → 500 → 200.  The function should succeed on the third
-        attempt.  We patch `requests.get` so no real HTTP happens and no
+        attempt.  We patch the shared session's `get` so no real HTTP happens and no
         real sleeping occurs.
         """
         good_response = MagicMock()
         good_response.status_code = 200
-        good_response.json.return_value = {"riskScore": 80}
+        good_response.content = b'{"riskScore": 80}'
 
         server_error_response = MagicMock()
         server_error_response.status_code = 503
 
-        with patch("client.requests.get") as mock_get:
+        with patch("client._SESSION.get") as mock_get:
             # side_effect list: each call pops the next value
             mock_get.side_effect = [
                 server_error_response,
                 server_error_response,
                 good_response,
             ]
-            # Patch tenacity's sleep so the test doesn't actually wait
-            with patch("tenacity.nap.time.sleep"):
+            # Patch the backoff sleep so the test doesn't actually wait
+            with patch("client.time.sleep"):
                 result = _fetch_risk_data("ACME-003")
 
         assert result == {"riskScore": 80}
@@ -137,14 +249,14 @@ class TestRetryBehaviour:
         server_error_response = MagicMock()
         server_error_response.status_code = 500
 
-        with patch("client.requests.get", return_value=server_error_response):
-            with patch("tenacity.nap.time.sleep"):
+        with patch("client._SESSION.get", return_value=server_error_response):
+            with patch("client.time.sleep"):
                 with pytest.raises(RiskApiServerError):
                     _fetch_risk_data("ACME-FAIL")
 
     def test_timeout_is_retriable(self):
-        with patch("client.requests.get", side_effect=requests.Timeout):
-            with patch("tenacity.nap.time.sleep"):
+        with patch("client._SESSION.get", side_effect=requests.Timeout):
+            with patch("client.time.sleep"):
                 result = enrich_submission("ACME-TIMEOUT")
 
         assert result.success is False
@@ -155,12 +267,78 @@ class TestRetryBehaviour:
         bad_response = MagicMock()
         bad_response.status_code = 404
 
-        with patch("client.requests.get", return_value=bad_response) as mock_get:
+        with patch("client._SESSION.get", return_value=bad_response) as mock_get:
             result = enrich_submission("ACME-404")
 
         assert result.success is False
         assert mock_get.call_count == 1  # no retry
 
+    def test_backoff_doubles_between_attempts_up_to_the_cap(self):
+        server_error_response = MagicMock(status_code=500)
+        with patch("client._SESSION.get", return_value=server_error_response):
+            with patch("client.time.sleep") as mock_sleep:
+                with pytest.raises(RiskApiServerError):
+                    _fetch_risk_data("ACME-BACKOFF")
+
+        assert mock_sleep.call_args_list == [call(1), call(2)]   # none after the last
+        assert [_backoff_delay(a) for a in range(1, 6)] == [1, 2, 4, 8, 10]
+
+
+# --------------------------------------------------------------------------- #
+# 3b. Response cache                                                           #
+# --------------------------------------------------------------------------- #
+
+
+def _ok(payload: dict) -> MagicMock:
+    return MagicMock(status_code=200, content=orjson.dumps(payload))
+
+
+@pytest.mark.usefixtures("risk_cache")
+class TestResponseCache:
+    def test_repeat_lookup_is_served_from_cache(self):
+        with patch("client._SESSION.get", return_value=_ok({"riskScore": 9})) as mock_get:
+            first = enrich_submission("ACME-C")
+            second = enrich_submission("ACME-C")
+
+        assert mock_get.call_count == 1
+        assert second.data == first.data == {"risk_score": 9}
+        assert second.data is not first.data   # each hit gets its own copy
+
+    def test_use_cache_false_bypasses_the_cache_both_ways(self):
+        with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+            enrich_submission("ACME-U", use_cache=False)   # not stored
+            enrich_submission("ACME-U")                    # so this is a miss
+            enrich_submission("ACME-U", use_cache=False)   # hit ignored
+
+        assert mock_get.call_count == 3
+
+    def test_failures_are_not_cached(self):
+        bad_response = MagicMock(status_code=404)
+        with patch("client._SESSION.get", side_effect=[bad_response, _ok({})]) as mock_get:
+            assert enrich_submission("ACME-F").success is False
+            assert enrich_submission("ACME-F").success is True
+
+        assert mock_get.call_count == 2
+
+    def test_expired_entry_is_fetched_again(self):
+        with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+            with patch("client.time.monotonic", return_value=0.0) as clock:
+                enrich_submission("ACME-T")   # miss, stored at t=0
+                clock.return_value = RISK_CACHE_TTL
+                enrich_submission("ACME-T")   # looked up at t=TTL — expired, refetched
+
+        assert mock_get.call_count == 2
+
+
+class TestResponseCacheIsOptIn:
+    def test_lookups_are_not_cached_by_default(self):
+        with patch("client._SESSION.get", return_value=_ok({"riskScore": 9})) as mock_get:
+            enrich_submission("ACME-D")
+            enrich_submission("ACME-D")
+
+        assert mock_get.call_count == 2
+        assert len(client._risk_cache) == 0
+
 
 # --------------------------------------------------------------------------- #
 # 4. Batch enrichment with ThreadPoolExecutor                                  #
@@ -196,13 +374,344 @@ class TestBatchEnrichment:
         assert len(report.failed) == 1
         assert report.failed[0].company_id == "BAD"
 
+    def test_report_keeps_input_order(self):
+        def fake_enrich(company_id: str) -> EnrichmentResult:
+            return EnrichmentResult(company_id=company_id, success=company_id != "B")
+
+        with patch("enricher.enrich_submission", side_effect=fake_enrich):
+            report = enrich_batch(["D", "B", "A", "E", "C"], max_workers=3)
+
+        assert [r.company_id for r in report.succeeded] == ["D", "A", "E", "C"]
+        assert [r.company_id for r in report.failed] == ["B"]
+
+    def test_unexpected_error_skips_traceback_when_error_logging_is_off(self):
+        """The failure is still recorded; only the log record is skipped."""
+        with patch("enricher.enrich_submission", side_effect=RuntimeError("boom")), \
+                patch("enricher.logger") as log:
+            log.isEnabledFor.return_value = False
+            report = enrich_batch(["A", "B"], max_workers=2)
+
+        assert [r.error for r in report.failed] == ["Unexpected: boom"] * 2
+        log.exception.assert_not_called()
+
+    def test_stream_yields_every_result_once(self):
+        def fake_enrich(company_id: str) -> EnrichmentResult:
+            if company_id == "BAD":
+                raise RuntimeError("boom")
+            return EnrichmentResult(company_id=company_id, success=True)
+
+        ids = [f"C{i}" for i in range(20)] + ["BAD"]
+        with patch("enricher.enrich_submission", side_effect=fake_enrich):
+            results = list(enrich_stream(iter(ids), max_workers=3))
+
+        assert sorted(r.company_id for r in results) == sorted(ids)
+        assert [r.error for r in results if not r.success] == ["boom"]
+
+    def test_stream_pulls_ids_lazily_within_the_window(self):
+        pulled = []
+
+        def ids():
+            for i in range(1000):
+                pulled.append(i)
+                yield f"C{i}"
+
+        def fake_enrich(company_id: str) -> EnrichmentResult:
+            return EnrichmentResult(company_id=company_id, success=True)
+
+        with patch("enricher.enrich_submission", side_effect=fake_enrich):
+            stream = enrich_stream(ids(), max_workers=2, lookahead=4)
+            first = [next(stream) for _ in range(3)]
+            stream.close()
+
+        assert len(first) == 3
+        assert len(pulled) <= 4 + 3   # the window plus one refill per yield
+
     def test_success_rate_calculation(self):
         succeeded = [EnrichmentResult(company_id="A", success=True)]
         failed = [EnrichmentResult(company_id="B", success=False)]
         report = BatchEnrichmentReport(succeeded=succeeded, failed=failed)
         assert report.success_rate == 0.5
 
+    def test_from_results_partitions_in_order(self):
+        results = [EnrichmentResult(company_id=c, success=c != "B") for c in "ABCB"]
+        report = BatchEnrichmentReport.from_results(results)
+        assert [r.company_id for r in report.succeeded] == ["A", "C"]
+        assert [r.company_id for r in report.failed] == ["B", "B"]
+
     def test_empty_batch_returns_empty_report(self):
         report = enrich_batch([], max_workers=2)
         assert report.succeeded == []
         assert report.failed == []
+
+
+# --------------------------------------------------------------------------- #
+# 5. Async batch enrichment over httpx                                         #
+# --------------------------------------------------------------------------- #
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    """AsyncClient whose transport answers from `handler` — no network."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAsyncBatchEnrichment:
+    def test_results_match_the_sync_path(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if "/BAD/" in request.url.path:
+                return httpx.Response(404)
+            return httpx.Response(200, json={"riskScore": 7})
+
+        async def run() -> BatchEnrichmentReport:
+            async with _mock_client(handler) as client:
+                return await enrich_batch_async(["A", "BAD", "C"], client=client)
+
+        report = asyncio.run(run())
+
+        assert [r.company_id for r in report.succeeded] == ["A", "C"]
+        assert report.succeeded[0].data == {"risk_score": 7}
+        assert report.failed[0].company_id == "BAD"
+        assert "Non-retriable" in report.failed[0].error
+
+    def test_unexpected_error_fails_one_item_not_the_batch(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if "/BAD/" in request.url.path:
+                return httpx.Response(200, content=b"not json")
+            return httpx.Response(200, json={})
+
+        async def run() -> BatchEnrichmentReport:
+            async with _mock_client(handler) as client:
+                return await enrich_batch_async(["A", "BAD"], client=client)
+
+        report = asyncio.run(run())
+
+        assert [r.company_id for r in report.succeeded] == ["A"]
+        assert report.failed[0].error.startswith("Unexpected")
+
+    def test_server_error_is_retried(self):
+        statuses = iter([503, 200])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(next(statuses), json={})
+
+        async def run() -> BatchEnrichmentReport:
+            async with _mock_client(handler) as client:
+                return await enrich_batch_async(["A"], client=client)
+
+        with patch("asyncio.sleep", new=AsyncMock()):   # the async backoff
+            report = asyncio.run(run())
+
+        assert len(report.succeeded) == 1
+
+    def test_concurrency_bounds_in_flight_requests(self):
+        in_flight = peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return httpx.Response(200, json={})
+
+        async def run() -> BatchEnrichmentReport:
+            async with _mock_client(handler) as client:
+                return await enrich_batch_async(
+                    [f"C-{i}" for i in range(10)], concurrency=3, client=client
+                )
+
+        assert len(asyncio.run(run()).succeeded) == 10
+        assert peak == 3
+
+
+
+# --------------------------------------------------------------------------- #
+# 6. Adaptive concurrency limit                                                #
+# --------------------------------------------------------------------------- #
+
+
+def _round(limiter: VegasLimiter, rtt: float) -> None:
+    """Fill every slot, then complete each call with latency `rtt`."""
+    slots = limiter.limit
+    for _ in range(slots):
+        limiter.acquire()
+    for _ in range(slots):
+        limiter.release(rtt, dropped=False)
+
+
+class TestVegasLimiter:
+    def test_grows_while_latency_stays_at_baseline(self):
+        limiter = VegasLimiter(initial_limit=4)
+        for _ in range(3):
+            _round(limiter, 0.1)
+        assert limiter.limit > 4
+
+    def test_shrinks_when_latency_shows_queueing(self):
+        limiter = VegasLimiter(initial_limit=20, alpha=3, beta=6)
+        limiter.acquire()
+        limiter.release(0.1, dropped=False)   # baseline
+        limiter.acquire()
+        limiter.release(0.2, dropped=False)   # queue = 20 · (1 − 0.1/0.2) = 10 > beta
+        assert limiter.limit == 19
+
+    def test_drop_backs_off_multiplicatively(self):
+        limiter = VegasLimiter(initial_limit=10, backoff_ratio=0.5)
+        limiter.acquire()
+        limiter.release(0.1, dropped=True)
+        assert limiter.limit == 5
+
+    def test_idle_caller_does_not_inflate_the_limit(self):
+        limiter = VegasLimiter(initial_limit=10)
+        for _ in range(20):
+            limiter.acquire()                 # one call in flight, never ten
+            limiter.release(0.1, dropped=False)
+        assert limiter.limit == 10
+
+    def test_acquire_blocks_at_the_limit(self):
+        limiter = VegasLimiter(initial_limit=1)
+        limiter.acquire()
+        waiter = threading.Thread(target=limiter.acquire)
+        waiter.start()
+        waiter.join(timeout=0.05)
+        assert waiter.is_alive()              # no slot free
+
+        limiter.release(0.1, dropped=False)
+        waiter.join(timeout=1)
+        assert not waiter.is_alive()
+
+    def test_rejects_an_initial_limit_outside_the_bounds(self):
+        with pytest.raises(ValueError):
+            VegasLimiter(initial_limit=0)
+
+
+class TestLimitedEnrichment:
+    def test_shed_call_is_reported_as_dropped(self):
+        limiter = MagicMock()
+        with patch("client._SESSION.get", return_value=MagicMock(status_code=503)):
+            with patch("client.time.sleep"):
+                result = enrich_submission("ACME-SHED", limiter=limiter)
+
+        assert result.success is False
+        assert limiter.acquire.call_count == limiter.release.call_count == MAX_RETRIES
+        assert all(c.kwargs == {"dropped": True} for c in limiter.release.call_args_list)
+
+    def test_rate_limited_attempt_shrinks_the_limit_before_the_retry_succeeds(self):
+        limiter = VegasLimiter(initial_limit=10, backoff_ratio=0.5)
+        responses = [MagicMock(status_code=429), _ok({"riskScore": 3})]
+        with patch("client._SESSION.get", side_effect=responses):
+            with patch("client.time.sleep"):
+                result = enrich_submission("ACME-429", limiter=limiter)
+
+        assert result.success is True
+        assert limiter.limit == 5
+
+    def test_backoff_sleep_is_not_in_the_reported_rtt(self):
+        now = [0.0]
+        responses = iter([MagicMock(status_code=503), _ok({})])
+
+        def get(*args, **kwargs):
+            now[0] += 0.1                      # every HTTP attempt takes 100 ms
+            return next(responses)
+
+        def sleep(delay):
+            now[0] += delay
+
+        limiter = MagicMock()
+        with patch("client._SESSION.get", side_effect=get):
+            with patch("client.time.sleep", side_effect=sleep), \
+                 patch("client.time.monotonic", side_effect=lambda: now[0]):
+                enrich_submission("ACME-RTT", limiter=limiter)
+
+        rtts = [c.args[0] for c in limiter.release.call_args_list]
+        assert rtts == pytest.approx([0.1, 0.1])
+
+    def test_client_error_is_not_a_drop(self):
+        limiter = MagicMock()
+        with patch("client._SESSION.get", return_value=MagicMock(status_code=404)):
+            enrich_submission("ACME-404", limiter=limiter)
+        assert limiter.release.call_args.kwargs == {"dropped": False}
+
+    def test_cache_hit_bypasses_the_limiter(self, risk_cache):
+        limiter = MagicMock()
+        with patch("client._SESSION.get", return_value=_ok({})):
+            enrich_submission("ACME-HIT", limiter=limiter)
+            enrich_submission("ACME-HIT", limiter=limiter)
+        assert limiter.acquire.call_count == limiter.release.call_count == 1
+
+    def test_batch_passes_the_limiter_to_every_call(self):
+        limiter = VegasLimiter()
+        with patch("client._SESSION.get", return_value=_ok({})):
+            report = enrich_batch(["A", "B", "C"], max_workers=2, limiter=limiter)
+        assert len(report.succeeded) == 3
+        assert limiter._inflight == 0
+
+
+# --------------------------------------------------------------------------- #
+# 7. Bulk enrichment — one POST per chunk                                      #
+# --------------------------------------------------------------------------- #
+
+
+class TestBulkEnrichment:
+    def test_chunks_go_out_as_one_post_each(self):
+        def answer(url, json, timeout):
+            return _ok({cid: {"riskScore": 1} for cid in json["company_ids"]})
+
+        with patch("client._SESSION.post", side_effect=answer) as mock_post:
+            with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+                report = enrich_batch_bulk([f"C-{i}" for i in range(5)], bulk_size=2)
+
+        assert mock_post.call_count == 2          # [C-0, C-1], [C-2, C-3]
+        assert mock_get.call_count == 1           # C-4 alone takes the GET
+        assert len(report.succeeded) == 5
+
+    def test_results_keep_input_order_and_use_the_cache(self, risk_cache):
+        with patch("client._SESSION.get", return_value=_ok({"riskScore": 7})):
+            enrich_submission("CACHED")
+        with patch("client._SESSION.post", return_value=_ok({"A": {}, "B": {}})) as mock_post:
+            results = client.enrich_submissions(["A", "CACHED", "B"])
+
+        assert [r.company_id for r in results] == ["A", "CACHED", "B"]
+        assert results[1].data == {"risk_score": 7}
+        assert mock_post.call_args.kwargs["json"] == {"company_ids": ["A", "B"]}
+
+    def test_rejected_bulk_call_falls_back_to_gets(self):
+        with patch("client._SESSION.post", return_value=MagicMock(status_code=404)):
+            with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+                results = client.enrich_submissions(["A", "B"])
+
+        assert all(r.success for r in results)
+        assert mock_get.call_count == 2
+
+    @pytest.mark.parametrize("body", [b"not json", b"[]", b"null", b'"A"'])
+    def test_non_object_bulk_body_falls_back_to_gets(self, body):
+        with patch("client._SESSION.post", return_value=MagicMock(status_code=200, content=body)):
+            with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+                results = client.enrich_submissions(["A", "B"])
+
+        assert all(r.success for r in results)
+        assert mock_get.call_count == 2
+
+    def test_non_object_entry_falls_back_to_a_get(self):
+        with patch("client._SESSION.post", return_value=_ok({"A": {}, "B": None})):
+            with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+                results = client.enrich_submissions(["A", "B"])
+
+        assert all(r.success for r in results)
+        assert mock_get.call_args.args[0].endswith("/companies/B/risk")
+
+    def test_ids_missing_from_the_answer_fall_back_to_gets(self):
+        with patch("client._SESSION.post", return_value=_ok({"A": {}})):
+            with patch("client._SESSION.get", return_value=_ok({})) as mock_get:
+                results = client.enrich_submissions(["A", "B"])
+
+        assert all(r.success for r in results)
+        assert mock_get.call_args.args[0].endswith("/companies/B/risk")
+
+    def test_exhausted_retries_fail_the_chunk_without_gets(self):
+        with patch("client._SESSION.post", return_value=MagicMock(status_code=503)):
+            with patch("client._SESSION.get") as mock_get:
+                with patch("client.time.sleep"):
+                    results = client.enrich_submissions(["A", "B"])
+
+        assert [r.success for r in results] == [False, False]
+        assert "retries" in results[0].error
+        mock_get.assert_not_called()
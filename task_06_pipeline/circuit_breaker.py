@@ -2,7 +2,7 @@
 Circuit Breaker — resilience pattern for external dependencies.
 
 The problem it solves:
-  Retry (task_02, tenacity) handles a SINGLE transient failure:
+  Retry (task_05's backoff loop) handles a SINGLE transient failure:
     "the API hiccuped — wait 1s and try again."
 
   Circuit breaker handles SUSTAINED failure:
@@ -45,10 +45,23 @@ Relationship to retry:
 
   Typical production composition:
     request → circuit_breaker.allow_request()?
-                yes → tenacity @retry → external_call()
+                yes → retry with backoff → external_call()
                         success → circuit_breaker.record_success()
                         all retries fail → circuit_breaker.record_failure()
                 no  → fast-fail immediately
+
+Locking:
+  Transitions happen under one threading.Lock; reads take no lock. The
+  state and allow_request() read the state attribute directly, and take the
+  lock only when the OPEN → HALF_OPEN timer has run out, re-checking under
+  it (double-checked locking). record_success() with nothing to reset
+  returns without mutating. Checks are read-mostly, so this beats a
+  reader-writer lock, whose read side would still cost two lock round
+  trips in pure Python.
+  Rebinding an attribute is atomic in CPython (GIL or free-threaded), so an
+  unlocked read sees a before or after state, never a torn one. At worst
+  it lets through a call that raced with the failure that opened the
+  circuit, which is also what a locked read just before that failure gives.
 """
 
 import threading
@@ -89,10 +102,12 @@ class CircuitBreaker:
     ) -> None:
         self._failure_threshold = failure_threshold
         self._recovery_timeout = recovery_timeout
+        # Timer kept in integer nanoseconds: exact at any uptime, int compare
+        self._recovery_timeout_ns = int(recovery_timeout * 1e9)
 
         self._state = CircuitState.CLOSED
         self._failure_count = 0
-        self._opened_at: Optional[float] = None
+        self._opened_at_ns: Optional[int] = None
         # One lock guards all state mutations — prevents torn reads
         self._lock = threading.Lock()
 
@@ -114,24 +129,34 @@ class CircuitBreaker:
 
     @property
     def state(self) -> CircuitState:
-        with self._lock:
-            return self.__current_state()
+        state = self._state
+        if state is CircuitState.OPEN and self.__recovery_due():
+            with self._lock:
+                state = self.__current_state()   # re-checked under the lock
+        return state
 
     def allow_request(self) -> bool:
         """
         Return True if this request should be attempted.
         Must be paired with record_success() or record_failure() after the call.
         """
+        # CLOSED: always allow. HALF_OPEN: allow the probe. OPEN: deny.
+        # The state property's body, inlined: this runs on every request.
+        state = self._state
+        if state is not CircuitState.OPEN:
+            return True
+        if not self.__recovery_due():
+            return False
         with self._lock:
-            state = self.__current_state()
-            # CLOSED: always allow. HALF_OPEN: allow the probe. OPEN: deny.
-            return state in (CircuitState.CLOSED, CircuitState.HALF_OPEN)
+            return self.__current_state() is not CircuitState.OPEN
 
     def record_success(self) -> None:
         """Call after a successful external call."""
+        if self._state is CircuitState.CLOSED and not self._failure_count:
+            return   # already reset — the common case while the API is healthy
         with self._lock:
             self._failure_count = 0
-            self._opened_at = None
+            self._opened_at_ns = None
             self._state = CircuitState.CLOSED
 
     def record_failure(self) -> None:
@@ -140,22 +165,26 @@ class CircuitBreaker:
             self._failure_count += 1
             if self._failure_count >= self._failure_threshold:
                 self._state = CircuitState.OPEN
-                self._opened_at = time.monotonic()  # timer starts only when circuit opens
+                self._opened_at_ns = time.monotonic_ns()  # timer starts only when circuit opens
 
     # ------------------------------------------------------------------ #
     # Private                                                              #
     # ------------------------------------------------------------------ #
 
+    def __recovery_due(self) -> bool:
+        """Lock-free peek: has the OPEN timer run out? Re-check under the lock."""
+        opened_at_ns = self._opened_at_ns   # one read: record_success may clear it
+        return (
+            opened_at_ns is not None
+            and time.monotonic_ns() - opened_at_ns >= self._recovery_timeout_ns
+        )
+
     def __current_state(self) -> CircuitState:
         """
         Evaluate the current state, applying the OPEN → HALF_OPEN
         time-based transition.  Must be called with self._lock held.
         Name-mangled (__) to prevent accidental unlocked calls from subclasses.
         """
-        if (
-            self._state == CircuitState.OPEN
-            and self._opened_at is not None
-            and time.monotonic() - self._opened_at >= self._recovery_timeout
-        ):
+        if self._state is CircuitState.OPEN and self.__recovery_due():
             self._state = CircuitState.HALF_OPEN
         return self._state
@@ -29,11 +29,17 @@ Real-world fit:
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from dataclasses import dataclass, field, replace
+import operator
+from collections.abc import Iterable, MutableMapping
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from typing import Optional
 
+import orjson
+
 from circuit_breaker import CircuitBreaker, CircuitState
 
 logger = logging.getLogger(__name__)
@@ -52,7 +58,9 @@ class PipelineStatus(str, Enum):
     ERROR     = "error"
 
 
-@dataclass
+# slots=True: one of these per run(), read and written by every handler —
+# no per-instance __dict__, and fields are fixed-offset attribute loads.
+@dataclass(slots=True)
 class SubmissionContext:
     """
     Mutable carrier object passed from handler to handler.
@@ -77,8 +85,30 @@ class SubmissionContext:
     # Set to True by IdempotencyHandler if this is a replayed request
     was_replay: bool = False
 
+    def with_replay(self) -> SubmissionContext:
+        """
+        Copy flagged as a replay — the idempotency hit path.
+
+        Every field is copied, through _CONTEXT_FIELDS, so a field added to
+        the class is never dropped from replays. The three containers are
+        copied too, so a caller appending to a replay's warnings cannot
+        edit the cached context. The payload is shared: it is the caller's
+        input, not something the chain produced. About twice as fast as
+        dataclasses.replace(), which re-reads fields() and builds a kwargs
+        dict on every call.
+        """
+        replay = SubmissionContext(*_CONTEXT_FIELDS(self))
+        replay.enrichment_data = dict(self.enrichment_data)
+        replay.warnings = list(self.warnings)
+        replay.errors = list(self.errors)
+        replay.was_replay = True
+        return replay
+
     def add_warning(self, msg: str) -> None:
-        logger.warning("Pipeline warning for %r: %s", self.company_id, msg)
+        # Logged here, not in run(), so a chain built straight from handlers
+        # logs too. The guard skips formatting when WARNING is filtered out.
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("Pipeline warning for %r: %s", self.company_id, msg)
         self.warnings.append(msg)
 
     def add_error(self, msg: str) -> None:
@@ -86,6 +116,10 @@ class SubmissionContext:
         self.errors.append(msg)
 
 
+# Every SubmissionContext field, in declaration (= constructor) order.
+_CONTEXT_FIELDS = operator.attrgetter(*(f.name for f in fields(SubmissionContext)))
+
+
 # --------------------------------------------------------------------------- #
 # Handler base class                                                            #
 # --------------------------------------------------------------------------- #
@@ -120,8 +154,11 @@ class Handler:
         return self._next(ctx)
 
     def _next(self, ctx: SubmissionContext) -> SubmissionContext:
-        if self._next_handler:
-            return self._next_handler.handle(ctx)
+        # One attribute load and an identity test: this runs once per stage
+        # per submission, and truthiness would first look for __bool__/__len__.
+        handler = self._next_handler
+        if handler is not None:
+            return handler.handle(ctx)
         return ctx  # end of chain — return context as-is
 
 
@@ -130,6 +167,58 @@ class Handler:
 # --------------------------------------------------------------------------- #
 
 
+# Payload field an upstream system can use to supply its own key (an HTTP
+# Idempotency-Key header, a Kafka message key). Same field and same rule as
+# task_02's CLIENT_KEY_FIELD: 64 hex characters, so a payload is accepted
+# by both modules or by neither.
+CALLER_KEY_FIELD = "_idempotency_key"
+
+# Cache-key namespace for caller keys. payload_key() is bare hex and never
+# contains ":", so a caller cannot pick a key that lands on a content hash.
+_CALLER_KEY_PREFIX = "caller:"
+
+# Same canonical form as task_02: sorted keys (nested too), int/enum keys
+# accepted the way json.dumps did, default=str for Decimal and the like.
+_CANONICAL_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def payload_key(payload: dict) -> str:
+    """
+    Idempotency key for a raw payload: 128 bits of SHA-256, as 32 hex chars.
+
+    Runs on every submission, replays and open-circuit fast-fails included,
+    so orjson does the canonicalisation (several times faster than
+    json.dumps, and already bytes) and hashlib's OpenSSL SHA-256 the digest.
+    Half the digest is plenty for an in-process cache key and halves the
+    hex work and the key's size.
+
+    Raises TypeError/ValueError for a payload neither encoder can write
+    (e.g. a circular reference); IdempotencyHandler turns that into ERROR.
+    """
+    try:
+        canonical = orjson.dumps(payload, option=_CANONICAL_OPTIONS, default=str)
+    except orjson.JSONEncodeError:
+        # orjson rejects integers outside 64 bits (and never calls default
+        # for them). The stdlib encoder takes any int and, with these
+        # arguments, writes the same compact sorted form — as task_02 does.
+        canonical = json.dumps(
+            payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+        ).encode()
+    return hashlib.sha256(canonical).digest()[:16].hex()
+
+
+def _caller_key(supplied: object) -> Optional[str]:
+    """The cache key for a caller-supplied key, or None if it is malformed."""
+    if isinstance(supplied, str) and len(supplied) == 64:
+        try:
+            raw = bytes.fromhex(supplied)
+        except ValueError:
+            return None
+        if len(raw) == 32:   # fromhex skips whitespace
+            return _CALLER_KEY_PREFIX + raw.hex()
+    return None
+
+
 class IdempotencyHandler(Handler):
     """
     Stage 1: Check if we have already processed this exact payload.
@@ -139,22 +228,46 @@ class IdempotencyHandler(Handler):
     The result will be stored in the cache AFTER the chain completes
     (the caller's responsibility — the handler only checks, not stores,
     to avoid storing partial results if a later handler fails).
+
+    A payload carrying CALLER_KEY_FIELD is keyed by that value, under its
+    own "caller:" namespace, and is not hashed at all. With require_caller_key=True a payload without one is an
+    ERROR — for deployments where every producer supplies keys, so a missing
+    key is a producer bug rather than something to paper over with a hash.
     """
 
-    def __init__(self, cache: dict) -> None:
+    def __init__(
+        self,
+        cache: MutableMapping[str, SubmissionContext],
+        *,
+        require_caller_key: bool = False,
+    ) -> None:
         super().__init__()
         self._cache = cache
+        self._require_caller_key = require_caller_key
 
     def handle(self, ctx: SubmissionContext) -> SubmissionContext:
-        import hashlib, json
-        key = hashlib.sha256(
-            json.dumps(ctx.payload, sort_keys=True, default=str).encode()
-        ).hexdigest()
+        supplied = ctx.payload.get(CALLER_KEY_FIELD)
+        if supplied is None and not self._require_caller_key:
+            try:
+                key = payload_key(ctx.payload)
+            except (TypeError, ValueError) as exc:
+                ctx.status = PipelineStatus.ERROR
+                ctx.add_error(f"Payload cannot be keyed for idempotency: {exc}")
+                return ctx  # ← short-circuit: nothing to deduplicate on
+        else:
+            key = _caller_key(supplied)
+            if key is None:
+                ctx.status = PipelineStatus.ERROR
+                ctx.add_error(f"{CALLER_KEY_FIELD} must be 64 hex characters, got {supplied!r}")
+                return ctx  # ← short-circuit: nothing to deduplicate on
         ctx.idempotency_key = key
 
-        if key in self._cache:
-            logger.info("Idempotency hit — returning cached result for key=%s", key[:16])
-            return replace(self._cache[key], was_replay=True)  # ← short-circuit: copy, don't mutate the cache
+        # One get(), not `in` then [] — a bounded cache could evict in between.
+        cached = self._cache.get(key)
+        if cached is not None:
+            if logger.isEnabledFor(logging.INFO):   # skip the key slice when INFO is off
+                logger.info("Idempotency hit — returning cached result for key=%s", key[:16])
+            return cached.with_replay()  # ← short-circuit: copy, don't mutate the cache
 
         return self._next(ctx)  # ← pass to next handler
 
@@ -177,7 +290,8 @@ class ValidationHandler(Handler):
             return ctx  # ← short-circuit
 
         ctx.company_id = ctx.payload["company_id"]
-        logger.info("Validation passed for company_id=%r", ctx.company_id)
+        # DEBUG, not INFO: a passing submission is the common case, not news.
+        logger.debug("Validation passed for company_id=%r", ctx.company_id)
         return self._next(ctx)
 
 
@@ -229,9 +343,12 @@ class DeduplicationHandler(Handler):
     and pass through.
     """
 
-    def __init__(self, existing_ids: set[str]) -> None:
+    def __init__(self, existing_ids: Iterable[str]) -> None:
         super().__init__()
-        self._existing = existing_ids
+        # Snapshot once at build time: worker threads share this handler, and
+        # a frozenset cannot change under them. frozenset() of a frozenset is
+        # the same object, so pre-frozen ID sets are not copied.
+        self._existing = frozenset(existing_ids)
 
     def handle(self, ctx: SubmissionContext) -> SubmissionContext:
         if ctx.company_id in self._existing:
@@ -265,9 +382,6 @@ class EnrichmentHandler(Handler):
     def handle(self, ctx: SubmissionContext) -> SubmissionContext:
         # Circuit breaker fast-fail: skip the API entirely when OPEN
         if self._breaker and not self._breaker.allow_request():
-            logger.warning(
-                "Circuit OPEN — skipping enrichment for %r", ctx.company_id
-            )
             ctx.add_warning(
                 "Enrichment skipped: Risk API circuit breaker is OPEN. "
                 "The API has been failing — enrichment will resume automatically."
@@ -284,7 +398,7 @@ class EnrichmentHandler(Handler):
                 self._breaker.record_failure()
         else:
             ctx.enrichment_data = data
-            logger.info("Enrichment succeeded for %r", ctx.company_id)
+            logger.debug("Enrichment succeeded for %r", ctx.company_id)
             if self._breaker:
                 self._breaker.record_success()
 
@@ -303,19 +417,25 @@ class SubmissionPipeline:
     The builder separates chain construction from chain execution.
     Tests can build minimal chains (e.g., just Validation → Triage) to
     test one stage without the overhead of the full pipeline.
+
+    `cache` is any mapping from idempotency key to finished context. A plain
+    dict is fine for tests; long-running or multi-threaded workers should
+    pass a result_cache.ShardedLRUCache, which is bounded and thread-safe.
     """
 
     def __init__(
         self,
-        cache: dict,
+        cache: MutableMapping[str, SubmissionContext],
         rules: list,
-        existing_ids: set[str],
+        existing_ids: Iterable[str],
         risk_db: dict,
         breaker: Optional[CircuitBreaker] = None,
+        *,
+        require_caller_key: bool = False,
     ) -> None:
         # Build the chain: each set_next() returns the next handler
         # so the calls can be written as a readable left-to-right sequence.
-        head = IdempotencyHandler(cache)
+        head = IdempotencyHandler(cache, require_caller_key=require_caller_key)
         head \
             .set_next(ValidationHandler()) \
             .set_next(TriageHandler(rules)) \
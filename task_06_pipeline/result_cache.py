@@ -0,0 +1,109 @@
+"""
+ShardedLRUCache — bounded, thread-safe store for finished pipeline results.
+
+The problem it solves:
+  SubmissionPipeline caches every completed SubmissionContext by its
+  idempotency key. A plain dict never forgets a key, so a long-running
+  worker grows without limit. Several workers sharing one pipeline also
+  need the cache to be safe across threads, and a single lock around one
+  LRU would serialise every lookup.
+
+How it works:
+  Keys are spread over NUM_SHARDS OrderedDicts by hash(key) & mask, each
+  with its own threading.Lock. This is the same striping as task_02's
+  stores and IdempotentProcessor. A lookup or store locks one shard, so
+  threads working on different keys rarely contend. Each shard holds at most
+  ⌈maxsize / shards⌉ entries and evicts its least recently used one, so the
+  total stays within maxsize (rounded up to a multiple of the shard count).
+  Recency is per shard, not global — a fine approximation at these sizes.
+
+How it fits:
+  SubmissionPipeline only needs `get(key)` and `cache[key] = ctx`, so a
+  plain dict still works for tests and short scripts:
+
+      pipeline = SubmissionPipeline(cache=ShardedLRUCache(maxsize=100_000), ...)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+from typing import Generic, Optional, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class ShardedLRUCache(MutableMapping, Generic[K, V]):
+    """Thread-safe LRU mapping split into independently locked shards."""
+
+    # Power of two, so a shard is picked with a mask instead of a modulo.
+    NUM_SHARDS = 16
+    DEFAULT_MAXSIZE = 100_000
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, *, shards: int = NUM_SHARDS) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        if shards < 1 or shards & (shards - 1):
+            raise ValueError(f"shards must be a power of two, got {shards}")
+        self._mask = shards - 1
+        self._shard_maxsize = -(-maxsize // shards)   # ceil division
+        self._shards: tuple[OrderedDict[K, V], ...] = tuple(
+            OrderedDict() for _ in range(shards)
+        )
+        self._locks = tuple(threading.Lock() for _ in range(shards))
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """One locked lookup that also marks the key as recently used."""
+        index = hash(key) & self._mask
+        shard = self._shards[index]
+        with self._locks[index]:
+            try:
+                shard.move_to_end(key)
+            except KeyError:
+                return default
+            return shard[key]
+
+    def __getitem__(self, key: K) -> V:
+        index = hash(key) & self._mask
+        shard = self._shards[index]
+        with self._locks[index]:
+            value = shard[key]
+            shard.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        index = hash(key) & self._mask
+        shard = self._shards[index]
+        with self._locks[index]:
+            shard[key] = value
+            shard.move_to_end(key)
+            if len(shard) > self._shard_maxsize:
+                shard.popitem(last=False)   # least recently used
+
+    def __delitem__(self, key: K) -> None:
+        index = hash(key) & self._mask
+        with self._locks[index]:
+            del self._shards[index][key]
+
+    def __contains__(self, key: object) -> bool:
+        # A membership check is not a use — it does not refresh the key.
+        index = hash(key) & self._mask
+        with self._locks[index]:
+            return key in self._shards[index]
+
+    def __len__(self) -> int:
+        total = 0
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                total += len(shard)
+        return total
+
+    def __iter__(self) -> Iterator[K]:
+        # A snapshot, so iterating never races with concurrent writers.
+        keys: list[K] = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                keys.extend(shard)
+        return iter(keys)
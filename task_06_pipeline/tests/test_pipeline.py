@@ -9,8 +9,12 @@ What these tests demonstrate:
   - Adding a new handler requires zero changes to existing handlers
 """
 
+import logging
 import sys
-import time
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
+from decimal import Decimal
+from enum import Enum
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -18,8 +22,11 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+import circuit_breaker as circuit_breaker_module
 from circuit_breaker import CircuitBreaker, CircuitState
+import pipeline as pipeline_module
 from pipeline import (
+    CALLER_KEY_FIELD,
     DeduplicationHandler,
     EnrichmentHandler,
     Handler,
@@ -29,7 +36,9 @@ from pipeline import (
     SubmissionPipeline,
     TriageHandler,
     ValidationHandler,
+    payload_key,
 )
+from result_cache import ShardedLRUCache
 
 # --------------------------------------------------------------------------- #
 # Shared helpers                                                               #
@@ -43,11 +52,61 @@ VALID_PAYLOAD = {
     "state": "CA",
 }
 
+# A well-formed caller key: 64 hex characters, as task_02 requires.
+CALLER_KEY = "ab" * 32
+
+
+# Frozen, so DeduplicationHandler keeps it as is instead of copying it
+_ACME_IDS = frozenset({VALID_PAYLOAD["company_id"]})
+
 
 def _ctx(payload: dict | None = None) -> SubmissionContext:
     return SubmissionContext(payload=payload or VALID_PAYLOAD)
 
 
+class _Sentinel(Handler):
+    """Last handler in a test chain: records every context that reaches it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[SubmissionContext] = []
+
+    def handle(self, ctx: SubmissionContext) -> SubmissionContext:
+        self.calls.append(ctx)
+        return ctx
+
+
+class _SpyDB(dict):
+    """A risk_db that records every lookup EnrichmentHandler makes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[str] = []
+
+    def get(self, key, default=None):
+        self.calls.append(key)
+        return super().get(key, default)
+
+
+@dataclass(slots=True)
+class _StubResult:
+    """What TriageHandler reads from a rule result."""
+    status: PipelineStatus
+    reason: str = "test"
+
+
+class _StubRule:
+    """A rule that always returns the same result (None = does not fire)."""
+
+    __slots__ = ("_result",)
+
+    def __init__(self, result: _StubResult | None) -> None:
+        self._result = result
+
+    def evaluate_raw(self, ctx: SubmissionContext) -> _StubResult | None:
+        return self._result
+
+
 # --------------------------------------------------------------------------- #
 # 1. Handler base — set_next / _next wiring                                   #
 # --------------------------------------------------------------------------- #
@@ -88,27 +147,17 @@ class TestHandlerWiring:
 
 class TestIdempotencyHandler:
     def test_miss_populates_key_and_continues(self):
-        reached_next = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached_next.append(True)
-                return ctx
+        sentinel = _Sentinel()
 
         cache = {}
         h = IdempotencyHandler(cache)
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
         h.handle(_ctx())
 
-        assert reached_next == [True]
+        assert len(sentinel.calls) == 1
 
     def test_hit_returns_cached_context_and_short_circuits(self):
-        reached_next = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached_next.append(True)
-                return ctx
+        sentinel = _Sentinel()
 
         # Pre-populate cache with a known context
         cached_ctx = _ctx()
@@ -117,21 +166,82 @@ class TestIdempotencyHandler:
 
         # First call — populates the key
         h = IdempotencyHandler(cache)
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
         first = h.handle(_ctx())
         key = first.idempotency_key
         cache[key] = cached_ctx   # simulate the pipeline storing it
 
         # Second call — should hit the cache and NOT call Sentinel again
-        reached_next.clear()
+        sentinel.calls.clear()
         second = h.handle(_ctx())
 
         assert second.was_replay is True
         assert second.status == PipelineStatus.APPROVED
-        assert reached_next == []   # chain was short-circuited
+        assert sentinel.calls == []   # chain was short-circuited
+
+    def test_key_ignores_field_order_and_is_32_hex_chars(self):
+        payload = {"company_id": "C-1", "revenue": Decimal("10.5"), "meta": {"b": 1, "a": 2}}
+        reordered = {"meta": {"a": 2, "b": 1}, "revenue": Decimal("10.5"), "company_id": "C-1"}
+        key = payload_key(payload)
+        assert key == payload_key(reordered)
+        assert len(key) == 32 and int(key, 16) >= 0
+
+    def test_integers_beyond_64_bits_are_keyed(self):
+        key = payload_key({**VALID_PAYLOAD, "revenue": 2**70})
+        assert key == payload_key({**VALID_PAYLOAD, "revenue": 2**70})
+        assert key != payload_key({**VALID_PAYLOAD, "revenue": 2**70 + 1})
+
+    def test_unkeyable_payload_is_an_error_not_an_exception(self):
+        payload = {**VALID_PAYLOAD}
+        payload["self"] = payload
+        pipeline = SubmissionPipeline(cache={}, rules=[], existing_ids=(), risk_db={})
+        ctx = pipeline.run(payload)
+        assert ctx.status == PipelineStatus.ERROR
+        assert "cannot be keyed" in ctx.errors[0]
+
+    def test_caller_key_is_used_without_hashing(self, monkeypatch):
+        def fail(payload):
+            raise AssertionError("payload was hashed")
+
+        monkeypatch.setattr(pipeline_module, "payload_key", fail)
+        ctx = IdempotencyHandler({}).handle(_ctx({**VALID_PAYLOAD, CALLER_KEY_FIELD: CALLER_KEY}))
+        assert ctx.idempotency_key == "caller:" + CALLER_KEY
+
+    def test_same_caller_key_replays_a_different_body(self):
+        pipeline = SubmissionPipeline(cache={}, rules=[], existing_ids=(), risk_db={})
+        first = pipeline.run({**VALID_PAYLOAD, CALLER_KEY_FIELD: CALLER_KEY})
+        second = pipeline.run({**VALID_PAYLOAD, "revenue": 1, CALLER_KEY_FIELD: CALLER_KEY.upper()})
+        assert second.was_replay is True
+        assert second.payload is first.payload
+
+    @pytest.mark.parametrize("key", ["", 42, "req-42", "g" * 64, CALLER_KEY[:-2] + "  "])
+    def test_malformed_caller_key_is_an_error(self, key):
+        ctx = IdempotencyHandler({}).handle(_ctx({**VALID_PAYLOAD, CALLER_KEY_FIELD: key}))
+        assert ctx.status == PipelineStatus.ERROR
+        assert ctx.idempotency_key is None
+
+    def test_caller_key_cannot_land_on_a_content_hash(self):
+        pipeline = SubmissionPipeline(cache={}, rules=[], existing_ids=(), risk_db={})
+        victim = pipeline.run(VALID_PAYLOAD)
+        for forged in (victim.idempotency_key, victim.idempotency_key * 2):
+            other = pipeline.run({**VALID_PAYLOAD, "revenue": 1, CALLER_KEY_FIELD: forged})
+            assert other.was_replay is False
+            assert other.idempotency_key != victim.idempotency_key
+
+    def test_required_caller_key_missing_is_an_error(self):
+        pipeline = SubmissionPipeline(
+            cache={}, rules=[], existing_ids=(), risk_db={}, require_caller_key=True
+        )
+        result = pipeline.run(VALID_PAYLOAD)
+        assert result.status == PipelineStatus.ERROR
+        assert CALLER_KEY_FIELD in result.errors[0]
+
+    def test_context_rejects_undeclared_attributes(self):
+        with pytest.raises(AttributeError):
+            _ctx().scratch = 1   # slots: ad-hoc data goes in enrichment_data
 
     def test_cached_object_is_not_mutated_on_replay(self):
-        """replace() returns a copy — the object stored in the cache keeps was_replay=False."""
+        """with_replay() returns a copy — the object stored in the cache keeps was_replay=False."""
         cache = {}
         h = IdempotencyHandler(cache)
         first = h.handle(_ctx())
@@ -143,6 +253,32 @@ class TestIdempotencyHandler:
         assert cache[key].was_replay is False  # cached original is untouched
 
 
+    def test_with_replay_copies_every_field(self):
+        # A distinct marker per field, so a field dropped by with_replay()
+        # shows up here as a default value.
+        values = {f.name: object() for f in fields(SubmissionContext)}
+        values.update(enrichment_data={"k": object()}, warnings=["w"], errors=["e"])
+        copy = SubmissionContext(**values).with_replay()
+        assert copy.was_replay is True
+        for name, value in values.items():
+            if name in ("enrichment_data", "warnings", "errors"):
+                assert getattr(copy, name) == value and getattr(copy, name) is not value, name
+            elif name != "was_replay":
+                assert getattr(copy, name) is value, name
+
+    def test_mutating_a_replay_does_not_touch_the_cached_context(self):
+        pipeline = SubmissionPipeline(cache={}, rules=[], existing_ids=(), risk_db={})
+        first = pipeline.run(VALID_PAYLOAD)
+        replay = pipeline.run(VALID_PAYLOAD)
+        replay.add_warning("caller note")
+        replay.enrichment_data["extra"] = 1
+        replay.errors.append("caller error")
+
+        again = pipeline.run(VALID_PAYLOAD)
+        assert (again.warnings, again.errors) == (first.warnings, first.errors)
+        assert "extra" not in again.enrichment_data
+
+
 # --------------------------------------------------------------------------- #
 # 3. ValidationHandler                                                         #
 # --------------------------------------------------------------------------- #
@@ -150,52 +286,38 @@ class TestIdempotencyHandler:
 
 class TestValidationHandler:
     def test_valid_payload_populates_company_id_and_continues(self):
-        reached = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(ctx.company_id)
-                return ctx
+        sentinel = _Sentinel()
 
         h = ValidationHandler()
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
         h.handle(_ctx())
 
-        assert reached == ["ACME-001"]
-
-    def test_missing_field_sets_error_and_short_circuits(self):
-        reached = []
+        assert [c.company_id for c in sentinel.calls] == ["ACME-001"]
 
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(True)
-                return ctx
+    @pytest.mark.parametrize("missing", list(VALID_PAYLOAD))
+    def test_missing_field_sets_error_and_short_circuits(self, missing):
+        sentinel = _Sentinel()
 
         h = ValidationHandler()
-        h.set_next(Sentinel())
-        ctx = SubmissionContext(payload={"company_id": "X"})   # missing all other fields
-        result = h.handle(ctx)
+        h.set_next(sentinel)
+        payload = {k: v for k, v in VALID_PAYLOAD.items() if k != missing}
+        result = h.handle(SubmissionContext(payload=payload))
 
         assert result.status == PipelineStatus.ERROR
-        assert result.errors                    # error message recorded
-        assert reached == []                    # chain stopped
+        assert missing in result.errors[0]      # error names the missing field
+        assert sentinel.calls == []   # chain stopped
 
     def test_revenue_zero_is_valid_not_missing(self):
         """revenue=0 is falsy but present — should not be treated as a missing field."""
-        reached = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(ctx.company_id)
-                return ctx
+        sentinel = _Sentinel()
 
         payload = {**VALID_PAYLOAD, "revenue": 0}
         h = ValidationHandler()
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
         result = h.handle(SubmissionContext(payload=payload))
 
         assert result.status != PipelineStatus.ERROR   # validation passed
-        assert reached == ["ACME-001"]                 # chain continued
+        assert [c.company_id for c in sentinel.calls] == ["ACME-001"]   # chain continued
 
 
 # --------------------------------------------------------------------------- #
@@ -205,66 +327,64 @@ class TestValidationHandler:
 
 class TestTriageHandler:
     def _make_rule(self, *, fires: bool, status: PipelineStatus, reason: str = "test"):
-        """Build a minimal mock rule."""
-        result = MagicMock()
-        result.status = status
-        result.reason = reason
-        mock_rule = MagicMock()
-        mock_rule.evaluate_raw.return_value = result if fires else None
-        return mock_rule
+        """Build a minimal stub rule."""
+        return _StubRule(_StubResult(status, reason) if fires else None)
 
     def test_declined_rule_short_circuits_before_next_handler(self):
-        reached = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(True)
-                return ctx
+        sentinel = _Sentinel()
 
         rule = self._make_rule(fires=True, status=PipelineStatus.DECLINED)
         triage = TriageHandler(rules=[rule])
-        triage.set_next(Sentinel())
+        triage.set_next(sentinel)
 
         ctx = _ctx()
         ctx.company_id = "ACME-001"
         result = triage.handle(ctx)
 
         assert result.status == PipelineStatus.DECLINED
-        assert reached == []   # enrichment never called
+        assert sentinel.calls == []   # enrichment never called
 
-    def test_no_matching_rule_approves_and_continues(self):
-        reached = []
+    def test_declined_from_another_str_enum_still_short_circuits(self):
+        # task_03 rules report their own TriageStatus(str, Enum). It is equal
+        # to PipelineStatus.DECLINED by value but is not the same object, so
+        # TriageHandler must compare with ==, not `is`.
+        class TriageStatus(str, Enum):
+            DECLINED = "declined"
 
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(True)
-                return ctx
+        sentinel = _Sentinel()
+
+        triage = TriageHandler(rules=[self._make_rule(fires=True, status=TriageStatus.DECLINED)])
+        triage.set_next(sentinel)
+
+        ctx = _ctx()
+        ctx.company_id = "ACME-001"
+        triage.handle(ctx)
+
+        assert sentinel.calls == []
+
+    def test_no_matching_rule_approves_and_continues(self):
+        sentinel = _Sentinel()
 
         rule = self._make_rule(fires=False, status=PipelineStatus.PENDING)
         h = TriageHandler(rules=[rule])
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
 
         ctx = _ctx()
         ctx.company_id = "ACME-001"
         result = h.handle(ctx)
 
         assert result.status == PipelineStatus.APPROVED
-        assert reached == [True]   # chain continued
+        assert len(sentinel.calls) == 1   # chain continued
 
     def test_manual_review_rule_fires_warning_and_continues(self):
         """MANUAL_REVIEW is not a hard stop — a warning is added and the chain continues."""
-        reached = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(True)
-                return ctx
+        sentinel = _Sentinel()
 
         rule = self._make_rule(
             fires=True, status=PipelineStatus.DUPLICATE, reason="Needs human review"
         )
         h = TriageHandler(rules=[rule])
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
 
         ctx = _ctx()
         ctx.company_id = "ACME-001"
@@ -272,7 +392,7 @@ class TestTriageHandler:
 
         assert result.status == PipelineStatus.DUPLICATE    # status set
         assert any("Manual review" in w for w in result.warnings)  # warning added
-        assert reached == [True]                            # chain NOT short-circuited
+        assert len(sentinel.calls) == 1   # chain NOT short-circuited
 
 
 # --------------------------------------------------------------------------- #
@@ -282,22 +402,17 @@ class TestTriageHandler:
 
 class TestDeduplicationHandler:
     def test_known_id_adds_warning_but_continues(self):
-        reached = []
-
-        class Sentinel(Handler):
-            def handle(self, ctx):
-                reached.append(True)
-                return ctx
+        sentinel = _Sentinel()
 
         h = DeduplicationHandler(existing_ids={"ACME-001"})
-        h.set_next(Sentinel())
+        h.set_next(sentinel)
         ctx = _ctx()
         ctx.company_id = "ACME-001"
         result = h.handle(ctx)
 
         assert result.status == PipelineStatus.DUPLICATE
         assert result.warnings              # warning was added
-        assert reached == [True]            # chain still continued — NOT short-circuited
+        assert len(sentinel.calls) == 1   # chain still continued — NOT short-circuited
 
     def test_unknown_id_passes_through_unchanged(self):
         h = DeduplicationHandler(existing_ids={"OTHER"})
@@ -308,6 +423,18 @@ class TestDeduplicationHandler:
         assert result.status == PipelineStatus.PENDING   # unchanged by this handler
         assert result.warnings == []
 
+    def test_existing_ids_are_snapshotted_at_build_time(self):
+        ids = {"OTHER"}
+        h = DeduplicationHandler(existing_ids=ids)
+        ids.add("ACME-001")   # later changes by the caller are not seen
+        ctx = _ctx()
+        ctx.company_id = "ACME-001"
+        assert h.handle(ctx).status == PipelineStatus.PENDING
+
+    def test_frozen_id_set_is_not_copied(self):
+        ids = frozenset({"ACME-001"})
+        assert DeduplicationHandler(existing_ids=ids)._existing is ids
+
 
 # --------------------------------------------------------------------------- #
 # 6. Full pipeline integration                                                 #
@@ -318,7 +445,7 @@ class TestFullPipeline:
     def _pipeline(
         self,
         *,
-        existing_ids: set[str] = frozenset(),
+        existing_ids: Iterable[str] = frozenset(),
         risk_db: dict | None = None,
         rules: list | None = None,
     ) -> SubmissionPipeline:
@@ -337,6 +464,27 @@ class TestFullPipeline:
         assert result.enrichment_data == {"risk_score": 72}
         assert result.errors == []
 
+    def test_happy_path_logs_nothing_at_info(self, caplog):
+        with caplog.at_level(logging.INFO, logger="pipeline"):
+            self._pipeline().run(VALID_PAYLOAD)
+        assert caplog.records == []   # per-submission success lines are DEBUG
+
+    def test_each_warning_is_logged_once(self, caplog):
+        pipeline = self._pipeline(existing_ids=_ACME_IDS, risk_db={"OTHER": {}})
+        with caplog.at_level(logging.WARNING, logger="pipeline"):
+            result = pipeline.run(VALID_PAYLOAD)
+            pipeline.run(VALID_PAYLOAD)   # replay — already logged
+        assert len(result.warnings) == 2   # duplicate + no enrichment data
+        assert len(caplog.records) == 2
+        assert all("ACME-001" in r.getMessage() for r in caplog.records)
+
+    def test_handler_chain_without_run_logs_its_warnings(self, caplog):
+        breaker = MagicMock(spec=CircuitBreaker)
+        breaker.allow_request.return_value = False
+        with caplog.at_level(logging.WARNING, logger="pipeline"):
+            EnrichmentHandler({}, breaker=breaker).handle(_ctx())
+        assert "circuit breaker is OPEN" in caplog.text
+
     def test_validation_failure_stops_before_enrichment(self):
         pipeline = self._pipeline(risk_db={"ACME-001": {"risk_score": 99}})
         result = pipeline.run({"company_id": "X"})   # missing required fields
@@ -353,13 +501,7 @@ class TestFullPipeline:
                 return super().handle(ctx)
 
         # Manually build a minimal pipeline to inject the spy
-        from pipeline import IdempotencyHandler, ValidationHandler, TriageHandler
-
-        decline_rule = MagicMock()
-        decline_result = MagicMock()
-        decline_result.status = PipelineStatus.DECLINED
-        decline_result.reason = "Over revenue"
-        decline_rule.evaluate_raw.return_value = decline_result
+        decline_rule = _StubRule(_StubResult(PipelineStatus.DECLINED, "Over revenue"))
 
         cache = {}
         head = IdempotencyHandler(cache)
@@ -374,7 +516,7 @@ class TestFullPipeline:
 
     def test_duplicate_flag_does_not_stop_enrichment(self):
         pipeline = self._pipeline(
-            existing_ids={"ACME-001"},
+            existing_ids=_ACME_IDS,
             risk_db={"ACME-001": {"risk_score": 55}},
         )
         result = pipeline.run(VALID_PAYLOAD)
@@ -415,8 +557,6 @@ class TestFullPipeline:
 
         # Insert between validation and triage — no existing class modified
         cache = {}
-        from pipeline import IdempotencyHandler, ValidationHandler, TriageHandler, DeduplicationHandler, EnrichmentHandler
-
         head = IdempotencyHandler(cache)
         head.set_next(ValidationHandler()) \
             .set_next(audit) \
@@ -454,41 +594,40 @@ class TestFullPipeline:
 
 
 class TestEnrichmentHandlerCircuitBreaker:
-    def _ctx_with_id(self) -> SubmissionContext:
+    @pytest.fixture
+    def acme_ctx(self) -> SubmissionContext:
+        """A context as EnrichmentHandler sees it: validated, company_id set."""
         ctx = _ctx()
         ctx.company_id = "ACME-001"
         return ctx
 
-    def test_open_circuit_fast_fails_without_calling_db(self):
+    def test_open_circuit_fast_fails_without_calling_db(self, acme_ctx):
         breaker = CircuitBreaker(failure_threshold=1)
         breaker.record_failure()
 
-        db_calls = []
-        risk_db = MagicMock()
-        risk_db.get.side_effect = lambda k: db_calls.append(k) or None
-
+        risk_db = _SpyDB()
         h = EnrichmentHandler(risk_db=risk_db, breaker=breaker)
-        result = h.handle(self._ctx_with_id())
+        result = h.handle(acme_ctx)
 
         assert result.enrichment_data == {"enrichment_failed": True, "reason": "circuit_open"}
-        assert db_calls == []   # API was never touched
+        assert risk_db.calls == []   # API was never touched
 
-    def test_successful_enrichment_calls_record_success(self):
+    def test_successful_enrichment_calls_record_success(self, acme_ctx):
         breaker = MagicMock(spec=CircuitBreaker)
         breaker.allow_request.return_value = True
 
         h = EnrichmentHandler(risk_db={"ACME-001": {"score": 72}}, breaker=breaker)
-        h.handle(self._ctx_with_id())
+        h.handle(acme_ctx)
 
         breaker.record_success.assert_called_once()
         breaker.record_failure.assert_not_called()
 
-    def test_missing_enrichment_data_calls_record_failure(self):
+    def test_missing_enrichment_data_calls_record_failure(self, acme_ctx):
         breaker = MagicMock(spec=CircuitBreaker)
         breaker.allow_request.return_value = True
 
         h = EnrichmentHandler(risk_db={}, breaker=breaker)   # ACME-001 not in db
-        h.handle(self._ctx_with_id())
+        h.handle(acme_ctx)
 
         breaker.record_failure.assert_called_once()
         breaker.record_success.assert_not_called()
@@ -499,55 +638,91 @@ class TestEnrichmentHandlerCircuitBreaker:
 # --------------------------------------------------------------------------- #
 
 
+# (failure_threshold, events, expected state). Events: "fail" and "success"
+# record a call outcome; "probe" advances the clock past recovery_timeout and
+# asks allow_request(), which must let the probe call through.
+_TRANSITIONS = [
+    pytest.param(5, [], CircuitState.CLOSED, id="starts-closed"),
+    pytest.param(3, ["fail", "fail"], CircuitState.CLOSED, id="below-threshold"),
+    pytest.param(3, ["fail", "fail", "fail"], CircuitState.OPEN, id="threshold-opens"),
+    pytest.param(1, ["fail", "probe"], CircuitState.HALF_OPEN, id="timeout-half-opens"),
+    pytest.param(1, ["fail", "probe", "success"], CircuitState.CLOSED, id="probe-success-closes"),
+    pytest.param(1, ["fail", "probe", "fail"], CircuitState.OPEN, id="probe-failure-reopens"),
+    # The success clears the first failure, so the count ends at 1 of 2
+    pytest.param(2, ["fail", "success", "fail"], CircuitState.CLOSED, id="success-resets-count"),
+]
+
+
 class TestCircuitBreaker:
-    def test_initial_state_is_closed(self):
-        assert CircuitBreaker().state == CircuitState.CLOSED
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Fake time.monotonic_ns: advance it instead of sleeping."""
+        clock = MagicMock(return_value=0)
+        monkeypatch.setattr(circuit_breaker_module.time, "monotonic_ns", clock)
+        return clock
+
+    @pytest.mark.parametrize("threshold, events, expected", _TRANSITIONS)
+    def test_state_transitions(self, clock, threshold, events, expected):
+        breaker = CircuitBreaker(failure_threshold=threshold, recovery_timeout=0.01)
+        for event in events:
+            if event == "fail":
+                breaker.record_failure()
+            elif event == "success":
+                breaker.record_success()
+            else:
+                clock.return_value += 20_000_000   # 20 ms
+                assert breaker.allow_request() is True
+        assert breaker.state == expected
 
     def test_allow_request_true_when_closed(self):
         assert CircuitBreaker().allow_request() is True
 
-    def test_transitions_to_open_after_threshold_failures(self):
-        breaker = CircuitBreaker(failure_threshold=3)
-        breaker.record_failure()
-        breaker.record_failure()
-        assert breaker.state == CircuitState.CLOSED   # threshold not yet reached
-        breaker.record_failure()
-        assert breaker.state == CircuitState.OPEN     # threshold reached
-
     def test_allow_request_false_when_open(self):
         breaker = CircuitBreaker(failure_threshold=1)
         breaker.record_failure()
         assert breaker.allow_request() is False
 
-    def test_transitions_to_half_open_after_recovery_timeout(self):
+    def test_recovery_is_due_exactly_at_the_timeout(self, clock):
         breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
         breaker.record_failure()
+        clock.return_value += 9_999_999
         assert breaker.state == CircuitState.OPEN
-        time.sleep(0.02)
+        clock.return_value += 1
         assert breaker.state == CircuitState.HALF_OPEN
 
-    def test_half_open_transitions_to_closed_on_success(self):
+    def test_healthy_closed_path_takes_no_lock(self):
+        breaker = CircuitBreaker()
+        breaker._lock = MagicMock()
+        assert breaker.allow_request() is True
+        breaker.record_success()
+        breaker._lock.__enter__.assert_not_called()
+
+    def test_open_circuit_is_read_without_the_lock_until_recovery_is_due(self, clock):
         breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
         breaker.record_failure()
-        time.sleep(0.02)
-        assert breaker.state == CircuitState.HALF_OPEN
-        breaker.record_success()
-        assert breaker.state == CircuitState.CLOSED
+        breaker._lock = MagicMock()
+        assert breaker.allow_request() is False
+        assert breaker.state == CircuitState.OPEN
+        breaker._lock.__enter__.assert_not_called()
 
-    def test_half_open_transitions_back_to_open_on_failure(self):
+        clock.return_value += 20_000_000   # 20 ms
+        assert breaker.state == CircuitState.HALF_OPEN   # transition takes the lock
+        breaker._lock.__enter__.assert_called_once()
+
+    def test_allow_request_admits_the_probe_once_recovery_is_due(self, clock):
         breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
         breaker.record_failure()
-        time.sleep(0.02)
+        clock.return_value += 20_000_000   # 20 ms
+        assert breaker.allow_request() is True
         assert breaker.state == CircuitState.HALF_OPEN
-        breaker.record_failure()
-        assert breaker.state == CircuitState.OPEN
 
-    def test_record_success_resets_failure_count(self):
-        breaker = CircuitBreaker(failure_threshold=2)
-        breaker.record_failure()   # count = 1, still CLOSED
-        breaker.record_success()   # count reset to 0
-        breaker.record_failure()   # count = 1 again — NOT enough to open
-        assert breaker.state == CircuitState.CLOSED
+    def test_success_after_failures_still_takes_the_lock(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        breaker.record_failure()
+        breaker._lock = MagicMock()
+        breaker.record_success()
+        breaker._lock.__enter__.assert_called_once()
+        assert breaker._failure_count == 0
 
     def test_failure_threshold_is_read_only(self):
         breaker = CircuitBreaker(failure_threshold=5)
@@ -558,3 +733,52 @@ class TestCircuitBreaker:
         breaker = CircuitBreaker(recovery_timeout=30.0)
         with pytest.raises(AttributeError):
             breaker.recovery_timeout = 0.0   # type: ignore[misc]
+
+
+# --------------------------------------------------------------------------- #
+# 9. ShardedLRUCache — bounded result cache                                    #
+# --------------------------------------------------------------------------- #
+
+
+class TestShardedLRUCache:
+    def test_behaves_like_a_mapping(self):
+        cache = ShardedLRUCache(maxsize=100, shards=4)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1 and cache["b"] == 2
+        assert cache.get("missing") is None
+        assert "a" in cache and len(cache) == 2
+        del cache["a"]
+        assert sorted(cache) == ["b"]
+
+    def test_evicts_least_recently_used_within_a_shard(self):
+        cache = ShardedLRUCache(maxsize=2, shards=1)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.get("a")            # a is now more recent than b
+        cache["c"] = 3
+        assert "b" not in cache
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_total_size_stays_bounded(self):
+        cache = ShardedLRUCache(maxsize=64, shards=16)
+        for i in range(10_000):
+            cache[f"key-{i}"] = i
+        assert len(cache) <= 64
+
+    @pytest.mark.parametrize("kwargs", [{"maxsize": 0}, {"shards": 3}])
+    def test_rejects_invalid_sizes(self, kwargs):
+        with pytest.raises(ValueError):
+            ShardedLRUCache(**kwargs)
+
+    def test_pipeline_replays_from_a_sharded_cache(self):
+        pipeline = SubmissionPipeline(
+            cache=ShardedLRUCache(maxsize=10),
+            rules=[],
+            existing_ids=set(),
+            risk_db={"ACME-001": {"risk_score": 10}},
+        )
+        first = pipeline.run(VALID_PAYLOAD)
+        second = pipeline.run(VALID_PAYLOAD)
+        assert first.was_replay is False
+        assert second.was_replay is True